@@ -3,17 +3,64 @@ Reroll do Cadeiras - Ponto de entrada principal.
 por Victor Gomes de Sá
 
 Este arquivo inicia a aplicação com splash screen e carrega a interface principal.
+Os módulos pesados (customtkinter, pyautogui, keyboard, OCR) são importados em
+segundo plano enquanto a splash mostra o progresso real da inicialização.
 """
+import time
+
+# Início do processo (tempo até a interface ficar interativa)
+STARTED = time.perf_counter()
+
 import sys
 import os
 
 # Adiciona o diretório src ao path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-import customtkinter as ctk
-
 from src.splash import SplashScreen
-from src.app import GameAutomation
+
+
+def _load_modules(context):
+    """Importa a interface (customtkinter, pyautogui, keyboard, PIL, OCR)."""
+    from src.app import GameAutomation
+    context['app_class'] = GameAutomation
+
+
+def _load_config(context):
+    """Lê as configurações salvas."""
+    from src.presets import create_config_manager
+    context['config'] = create_config_manager().load_config()
+
+
+def _load_ocr(context):
+    """Importa o pytesseract e configura o executável."""
+    from src.ocr_engine import tesseract
+    tesseract()
+
+
+def startup_tasks(context):
+    """
+    Tarefas de inicialização exibidas na splash.
+    
+    Args:
+        context: Dict preenchido pelas tarefas.
+    
+    Returns:
+        list: (status, peso, função) na ordem de execução.
+    """
+    return [
+        ("Carregando módulos...", 6, lambda: _load_modules(context)),
+        ("Carregando configurações...", 1, lambda: _load_config(context)),
+        ("Preparando OCR...", 2, lambda: _load_ocr(context)),
+    ]
+
+
+def report_startup(app, timings):
+    """Mostra o tempo até a interface ficar interativa."""
+    elapsed = time.perf_counter() - STARTED
+    steps = ", ".join(f"{status.rstrip('.')} {seconds * 1000:.0f} ms" for status, seconds in timings.items())
+    print(f"✓ Pronto em {elapsed:.2f}s ({steps})")
+    app.log(f"⚡ Interface pronta em {elapsed:.2f}s")
 
 
 def main():
@@ -21,17 +68,19 @@ def main():
     print("🚀 Iniciando Reroll do Cadeiras...")
     
     try:
-        # Mostra splash screen
+        # Splash enquanto as tarefas de inicialização rodam
         splash = SplashScreen()
-        splash.run_animation()
+        context = {}
+        timings = splash.run_tasks(startup_tasks(context))
         splash.destroy()
         
         # Cria janela principal
         print("✓ Carregando interface...")
+        import customtkinter as ctk
         root = ctk.CTk()
-        app = GameAutomation(root)
+        app = context['app_class'](root, config=context['config'])
         
-        print("✓ Pronto!")
+        root.after_idle(lambda: report_startup(app, timings))
         root.mainloop()
         
     except Exception as e:
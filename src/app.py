@@ -15,14 +15,21 @@ import sys
 
 from src.config import (
     APP_VERSION, COLORS, DEFAULT_HOTKEYS, DEFAULT_SETTINGS,
-    UI_CONFIG, get_icon_path
+    UI_CONFIG, METRICS_SERVER_CONFIG, PROFILING_CONFIG, OCR_WARMUP_CONFIG, STORAGE_CONFIG, get_icon_path
 )
-from src.presets import PresetManager, ConfigManager
+from src.presets import create_preset_manager, create_config_manager
+from src.runspec import RunSpec, MODE_TAB_TYPES, resolve_jobs, resolve_alternatives
 from src.ocr_engine import OCREngine
 from src.automation import AutomationEngine
+from src.checkpoint import describe_checkpoint
+from src.tracing import TRACER
+from src.instrumentation import LatencyHistogram
+from src.metrics_server import MetricsServer
+from src.warmup import OCRWarmup, WARMUP_OK, WARMUP_MISSING
 from src.updater import AutoUpdater
-from src.ui.tabs import ValuesTab, SearchTab, KeysTab, T7Tab, SkillSpamTab
-from src.ui.components import LogWindow, StatusBar
+from src.ui.tabs import ValuesTab, SearchTab, KeysTab, T7Tab, SkillSpamTab, TabProxy
+from src.ui.components import LogWindow, StatusBar, LatencyPanel
+from src.ui.log_pipeline import LogPipeline
 from src.ui.dialogs import HotkeySettingsDialog, NewPresetDialog, UpdateDialog, UpdateProgressDialog
 
 
@@ -34,19 +41,20 @@ ctk.set_default_color_theme(UI_CONFIG['color_theme'])
 class GameAutomation:
     """Aplicação principal de automação."""
     
-    def __init__(self, root):
+    def __init__(self, root, config=None):
         """
         Inicializa a aplicação.
         
         Args:
             root: Janela principal CTk.
+            config: Configurações já carregadas na splash (senão, lidas do disco).
         """
         self.root = root
         self._setup_window()
         
         # Gerenciadores
-        self.preset_manager = PresetManager()
-        self.config_manager = ConfigManager()
+        self.preset_manager = create_preset_manager()
+        self.config_manager = create_config_manager()
         self.ocr = OCREngine()
         self.automation = AutomationEngine(self)
         
@@ -55,35 +63,68 @@ class GameAutomation:
         self.region = None
         self.hotkeys = DEFAULT_HOTKEYS.copy()
         self.colors = COLORS
+        # Salvamento agendado (vários pedidos seguidos viram um só)
+        self._save_after_id = None
         
         # Posições para automação de chaves
         self.key_position = None
         self.orb_position = None
         self.bp_position = None
         
+        # Itens do modo multi-item
+        self.roll_jobs = []
+        self.key_grid = None
+        self.bp_grid = None
+        self.alternative_presets = []
+        
         # Skill spam
         self.skill_spam_running = False
         self.skill_spam_threads = []
+        # Desvio entre o intervalo real e o configurado, por tecla (us)
+        self.skill_spam_jitter = {}
+        
+        # Endpoint de métricas (opcional, só localhost)
+        self.metrics_server = None
+        if METRICS_SERVER_CONFIG['enabled']:
+            self._start_metrics_server()
         
         # UI
         self.log_window = LogWindow(self.root)
+        self.latency_panel = LatencyPanel(self.root, self.automation)
         self.log_text = None  # Para compatibilidade
         
+        # Logs e status de qualquer thread passam pela fila (drenada pelo Tk)
+        self.log_pipeline = LogPipeline(
+            self.root,
+            {'main': self._write_log, 'detail': self.log_window.write},
+            status_sink=self._apply_status
+        )
+        self.log_pipeline.start()
+        
         # Variáveis de configuração
         self.delay_var = tk.StringVar(value=DEFAULT_SETTINGS['delay'])
         self.click_delay_var = tk.StringVar(value=DEFAULT_SETTINGS['click_delay'])
         self.max_attempts_var = tk.StringVar(value=DEFAULT_SETTINGS['max_attempts'])
+        self.multi_item_var = tk.BooleanVar(value=False)
         
         # Construir UI
         self._setup_ui()
         
         # Carregar configurações
-        self.load_config()
+        self.load_config(config)
+        
+        # Constrói só a aba visível (as outras na primeira vez que forem abertas)
+        self._on_tab_changed()
         
         # Configurar hotkeys APÓS carregar config (para usar hotkeys salvos)
         self._setup_local_hotkeys()
         self.setup_global_hotkeys()
         
+        # Aquecimento e autoteste do OCR em segundo plano
+        self.warmup = OCRWarmup()
+        if OCR_WARMUP_CONFIG['enabled']:
+            self.warmup.start(self._on_warmup_done)
+        
         # Verificar atualizações automaticamente ao iniciar
         self.root.after(2000, self._check_updates_auto)
         
@@ -161,7 +202,8 @@ class GameAutomation:
             segmented_button_selected_color=("#3b82f6", "#2563eb"),
             segmented_button_selected_hover_color=("#2563eb", "#1d4ed8"),
             segmented_button_unselected_color=("gray85", "gray25"),
-            segmented_button_unselected_hover_color=("gray75", "gray35")
+            segmented_button_unselected_hover_color=("gray75", "gray35"),
+            command=self._on_tab_changed
         )
         self.tabview.grid(row=1, column=0, sticky="nsew", pady=(0, 15))
         
@@ -175,12 +217,52 @@ class GameAutomation:
         self.tabview.add("🔑 Automação de Chaves")
         self.tabview.add("⚡ Skill Spam")
         
-        # Instanciar abas
-        self.tab_values = ValuesTab(self.tabview.tab("🎯 Valores Específicos"), self)
-        self.tab_search = SearchTab(self.tabview.tab("🔍 Busca de Atributos"), self)
-        self.tab_t7 = T7Tab(self.tabview.tab("⭐ Buscar T7"), self)
-        self.tab_keys = KeysTab(self.tabview.tab("🔑 Automação de Chaves"), self)
-        self.tab_skill_spam = SkillSpamTab(self.tabview.tab("⚡ Skill Spam"), self)
+        # Abas construídas na primeira exibição (até lá, só os dados)
+        self.tab_values = TabProxy(ValuesTab, self.tabview.tab("🎯 Valores Específicos"), self)
+        self.tab_search = TabProxy(SearchTab, self.tabview.tab("🔍 Busca de Atributos"), self)
+        self.tab_t7 = TabProxy(
+            T7Tab, self.tabview.tab("⭐ Buscar T7"), self,
+            on_build=lambda tab: tab.update_instructions(self.hotkeys)
+        )
+        self.tab_keys = TabProxy(
+            KeysTab, self.tabview.tab("🔑 Automação de Chaves"), self,
+            on_build=self._on_keys_tab_built
+        )
+        self.tab_skill_spam = TabProxy(
+            SkillSpamTab, self.tabview.tab("⚡ Skill Spam"), self,
+            on_build=lambda tab: tab.set_running(self.skill_spam_running)
+        )
+        self.tabs_by_name = {
+            "🎯 Valores Específicos": self.tab_values,
+            "🔍 Busca de Atributos": self.tab_search,
+            "⭐ Buscar T7": self.tab_t7,
+            "🔑 Automação de Chaves": self.tab_keys,
+            "⚡ Skill Spam": self.tab_skill_spam,
+        }
+    
+    def _on_tab_changed(self):
+        """Constrói a aba selecionada na primeira vez em que aparece."""
+        proxy = self.tabs_by_name.get(self.tabview.get())
+        if proxy is not None:
+            proxy.materialize()
+    
+    def _on_keys_tab_built(self, tab):
+        """Preenche a aba de chaves recém-construída com posições e atalhos."""
+        self._show_positions()
+        tab.update_instructions(self.hotkeys)
+    
+    def _show_positions(self):
+        """Mostra as posições capturadas na aba de chaves (se já existir)."""
+        if not self.tab_keys.built:
+            return
+        tab = self.tab_keys.tab
+        for capture, position in (
+            (tab.key_capture, self.key_position),
+            (tab.orb_capture, self.orb_position),
+            (tab.bp_capture, self.bp_position),
+        ):
+            if position:
+                capture.set_position(*position)
     
     def _build_controls(self, parent):
         """Constrói os controles inferiores."""
@@ -264,7 +346,27 @@ class GameAutomation:
         ctk.CTkEntry(
             settings_row, textvariable=self.max_attempts_var,
             width=80, placeholder_text="1000"
-        ).pack(side="left")
+        ).pack(side="left", padx=(0, 20))
+        
+        # Multi-item
+        ctk.CTkCheckBox(
+            settings_row, text="🧩 Multi-item", variable=self.multi_item_var,
+            command=self.save_config
+        ).pack(side="left", padx=(0, 5))
+        
+        ctk.CTkButton(
+            settings_row, text="➕ Item", width=70, height=28,
+            command=self.add_roll_job
+        ).pack(side="left", padx=(0, 5))
+        
+        ctk.CTkButton(
+            settings_row, text="🗑", width=36, height=28,
+            fg_color="#7f1d1d", hover_color="#991b1b",
+            command=self.clear_roll_jobs
+        ).pack(side="left", padx=(0, 5))
+        
+        self.roll_jobs_label = ctk.CTkLabel(settings_row, text="0 itens", text_color="gray60")
+        self.roll_jobs_label.pack(side="left")
         
         # Separador
         ctk.CTkFrame(parent, height=2, fg_color="gray30").grid(
@@ -310,6 +412,15 @@ class GameAutomation:
             text_color="white"
         ).pack(side="left", padx=5)
         
+        ctk.CTkButton(
+            buttons_control, text="⏱ Latência",
+            command=self.latency_panel.open,
+            width=110, height=45,
+            font=(UI_CONFIG['font_family'], 13, "bold"),
+            fg_color="#4b5563", hover_color="#374151",
+            text_color="white"
+        ).pack(side="left", padx=5)
+        
         # Status
         self.status_label = ctk.CTkLabel(
             control_container, text="● Aguardando configuração...",
@@ -389,9 +500,12 @@ class GameAutomation:
             keyboard.add_hotkey(self.hotkeys['stop'].lower(), self.stop_automation)
             
             # Hotkey do Skill Spam
-            skill_spam_hotkey = self.tab_skill_spam.get_hotkey()
+            skill_spam_hotkey = self.tab_skill_spam.get_data()['hotkey'].strip()
             keyboard.add_hotkey(skill_spam_hotkey.lower(), self.toggle_skill_spam)
             
+            # Hotkey do profiling sob demanda
+            keyboard.add_hotkey(PROFILING_CONFIG['hotkey'].lower(), self.toggle_profiling)
+            
             self.log(f"⌨️ Atalhos: {self.hotkeys['region']}/{self.hotkeys['test']}/{self.hotkeys['start']}/{self.hotkeys['stop']}")
         except Exception as e:
             self.log(f"⚠️ Erro ao configurar atalhos: {e}")
@@ -641,15 +755,9 @@ class GameAutomation:
             
             # Atualiza label na aba T7
             if has_t7:
-                self.tab_t7.test_result_label.configure(
-                    text=f"⭐ T7 ENCONTRADO! ({len(best_tiers)} attrs)",
-                    text_color="#22c55e"
-                )
+                self._set_t7_test_result(f"⭐ T7 ENCONTRADO! ({len(best_tiers)} attrs)", "#22c55e")
             else:
-                self.tab_t7.test_result_label.configure(
-                    text=f"❌ Sem T7 ({len(best_tiers)} attrs detectados)",
-                    text_color="#ef4444"
-                )
+                self._set_t7_test_result(f"❌ Sem T7 ({len(best_tiers)} attrs detectados)", "#ef4444")
             
             # Popup
             if best_tiers:
@@ -670,157 +778,13 @@ class GameAutomation:
             
         except Exception as e:
             self.log(f"Erro: {e}")
-            self.tab_t7.test_result_label.configure(
-                text=f"❌ Erro: {e}",
-                text_color="#ef4444"
-            )
+            self._set_t7_test_result(f"❌ Erro: {e}", "#ef4444")
             messagebox.showerror("Erro", f"Erro ao capturar: {e}")
     
-    # ============================================
-    # MÉTODOS DE VERIFICAÇÃO
-    # ============================================
-    
-    def check_target_reached(self, current_values):
-        """Verifica se os valores alvo foram atingidos."""
-        all_reached = True
-        details = []
-        
-        for entry in self.tab_values.entries:
-            name = entry.get_name().lower()
-            name = ' '.join(name.split())
-            target = entry.get_value()
-            
-            if not name or not target:
-                continue
-            
-            try:
-                target_val = float(target)
-                
-                if name not in current_values:
-                    all_reached = False
-                    details.append(f"❌ {name.upper()}: NÃO ENCONTRADO (alvo: ≥{target_val})")
-                    continue
-                
-                current_val = current_values[name]
-                
-                if current_val >= target_val:
-                    details.append(f"✅ {name.upper()}: {current_val} (alvo: ≥{target_val}) - ATINGIDO!")
-                else:
-                    all_reached = False
-                    diff = target_val - current_val
-                    details.append(f"⏳ {name.upper()}: {current_val} (falta: {diff:.1f})")
-            except ValueError:
-                continue
-        
-        return all_reached, "\n".join(details)
-    
-    def check_attributes_found(self, current_values):
-        """Verifica se os atributos desejados estão presentes."""
-        return self._check_attributes_generic(
-            self.tab_search.entries,
-            self.tab_search.get_mode(),
-            self.tab_search.get_min_count(),
-            current_values
-        )
-    
-    def check_keys_attributes(self, current_values):
-        """Verifica se a chave tem os atributos desejados."""
-        return self._check_attributes_generic(
-            self.tab_keys.entries,
-            self.tab_keys.get_mode(),
-            self.tab_keys.get_min_count(),
-            current_values
-        )
-    
-    def _match_attribute(self, search_name, found_name):
-        """
-        Verifica se o atributo buscado corresponde ao encontrado.
-        Usa comparação EXATA para evitar falsos positivos.
-        """
-        search_name = search_name.lower().strip()
-        found_name = found_name.lower().strip()
-        
-        # Normaliza espaços múltiplos
-        search_name = ' '.join(search_name.split())
-        found_name = ' '.join(found_name.split())
-        
-        # Comparação EXATA
-        return search_name == found_name
-    
-    def _check_attributes_generic(self, entries, mode, min_count_str, current_values):
-        """Verificação genérica de atributos."""
-        required_must_have = []
-        required_optional = []
-        
-        for entry in entries:
-            name = entry.get_name().lower()
-            name = ' '.join(name.split())
-            if name:
-                if entry.is_required():
-                    required_must_have.append(name)
-                else:
-                    required_optional.append(name)
-        
-        all_attrs = required_must_have + required_optional
-        
-        if not all_attrs:
-            return False, "❌ Nenhum atributo especificado"
-        
-        # Normaliza valores atuais
-        normalized_current = {k.lower().strip(): v for k, v in current_values.items()}
-        
-        found_must_have = []
-        missing_must_have = []
-        found_optional = []
-        details = []
-        
-        # Verifica obrigatórios
-        for attr_name in required_must_have:
-            found_value = None
-            for current_key, current_val in normalized_current.items():
-                if self._match_attribute(attr_name, current_key):
-                    found_value = current_val
-                    break
-            
-            if found_value is not None:
-                found_must_have.append(attr_name)
-                details.append(f"⭐ {attr_name.upper()}: {found_value} - OBRIGATÓRIO!")
-            else:
-                missing_must_have.append(attr_name)
-                details.append(f"❌ {attr_name.upper()}: OBRIGATÓRIO NÃO ENCONTRADO")
-        
-        # Verifica opcionais
-        for attr_name in required_optional:
-            found_value = None
-            for current_key, current_val in normalized_current.items():
-                if self._match_attribute(attr_name, current_key):
-                    found_value = current_val
-                    break
-            
-            if found_value is not None:
-                found_optional.append(attr_name)
-                details.append(f"✅ {attr_name.upper()}: {found_value}")
-            else:
-                details.append(f"❌ {attr_name.upper()}: NÃO ENCONTRADO")
-        
-        total_found = len(found_must_have) + len(found_optional)
-        
-        if mode == "ALL":
-            success = (total_found == len(all_attrs))
-            details.insert(0, f"📊 Modo: TODOS - {total_found}/{len(all_attrs)}")
-        else:
-            try:
-                min_required = int(min_count_str)
-            except:
-                min_required = 1
-            
-            all_must_have_found = (len(missing_must_have) == 0)
-            enough_total = (total_found >= min_required)
-            
-            success = all_must_have_found and enough_total
-            details.insert(0, f"📊 Modo: MÍNIMO - {total_found}/{len(all_attrs)} (precisa: {min_required})")
-        
-        return success, "\n".join(details)
+    def _set_t7_test_result(self, text, color):
+        """Mostra o resultado do teste na aba T7 (se já existir)."""
+        if self.tab_t7.built:
+            self.tab_t7.tab.set_test_result(text, color)
     
     # ============================================
     # MÉTODOS DE AUTOMAÇÃO
@@ -835,31 +799,42 @@ class GameAutomation:
             messagebox.showwarning("Aviso", "Configure a região primeiro")
             return
         
+        if self.warmup.status == WARMUP_MISSING:
+            messagebox.showerror("Erro", f"{self.warmup.message}\n\nInstale o Tesseract ou coloque-o em tesseract_portable/")
+            return
+        
         # Detecta aba ativa
         active_tab_name = self.tabview.get()
         
-        if active_tab_name == "🎯 Valores Específicos":
-            if not any(e.get_name() and e.get_value() for e in self.tab_values.entries):
+        if self.multi_item_var.get() and active_tab_name != "🔑 Automação de Chaves":
+            if not self.roll_jobs:
+                messagebox.showwarning("Aviso", "Adicione pelo menos um item (➕ Item)")
+                return
+            mode = 'jobs'
+        
+        elif active_tab_name == "🎯 Valores Específicos":
+            if not any(a.get('name') and a.get('value') for a in self.tab_values.get_data()):
                 messagebox.showwarning("Aviso", "Defina pelo menos um atributo alvo")
                 return
             mode = 'values'
             
         elif active_tab_name == "🔍 Busca de Atributos":
-            if not any(e.get_name() for e in self.tab_search.entries):
+            if not self.tab_search.get_data()['attributes']:
                 messagebox.showwarning("Aviso", "Defina pelo menos um atributo")
                 return
             mode = 'attributes'
         
         elif active_tab_name == "⭐ Buscar T7":
             # Verifica se modo específico tem atributos definidos
-            if self.tab_t7.get_mode() == "SPECIFIC":
-                if not self.tab_t7.get_specific_attributes():
+            t7 = self.tab_t7.get_data()
+            if t7.get('mode') == "SPECIFIC":
+                if not t7.get('specific_attributes'):
                     messagebox.showwarning("Aviso", "Defina pelo menos um atributo específico para T7")
                     return
             mode = 't7'
             
         else:  # Automação de Chaves
-            if not any(e.get_name() for e in self.tab_keys.entries):
+            if not self.tab_keys.get_data()['attributes']:
                 messagebox.showwarning("Aviso", "Defina pelo menos um atributo")
                 return
             if not self.key_position:
@@ -868,32 +843,92 @@ class GameAutomation:
             if not self.orb_position:
                 messagebox.showwarning("Aviso", "Configure a posição do Orb")
                 return
-            if not self.bp_position:
+            if not self.bp_position and not self.bp_grid:
                 messagebox.showwarning("Aviso", "Configure a posição da BP")
                 return
             mode = 'keys'
         
+        try:
+            spec = self.build_run_spec(mode)
+        except ValueError as e:
+            messagebox.showwarning("Aviso", f"Configuração inválida: {e}")
+            return
+        
+        # Oferece retomar uma sessão interrompida com a mesma configuração
+        resume = self.automation.checkpoints.load_matching(spec)
+        if resume:
+            if messagebox.askyesno(
+                "Retomar sessão",
+                f"Existe uma sessão interrompida com esta configuração:\n\n"
+                f"{describe_checkpoint(resume)}\n\nDeseja retomar de onde parou?"
+            ):
+                self.log("↩️ Retomando sessão anterior")
+            else:
+                self.automation.checkpoints.clear()
+                resume = None
+        
         self.is_running = True
         self.start_button.configure(state="disabled")
         self.stop_button.configure(state="normal")
         self.update_status("▶️ Iniciando...", 'info')
         
-        self.automation.start(mode)
+        self.automation.start(mode, spec, resume=resume)
         self.log(f"▶️ Automação INICIADA ({mode})")
     
+    def build_run_spec(self, mode):
+        """
+        Monta o RunSpec imutável a partir do estado atual da interface.
+        
+        Args:
+            mode: Modo do motor ('values', 'attributes', 't7', 'keys', 'jobs').
+            
+        Returns:
+            RunSpec: Especificação para o motor de automação.
+        """
+        spec = {
+            'mode': mode,
+            'region': self.region,
+            'delay': float(self.delay_var.get()),
+            'click_delay': float(self.click_delay_var.get()) / 1000.0,
+            'max_attempts': int(self.max_attempts_var.get()),
+            'key_position': self.key_position,
+            'orb_position': self.orb_position,
+            'bp_position': self.bp_position,
+            'key_grid': self.key_grid,
+            'bp_grid': self.bp_grid,
+        }
+        
+        if mode == 'jobs':
+            spec['jobs'] = resolve_jobs(self.roll_jobs, self.preset_manager)
+        else:
+            tab_type = MODE_TAB_TYPES[mode]
+            spec['preset_name'] = self._get_preset_combo(tab_type).get_selected()
+            spec['preset'] = self.get_tab_data(tab_type)
+            spec['alternatives'] = resolve_alternatives(self.alternative_presets, self.preset_manager, mode)
+        
+        return RunSpec(**spec)
+    
     def stop_automation(self):
-        """Para a automação."""
+        """
+        Para a automação (qualquer thread: botão, hotkey global ou o motor).
+        
+        Os botões são atualizados na thread do Tk.
+        """
         self.is_running = False
         self.automation.stop()
-        
-        time.sleep(0.1)
-        
+        self.update_status("⬛ Pronto para iniciar", 'info')
+        self.log("⬛ Automação PARADA")
+        self.log_to_detail("\n⬛ AUTOMAÇÃO INTERROMPIDA", 'warning')
+        self.root.after(0, self._on_engine_stopped)
+    
+    def _on_engine_stopped(self):
+        """Reabilita o botão de iniciar (thread do Tk)."""
+        # Uma nova execução pode ter começado antes deste callback
+        if self.is_running:
+            return
         try:
             self.start_button.configure(state="normal")
             self.stop_button.configure(state="disabled")
-            self.update_status("⬛ Pronto para iniciar", 'info')
-            self.log("⬛ Automação PARADA")
-            self.log_to_detail("\n⬛ AUTOMAÇÃO INTERROMPIDA", 'warning')
         except Exception as e:
             print(f"Erro ao parar: {e}")
     
@@ -910,8 +945,9 @@ class GameAutomation:
     
     def start_skill_spam(self):
         """Inicia o spam de skills."""
-        program = self.tab_skill_spam.get_selected_program()
-        skills = self.tab_skill_spam.get_skills_data()
+        skill_spam = self.tab_skill_spam.get_data()
+        program = skill_spam.get('program')
+        skills = [s for s in skill_spam.get('skills', []) if s.get('active', True) and s.get('key')]
         
         if program == "Selecione um programa" or not program:
             messagebox.showwarning("Aviso", "Selecione um programa alvo")
@@ -933,13 +969,14 @@ class GameAutomation:
                 return
             
             self.skill_spam_running = True
-            self.tab_skill_spam.set_running(True)
+            if self.tab_skill_spam.built:
+                self.tab_skill_spam.tab.set_running(True)
             self.log(f"⚡ Skill Spam INICIADO para: {program}")
             self.log_to_detail("\n" + "="*60, 'header')
             self.log_to_detail(f"⚡ SKILL SPAM INICIADO", 'header')
             self.log_to_detail(f"🖥️ Programa: {program}", 'info')
             
-            hotkey = self.tab_skill_spam.get_hotkey()
+            hotkey = skill_spam.get('hotkey', '')
             self.log(f"⌨️ Pressione {hotkey.upper()} para parar")
             
             # Inicia threads para cada skill
@@ -953,6 +990,7 @@ class GameAutomation:
                 thread = threading.Thread(
                     target=self._skill_spam_loop,
                     args=(hwnd, key, interval),
+                    name=f"skill-{key}",
                     daemon=True
                 )
                 self.skill_spam_threads.append(thread)
@@ -967,7 +1005,8 @@ class GameAutomation:
     def stop_skill_spam(self):
         """Para o spam de skills."""
         self.skill_spam_running = False
-        self.tab_skill_spam.set_running(False)
+        if self.tab_skill_spam.built:
+            self.tab_skill_spam.tab.set_running(False)
         
         # NÃO remove o hotkey - ele deve continuar funcionando para toggle
         
@@ -1027,6 +1066,10 @@ class GameAutomation:
             self.log(f"⚠️ Tecla não reconhecida: {key}")
             return
         
+        jitter = self.skill_spam_jitter.setdefault(key, LatencyHistogram())
+        expected = interval + 0.01
+        last_press = None
+        
         while self.skill_spam_running:
             try:
                 # Verifica se a janela ainda existe
@@ -1034,10 +1077,16 @@ class GameAutomation:
                     self.log(f"⚠️ Janela fechada")
                     break
                 
+                now = time.perf_counter()
+                if last_press is not None:
+                    jitter.record(int(abs(now - last_press - expected) * 1_000_000))
+                last_press = now
+                
                 # Envia a tecla para a janela
-                win32api.PostMessage(hwnd, win32con.WM_KEYDOWN, vk, 0)
-                time.sleep(0.01)
-                win32api.PostMessage(hwnd, win32con.WM_KEYUP, vk, 0)
+                with TRACER.span('skill', 'skill', key=key):
+                    win32api.PostMessage(hwnd, win32con.WM_KEYDOWN, vk, 0)
+                    time.sleep(0.01)
+                    win32api.PostMessage(hwnd, win32con.WM_KEYUP, vk, 0)
                 
                 time.sleep(interval)
                 
@@ -1076,21 +1125,70 @@ class GameAutomation:
         
         threading.Thread(target=wait_for_enter, daemon=True).start()
     
+    def add_roll_job(self):
+        """Adiciona o item sob o mouse à fila do modo multi-item."""
+        if not self.region:
+            messagebox.showwarning("Aviso", "Configure a região do tooltip do item primeiro")
+            return
+        
+        tab_map = {
+            "🎯 Valores Específicos": 'values',
+            "🔍 Busca de Atributos": 'search',
+            "⭐ Buscar T7": 't7'
+        }
+        tab_type = tab_map.get(self.tabview.get())
+        if not tab_type:
+            messagebox.showwarning("Aviso", "Selecione a aba de Valores, Busca ou T7")
+            return
+        
+        preset = self._get_preset_combo(tab_type).get_selected()
+        if preset == "+ Novo Preset" or not self.preset_manager.get_preset(tab_type, preset):
+            messagebox.showwarning("Aviso", "Salve o preset antes de adicionar o item")
+            return
+        
+        region = self.region
+        
+        def on_position(pos):
+            self.roll_jobs.append({
+                'name': f"Item {len(self.roll_jobs) + 1}",
+                'region': list(region),
+                'position': [pos[0], pos[1]],
+                'tab_type': tab_type,
+                'preset': preset
+            })
+            self._update_roll_jobs_label()
+            self.log(f"✓ Item {len(self.roll_jobs)} adicionado: '{preset}' em {tuple(pos)}")
+            self.save_config()
+        
+        self._capture_position(f"ITEM {len(self.roll_jobs) + 1}", on_position)
+    
+    def clear_roll_jobs(self):
+        """Remove todos os itens do modo multi-item."""
+        self.roll_jobs = []
+        self._update_roll_jobs_label()
+        self.log("✓ Itens do multi-item removidos")
+        self.save_config()
+    
+    def _update_roll_jobs_label(self):
+        """Atualiza o contador de itens do multi-item."""
+        count = len(self.roll_jobs)
+        self.roll_jobs_label.configure(text=f"{count} {'item' if count == 1 else 'itens'}")
+    
     def _set_key_position(self, pos):
         self.key_position = pos
-        self.tab_keys.key_capture.set_position(pos[0], pos[1])
+        self._show_positions()
         self.log(f"✓ Posição da chave: {pos}")
         self.save_config()
     
     def _set_orb_position(self, pos):
         self.orb_position = pos
-        self.tab_keys.orb_capture.set_position(pos[0], pos[1])
+        self._show_positions()
         self.log(f"✓ Posição do orb: {pos}")
         self.save_config()
     
     def _set_bp_position(self, pos):
         self.bp_position = pos
-        self.tab_keys.bp_capture.set_position(pos[0], pos[1])
+        self._show_positions()
         self.log(f"✓ Posição da BP: {pos}")
         self.save_config()
     
@@ -1143,16 +1241,20 @@ class GameAutomation:
             
             self.log(f"Preset '{current_preset}' excluído")
     
-    def _get_preset_combo(self, tab_type):
-        """Retorna o combo de presets para o tipo."""
+    def _get_tab(self, tab_type):
+        """Retorna a aba (TabProxy) do tipo de preset."""
         if tab_type == 'values':
-            return self.tab_values.preset_selector
+            return self.tab_values
         elif tab_type == 'search':
-            return self.tab_search.preset_selector
+            return self.tab_search
         elif tab_type == 't7':
-            return self.tab_t7.preset_selector
+            return self.tab_t7
         else:
-            return self.tab_keys.preset_selector
+            return self.tab_keys
+    
+    def _get_preset_combo(self, tab_type):
+        """Retorna a seleção de presets para o tipo."""
+        return self._get_tab(tab_type).presets
     
     def _create_new_preset_dialog(self, tab_type):
         """Abre diálogo para criar novo preset."""
@@ -1167,25 +1269,13 @@ class GameAutomation:
         
         NewPresetDialog(self.root, preset_names, on_create)
     
+    def get_tab_data(self, tab_type):
+        """Retorna os dados da aba no formato de preset."""
+        return self._get_tab(tab_type).get_data()
+    
     def _save_preset(self, tab_type, name):
         """Salva um preset."""
-        if tab_type == 'values':
-            data = self.tab_values.get_entries_data()
-        elif tab_type == 'search':
-            data = {
-                'attributes': self.tab_search.get_entries_data(),
-                'mode': self.tab_search.get_mode(),
-                'min_count': self.tab_search.get_min_count()
-            }
-        elif tab_type == 't7':
-            data = self.tab_t7.get_entries_data()
-        else:
-            data = {
-                'attributes': self.tab_keys.get_entries_data(),
-                'mode': self.tab_keys.get_mode(),
-                'min_count': self.tab_keys.get_min_count()
-            }
-        
+        data = self.get_tab_data(tab_type)
         self.preset_manager.save_preset(tab_type, name, data)
         self._update_preset_combos()
         self.log(f"💾 Preset '{name}' salvo")
@@ -1199,18 +1289,9 @@ class GameAutomation:
         if not data:
             return
         
-        if tab_type == 'values':
-            self.tab_values.load_data(data)
-            self.tab_values.preset_selector.set_selected(name)
-        elif tab_type == 'search':
-            self.tab_search.load_data(data)
-            self.tab_search.preset_selector.set_selected(name)
-        elif tab_type == 't7':
-            self.tab_t7.load_data(data)
-            self.tab_t7.preset_selector.set_selected(name)
-        else:
-            self.tab_keys.load_data(data)
-            self.tab_keys.preset_selector.set_selected(name)
+        tab = self._get_tab(tab_type)
+        tab.load_data(data)
+        tab.presets.set_selected(name)
         
         self.log(f"📂 Preset '{name}' carregado")
     
@@ -1227,8 +1308,28 @@ class GameAutomation:
     # MÉTODOS DE CONFIGURAÇÃO
     # ============================================
     
-    def save_config(self):
-        """Salva configurações."""
+    def save_config(self, immediate=False):
+        """
+        Salva configurações.
+        
+        Os pedidos são agrupados: o estado da interface é lido uma vez,
+        config_snapshot_ms depois do último pedido, e o ConfigManager grava o
+        arquivo em segundo plano.
+        
+        Args:
+            immediate: Lê o estado agora (ao fechar).
+        """
+        if self._save_after_id is not None:
+            self.root.after_cancel(self._save_after_id)
+            self._save_after_id = None
+        if immediate:
+            self._save_config_now()
+        else:
+            self._save_after_id = self.root.after(STORAGE_CONFIG['config_snapshot_ms'], self._save_config_now)
+    
+    def _save_config_now(self):
+        """Lê o estado da interface e entrega ao ConfigManager."""
+        self._save_after_id = None
         try:
             active_tab_name = self.tabview.get()
             tab_map = {
@@ -1240,24 +1341,31 @@ class GameAutomation:
             }
             active_tab = tab_map.get(active_tab_name, 0)
             
+            search = self.tab_search.get_data()
+            keys = self.tab_keys.get_data()
             config = {
                 'region': self.region,
-                'attributes': self.tab_values.get_entries_data(),
-                'search_attributes': self.tab_search.get_entries_data(),
-                'keys_attributes': self.tab_keys.get_entries_data(),
-                't7_config': self.tab_t7.get_entries_data(),
-                'skill_spam_config': self.tab_skill_spam.get_entries_data(),
+                'attributes': self.tab_values.get_data(),
+                'search_attributes': search['attributes'],
+                'keys_attributes': keys['attributes'],
+                't7_config': self.tab_t7.get_data(),
+                'skill_spam_config': self.tab_skill_spam.get_data(),
                 'delay': self.delay_var.get(),
                 'click_delay': self.click_delay_var.get(),
                 'max_attempts': self.max_attempts_var.get(),
                 'active_tab': active_tab,
-                'min_attributes_mode': self.tab_search.get_mode(),
-                'min_attributes_count': self.tab_search.get_min_count(),
-                'keys_min_mode': self.tab_keys.get_mode(),
-                'keys_min_count': self.tab_keys.get_min_count(),
+                'min_attributes_mode': search['mode'],
+                'min_attributes_count': search['min_count'],
+                'keys_min_mode': keys['mode'],
+                'keys_min_count': keys['min_count'],
                 'key_position': self.key_position,
                 'orb_position': self.orb_position,
                 'bp_position': self.bp_position,
+                'roll_jobs': self.roll_jobs,
+                'key_grid': self.key_grid,
+                'bp_grid': self.bp_grid,
+                'alternative_presets': self.alternative_presets,
+                'multi_item': self.multi_item_var.get(),
                 'hotkeys': self.hotkeys
             }
             
@@ -1266,10 +1374,16 @@ class GameAutomation:
         except Exception as e:
             self.log(f"⚠️ Erro ao salvar: {e}")
     
-    def load_config(self):
-        """Carrega configurações."""
+    def load_config(self, config=None):
+        """
+        Carrega configurações.
+        
+        Args:
+            config: Configurações já lidas (senão, lidas do disco).
+        """
         try:
-            config = self.config_manager.load_config()
+            if config is None:
+                config = self.config_manager.load_config()
             if not config:
                 self.log("📋 Nenhuma configuração anterior")
                 return
@@ -1291,59 +1405,50 @@ class GameAutomation:
             if config.get('max_attempts'):
                 self.max_attempts_var.set(config['max_attempts'])
             
-            # Atributos
+            # Atributos e modos (modelos das abas; os widgets vêm na primeira exibição)
             if config.get('attributes'):
-                self.tab_values.clear_entries()
-                for attr in config['attributes']:
-                    self.tab_values.add_row(attr.get('name', ''), attr.get('value', ''))
-                if not self.tab_values.entries:
-                    self.tab_values.add_row()
+                self.tab_values.load_data(config['attributes'])
             
+            search = self.tab_search.get_data()
             if config.get('search_attributes'):
-                self.tab_search.clear_entries()
-                for attr in config['search_attributes']:
-                    if isinstance(attr, str):
-                        self.tab_search.add_row(attr, False)
-                    else:
-                        self.tab_search.add_row(attr.get('name', ''), attr.get('required', False))
-                if not self.tab_search.entries:
-                    self.tab_search.add_row()
-            
-            if config.get('keys_attributes'):
-                self.tab_keys.clear_entries()
-                for attr in config['keys_attributes']:
-                    if isinstance(attr, str):
-                        self.tab_keys.add_row(attr, False)
-                    else:
-                        self.tab_keys.add_row(attr.get('name', ''), attr.get('required', False))
-                if not self.tab_keys.entries:
-                    self.tab_keys.add_row()
-            
-            # Modos
+                search['attributes'] = self._attribute_list(config['search_attributes'])
             if config.get('min_attributes_mode'):
-                self.tab_search.min_mode_var.set(config['min_attributes_mode'])
+                search['mode'] = config['min_attributes_mode']
             if config.get('min_attributes_count'):
-                self.tab_search.min_count_entry.delete(0, "end")
-                self.tab_search.min_count_entry.insert(0, config['min_attributes_count'])
+                search['min_count'] = config['min_attributes_count']
+            self.tab_search.load_data(search)
             
+            keys = self.tab_keys.get_data()
+            if config.get('keys_attributes'):
+                keys['attributes'] = self._attribute_list(config['keys_attributes'])
             if config.get('keys_min_mode'):
-                self.tab_keys.min_mode_var.set(config['keys_min_mode'])
+                keys['mode'] = config['keys_min_mode']
             if config.get('keys_min_count'):
-                self.tab_keys.min_count_entry.delete(0, "end")
-                self.tab_keys.min_count_entry.insert(0, config['keys_min_count'])
+                keys['min_count'] = config['keys_min_count']
+            self.tab_keys.load_data(keys)
             
             # Posições
             if config.get('key_position'):
                 self.key_position = tuple(config['key_position'])
-                self.tab_keys.key_capture.set_position(*self.key_position)
-            
             if config.get('orb_position'):
                 self.orb_position = tuple(config['orb_position'])
-                self.tab_keys.orb_capture.set_position(*self.orb_position)
-            
             if config.get('bp_position'):
                 self.bp_position = tuple(config['bp_position'])
-                self.tab_keys.bp_capture.set_position(*self.bp_position)
+            self._show_positions()
+            
+            # Grades de inventário (modo chaves em lote, editadas no JSON)
+            self.key_grid = config.get('key_grid')
+            self.bp_grid = config.get('bp_grid')
+            
+            # Presets também aceitos na mesma execução (editados no JSON)
+            alternatives = config.get('alternative_presets') or []
+            self.alternative_presets = dict(alternatives) if isinstance(alternatives, dict) else list(alternatives)
+            
+            # Multi-item
+            if config.get('roll_jobs'):
+                self.roll_jobs = list(config['roll_jobs'])
+                self._update_roll_jobs_label()
+            self.multi_item_var.set(bool(config.get('multi_item', False)))
             
             # Configuração T7
             if config.get('t7_config'):
@@ -1374,12 +1479,24 @@ class GameAutomation:
         except Exception as e:
             self.log(f"⚠️ Erro ao carregar: {e}")
     
+    @staticmethod
+    def _attribute_list(attributes):
+        """Normaliza atributos salvos (nomes soltos de versões antigas viram dicts)."""
+        return [
+            {'name': attr, 'required': False} if isinstance(attr, str) else attr
+            for attr in attributes
+        ]
+    
     # ============================================
     # MÉTODOS DE UI
     # ============================================
     
     def update_status(self, text, status_type='info'):
-        """Atualiza o status."""
+        """Atualiza o status (aplicado no próximo tick da fila de log)."""
+        self.log_pipeline.post_status(text, status_type)
+    
+    def _apply_status(self, text, status_type='info'):
+        """Aplica o status no label (thread do Tk)."""
         color_map = {
             'success': self.colors['success'],
             'warning': self.colors['warning'],
@@ -1400,22 +1517,34 @@ class GameAutomation:
         icon = icon_map.get(status_type, '●')
         
         self.status_label.configure(text=f"{icon} {text}", text_color=color)
-        self.root.update_idletasks()
     
     def log(self, message):
-        """Log mensagem."""
+        """Log mensagem (qualquer thread)."""
+        self.log_pipeline.post('main', message)
+    
+    def _write_log(self, records):
+        """Escreve um lote de mensagens no log principal (thread do Tk)."""
         try:
             if self.log_text:
-                timestamp = time.strftime("%H:%M:%S")
-                self.log_text.insert("end", f"[{timestamp}] {message}\n")
+                self.log_text.insert("end", "".join(
+                    f"[{time.strftime('%H:%M:%S', time.localtime(r.timestamp))}] {r.message}\n" for r in records
+                ))
                 self.log_text.see("end")
-                self.root.update_idletasks()
         except:
             pass
     
     def log_to_detail(self, message, tag='info'):
-        """Log na janela detalhada."""
-        self.log_window.log(message, tag)
+        """Log na janela detalhada (qualquer thread)."""
+        if self.log_window.visible:
+            self.log_pipeline.post('detail', message, tag)
+    
+    def detail_enabled(self):
+        """Retorna se a janela de log detalhado está aberta."""
+        return self.log_window.visible
+    
+    def notify(self, title, message):
+        """Mostra uma notificação do motor (agendada na thread do Tk)."""
+        self.root.after(0, lambda: messagebox.showinfo(title, message))
     
     def _toggle_theme(self):
         """Alterna tema."""
@@ -1444,8 +1573,9 @@ class GameAutomation:
         self.btn_test.configure(text=f"🔍 Testar Captura ({self.hotkeys['test']})")
         self.start_button.configure(text=f"▶ INICIAR ({self.hotkeys['start']})")
         self.stop_button.configure(text=f"⬛ PARAR ({self.hotkeys['stop']})")
-        self.tab_keys.update_instructions(self.hotkeys)
-        self.tab_t7.update_instructions(self.hotkeys)
+        for proxy in (self.tab_keys, self.tab_t7):
+            if proxy.built:
+                proxy.tab.update_instructions(self.hotkeys)
     
     def _check_updates_auto(self):
         """Verifica atualizações automaticamente ao iniciar."""
@@ -1520,8 +1650,53 @@ class GameAutomation:
         progress_dialog.destroy()
         messagebox.showerror("Erro", "Falha ao instalar atualização")
     
+    def _on_warmup_done(self, warmup):
+        """Mostra o resultado do aquecimento do OCR (thread do aquecimento)."""
+        if warmup.status == WARMUP_OK:
+            self.log(f"✓ {warmup.message}")
+        elif warmup.status == WARMUP_MISSING:
+            self.log(f"❌ {warmup.message}")
+            self.update_status("Tesseract não encontrado", 'danger')
+        else:
+            self.log(f"⚠️ {warmup.message}")
+            self.update_status("OCR com problema (veja o log)", 'warning')
+    
+    def toggle_profiling(self):
+        """Arma o profiling das próximas iterações (ou encerra o atual)."""
+        profiler = self.automation.profiler
+        was_active = profiler.active
+        if profiler.toggle():
+            self.log(f"🔬 Profiling ({profiler.mode}) das próximas {profiler.iterations} iterações")
+        elif was_active:
+            self.log("🔬 Profiling será encerrado na próxima iteração")
+        else:
+            self.log("🔬 Profiling cancelado")
+    
+    def _start_metrics_server(self):
+        """Sobe o endpoint de métricas com o jitter do skill spam."""
+        self.metrics_server = MetricsServer(self.automation)
+        self.metrics_server.add_collector(lambda writer: writer.summary(
+            'reroll_skill_spam_jitter_seconds', "Desvio do intervalo do skill spam.",
+            self.skill_spam_jitter, 'key'
+        ))
+        try:
+            print(f"📈 Métricas em {self.metrics_server.start()}")
+        except OSError as e:
+            print(f"⚠️ Servidor de métricas não iniciado: {e}")
+            self.metrics_server = None
+    
     def _on_closing(self):
         """Callback ao fechar."""
-        self.save_config()
+        if self.automation.is_alive():
+            # O loop grava o checkpoint da parada antes de sair
+            self.automation.stop()
+            self.automation.join(timeout=2)
+        self.save_config(immediate=True)
+        self.config_manager.flush()
+        self.preset_manager.flush()
         self.log("💾 Configurações salvas")
+        self.log_pipeline.stop()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        TRACER.save()
         self.root.destroy()
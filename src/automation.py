@@ -1,18 +1,40 @@
 """
 Módulo de automação.
 Contém a lógica dos loops de automação para cada modo.
+
+O motor não depende da interface: tudo que precisa vem de um RunSpec e os
+eventos saem por callbacks do host (GameAutomation ou o runner headless):
+log, log_to_detail, update_status, stop_automation e notify.
 """
 import time
 import threading
 import pyautogui
 import keyboard
-from tkinter import messagebox
 
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.ocr_engine import OCREngine
+from src.jobs import RollJob, JobScheduler, JOB_DONE, JOB_EXHAUSTED
+from src.matcher import compile_preset, compile_combined, CombinedMatcher
+from src.rules import compile_rule
+from src.checkpoint import CheckpointStore
+from src.cancellation import CancelToken, Cancelled
+from src.roll_stats import RollStatsStore, pool_for_mode, format_estimate
+from src.roll import Roll, RollHistory
+from src.eventlog import EventLog
+from src.instrumentation import Instruments
+from src.profiling import LoopProfiler
+from src.tracing import TRACER
+from src.presets import create_history_store
+from src.config import CHECKPOINT_CONFIG, GRID_CONFIG, ROLL_STATS_CONFIG
+from src.grid import InventoryGrid, BPSlots, detect_occupied, plan_route, offset_region
+from src.runspec import thaw
+
+
+# Orbs gastos em uma chave antes de passar para a próxima
+MAX_KEY_ROLLS = 100
 
 
 class AutomationEngine:
@@ -23,74 +45,482 @@ class AutomationEngine:
         Inicializa o motor de automação.
         
         Args:
-            app: Referência para a aplicação principal.
+            app: Host com os callbacks log, log_to_detail, update_status,
+                stop_automation e notify (GameAutomation ou HeadlessHost) e,
+                opcionalmente, detail_enabled.
         """
         self.app = app
-        self.ocr = OCREngine()
+        self.cancel = CancelToken()
+        self.ocr = OCREngine(self.cancel)
         self.is_running = False
+        self.spec = None
+        self.matcher = None
+        self.matched = None
+        self.metrics = {}
+        self.progress = {}
+        self.checkpoints = CheckpointStore()
+        self.roll_stats = RollStatsStore()
+        self.stats = None
+        self.history = RollHistory()
+        # Histórico persistente (só no backend SQLite)
+        self.history_store = create_history_store()
+        self.events = EventLog()
+        self.instruments = Instruments()
+        self.profiler = LoopProfiler()
+        # Contadores acumulados desde a abertura (endpoint de métricas)
+        self.totals = {'runs': 0, 'successes': 0, 'rolls': 0, 'captures': 0}
+        self._run_open = False
+        self._run_start_rolls = 0
+        self._rolls_since_estimate = 0
+        self._hopeless_warned = False
+        self._completed = False
+        self._last_checkpoint_rolls = 0
         self._thread = None
     
-    def start(self, mode):
+    def start(self, mode, spec, resume=None):
         """
         Inicia a automação no modo especificado.
         
         Args:
-            mode: Modo de automação ('values', 'attributes', 'keys').
+            mode: Modo de automação ('values', 'attributes', 'keys', 't7', 'jobs').
+            spec: RunSpec com região, delays, preset (ou regra) e posições.
+            resume: Checkpoint de onde retomar (ou None para começar do zero).
         """
         if self.is_running:
             return False
         
         self.is_running = True
+        self.spec = spec
+        self.matcher = self._compile_matcher(mode, spec)
+        self.matched = None
+        self.cancel = CancelToken()
+        self.ocr.cancel_token = self.cancel
+        self.progress = {
+            'attempts': 0,
+            'rolls': 0,
+            'keys_processed': 0,
+            'key_roll_attempt': 0,
+            'grid_done': [],
+            'jobs': [],
+        }
+        if resume:
+            self.progress.update(resume.get('progress', {}))
+        self._completed = False
+        self._last_checkpoint_rolls = self.progress['rolls']
+        self.stats = self.roll_stats.get(pool_for_mode(mode))
+        self.history = RollHistory()
+        self._rolls_since_estimate = 0
+        self._hopeless_warned = False
+        self.metrics = {
+            'mode': mode,
+            'rolls': self.progress['rolls'],
+            'captures': 0,
+            'success': False,
+            'started_at': time.time(),
+            'finished_at': None,
+        }
         
-        if mode == 'values':
-            self._thread = threading.Thread(target=self._loop_values, daemon=True)
-        elif mode == 'attributes':
-            self._thread = threading.Thread(target=self._loop_attributes, daemon=True)
-        elif mode == 'keys':
-            self._thread = threading.Thread(target=self._loop_keys, daemon=True)
-        elif mode == 't7':
-            self._thread = threading.Thread(target=self._loop_t7, daemon=True)
-        else:
+        session = f"{int(time.time())}-{mode}"
+        self.events.start(session=session)
+        self.profiler.session = session
+        if self.history_store is not None:
+            self.history_store.start()
+        self.ocr.events = self.events
+        self.instruments.reset()
+        self.ocr.instruments = self.instruments
+        self.totals['runs'] += 1
+        self._run_start_rolls = self.metrics['rolls']
+        self._run_open = True
+        self.events.emit(
+            'run_start', mode=mode, preset=spec.rule_name or spec.preset_name,
+            alternatives=len(spec.alternatives or ()), resume=bool(resume)
+        )
+        
+        if resume:
+            self.app.log(f"↩️ Retomando do checkpoint ({self.progress['attempts']} tentativas, {self.progress['rolls']} rolagens)")
+        
+        loops = {
+            'values': self._loop_values,
+            'attributes': self._loop_attributes,
+            'keys': self._loop_keys,
+            't7': self._loop_t7,
+            'jobs': self._loop_jobs,
+        }
+        if mode not in loops:
             self.is_running = False
             return False
         
+        self._thread = threading.Thread(target=self._run_loop, args=(loops[mode],), name='automation', daemon=True)
         self._thread.start()
         return True
     
+    def _compile_matcher(self, mode, spec):
+        """
+        Compila o alvo da execução: preset, regra ou conjunto de presets.
+        
+        Args:
+            mode: Modo de automação.
+            spec: RunSpec da execução.
+        
+        Returns:
+            PresetMatcher: Matcher do alvo (None no modo multi-item).
+        """
+        if mode == 'jobs':
+            return None
+        
+        if spec.alternatives:
+            primary = {
+                'name': spec.rule_name or spec.preset_name,
+                'tab_type': 'rules' if spec.rule else spec.tab_type,
+                'preset_data': spec.preset,
+                'rule_expression': spec.rule,
+            }
+            return compile_combined([primary] + list(spec.alternatives))
+        
+        if spec.rule:
+            return compile_rule(spec.rule)
+        return compile_preset(spec.tab_type, spec.preset)
+    
     def stop(self):
-        """Para a automação."""
+        """
+        Para a automação (qualquer thread; só sinaliza).
+        
+        As esperas acordam na hora com o cancelamento, e o checkpoint de uma
+        execução não concluída é gravado pela própria thread do loop ao sair:
+        use join() para aguardá-lo.
+        """
         self.is_running = False
-        time.sleep(0.1)  # Aguarda threads pararem
+        self.cancel.cancel()
+    
+    def is_alive(self):
+        """Retorna se a thread de automação ainda está rodando."""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def join(self, timeout=None):
+        """Aguarda a thread de automação terminar."""
+        if self._thread:
+            self._thread.join(timeout)
+    
+    def get_metrics(self):
+        """
+        Retorna as métricas da execução atual (ou da última).
+        
+        Returns:
+            dict: Rolagens, capturas, duração e rolagens por minuto.
+        """
+        metrics = dict(self.metrics)
+        if metrics:
+            end = metrics['finished_at'] or time.time()
+            metrics['elapsed'] = end - metrics['started_at']
+            metrics['rolls_per_minute'] = (
+                metrics['rolls'] * 60.0 / metrics['elapsed'] if metrics['elapsed'] > 0 else 0.0
+            )
+        return metrics
+    
+    def _run_loop(self, loop):
+        """Executa um loop de automação e mede a latência de parada."""
+        try:
+            loop()
+        except Cancelled:
+            pass
+        finally:
+            # Só esta thread mexe no progresso: o checkpoint da parada sai daqui
+            if not self._completed:
+                self._checkpoint(force=True)
+            if not self.metrics['finished_at']:
+                self.metrics['finished_at'] = time.time()
+            self._report_stop_latency()
+            self.roll_stats.save()
+            self._close_run_counters()
+            metrics = self.get_metrics()
+            self.events.emit('run_end', metrics=metrics)
+            self.events.flush()
+            if self.history_store is not None:
+                self.history_store.flush()
+            self._dump_instruments(metrics)
+            self._report_profile(self.profiler.finish())
+            TRACER.save()
+    
+    def counters(self):
+        """
+        Contadores acumulados desde a abertura, incluindo a execução atual.
+        
+        Returns:
+            dict: runs, successes, rolls e captures.
+        """
+        counters = dict(self.totals)
+        if self._run_open and self.metrics:
+            counters['rolls'] += self.metrics['rolls'] - self._run_start_rolls
+            counters['captures'] += self.metrics['captures']
+        return counters
+    
+    def _close_run_counters(self):
+        """Soma a execução que terminou aos contadores acumulados."""
+        if self._run_open:
+            self._run_open = False
+            self.totals['rolls'] += self.metrics['rolls'] - self._run_start_rolls
+            self.totals['captures'] += self.metrics['captures']
+    
+    def _profile_tick(self):
+        """Marca uma iteração para o profiler sob demanda."""
+        if self.profiler.active or self.profiler.armed:
+            self._report_profile(self.profiler.tick())
+    
+    def _report_profile(self, paths):
+        """Loga os arquivos gravados pelo profiler."""
+        if paths:
+            self.app.log(f"🔬 Profiling gravado: {', '.join(paths)}")
+    
+    def _dump_instruments(self, metrics):
+        """Loga a tabela de latência por etapa e grava o resumo em disco."""
+        if not self.instruments.histograms:
+            return
+        self.app.log_to_detail(self.instruments.format_table(metrics.get('rolls_per_minute')), 'info')
+        try:
+            self.instruments.dump(metrics=metrics)
+        except OSError as e:
+            print(f"Erro ao salvar latências: {e}")
+    
+    def _report_stop_latency(self):
+        """Registra quanto tempo a automação levou para parar após o stop."""
+        token = self.cancel
+        if token.cancelled_at is None or self._completed:
+            return
+        
+        exit_ms = (time.perf_counter() - token.cancelled_at) * 1000.0
+        self.metrics['stop_input_ms'] = token.stop_latency_ms()
+        self.metrics['stop_exit_ms'] = exit_ms
+        self.metrics['inputs_after_stop'] = token.inputs_after_cancel
+        self.app.log_to_detail(
+            f"⏱️ Parada: último input {self.metrics['stop_input_ms']:.1f} ms após o stop "
+            f"({token.inputs_after_cancel} input(s)), loop encerrado em {exit_ms:.1f} ms",
+            'info'
+        )
+    
+    def _observe_roll(self, values, tiers=None, remaining=None, matched=False):
+        """
+        Alimenta as estatísticas e o histórico com uma rolagem lida e loga a
+        estimativa.
+        
+        Args:
+            values: Roll (ou dicionário {nome_atributo: valor}) da rolagem.
+            tiers: Atributos com tier (se não vierem no Roll).
+            remaining: Tentativas que ainda restam para este preset.
+            matched: Se a rolagem atingiu o alvo (gravado com ela no histórico).
+        """
+        with self.instruments.span('stats'):
+            self.stats.observe(values, tiers)
+            roll = Roll.from_dict(values)
+            self.history.append(roll, matched)
+            if self.history_store is not None:
+                self.history_store.add(self.events.session, roll, matched)
+        self.events.emit('roll', values=values, tiers=tiers, remaining=remaining)
+        
+        # Regras e conjuntos de presets não têm estimativa analítica (use o simulador)
+        if matched or self.spec.rule or self.spec.alternatives:
+            return
+        
+        self._rolls_since_estimate += 1
+        if self._rolls_since_estimate < ROLL_STATS_CONFIG['report_every']:
+            return
+        self._rolls_since_estimate = 0
+        
+        estimate = self.stats.estimate(self.spec.tab_type, self.spec.preset, remaining)
+        self.metrics['p_match'] = estimate['p_match']
+        self.metrics['expected_attempts'] = estimate['expected_attempts']
+        unit = 'orbs' if self.spec.mode == 'keys' else 'tentativas'
+        self.app.log_to_detail(format_estimate(estimate, unit), 'info')
+        
+        if not estimate['hopeless'] or self._hopeless_warned:
+            return
+        self._hopeless_warned = True
+        
+        message = (
+            f"Chance de atingir o preset nas {remaining} {unit} restantes: "
+            f"{estimate['p_within_budget'] * 100:.2f}%"
+        )
+        self.app.log(f"⚠️ {message} - considere outro preset")
+        
+        if ROLL_STATS_CONFIG['auto_abort']:
+            self._finish("Preset Inviável", f"{message}\n\n{format_estimate(estimate, unit)}", success=False)
+            raise Cancelled()
+    
+    def _detail_enabled(self):
+        """Retorna se o host está exibindo o log detalhado."""
+        detail_enabled = getattr(self.app, 'detail_enabled', None)
+        return detail_enabled() if detail_enabled else True
+    
+    def _match(self, values, explain=True):
+        """
+        Avalia uma rolagem com o preset compilado.
+        
+        O texto explicativo só é montado quando o log detalhado está visível.
+        Com vários presets, guarda em self.matched qual deles foi atingido.
+        
+        Args:
+            values: Roll (ou dicionário {nome_atributo: valor}) lido pelo OCR.
+            explain: Se loga o texto explicativo.
+        
+        Returns:
+            bool: True se o preset foi atingido.
+        """
+        with self.instruments.span('match'):
+            if isinstance(self.matcher, CombinedMatcher):
+                self.matched = self.matcher.first(values)
+                found = self.matched is not None
+            else:
+                found = self.matcher.match(values)
+        
+        self.events.emit('decision', matched=found, preset=self.matched.name if self.matched else None)
+        if explain and self._detail_enabled():
+            with self.instruments.span('log'):
+                self.app.log_to_detail(self.matcher.explain(values), 'success' if found else 'warning')
+        if found and self.matched:
+            self.app.log_to_detail(f"📋 Preset atingido: {self.matched.name}", 'success')
+        return found
+    
+    def _find_t7(self, t7_attrs, tier_attrs=None):
+        """
+        Avalia uma rolagem do modo T7.
+        
+        Args:
+            t7_attrs: Atributos T7 lidos.
+            tier_attrs: Roll com todos os atributos com tier da rolagem.
+        
+        Returns:
+            dict: Atributo exibido como resultado ou None.
+        """
+        if not isinstance(self.matcher, CombinedMatcher):
+            with self.instruments.span('match'):
+                found = self.matcher.find(t7_attrs, tier_attrs)
+            self.events.emit('decision', matched=found is not None, t7=found)
+            return found
+        
+        roll = Roll.from_tier_attrs(t7_attrs) if tier_attrs is None else tier_attrs
+        with self.instruments.span('match'):
+            self.matched = self.matcher.first(roll, t7_attrs, roll)
+        self.events.emit('decision', matched=self.matched is not None, preset=self.matched.name if self.matched else None)
+        if self.matched is None:
+            return None
+        
+        self.app.log_to_detail(f"📋 Preset atingido: {self.matched.name}", 'success')
+        shown = t7_attrs or roll.tier_attrs()
+        return shown[0] if shown else {'name': self.matched.name, 'value': '✓'}
+    
+    def _bp_destination(self, bp_slots):
+        """
+        Destino da chave boa: a posição do preset atingido, se ele definir uma,
+        ou o próximo slot da BP.
+        
+        Args:
+            bp_slots: BPSlots da execução.
+        
+        Returns:
+            tuple: Posição (x, y) ou None se a BP estiver cheia.
+        """
+        if self.matched and self.matched.bp_position:
+            return self.matched.bp_position
+        return bp_slots.next_slot()
+    
+    def _wait(self, seconds):
+        """Espera interrompível (levanta Cancelled no stop)."""
+        with self.instruments.span('sleep'):
+            self.cancel.sleep(seconds)
+    
+    def _input(self, action, *args, **kwargs):
+        """Executa uma ação de input somente se a automação não foi parada."""
+        self.events.emit('input', action=getattr(action, '__name__', str(action)), args=args)
+        with self.instruments.span('input'):
+            return self.cancel.run_input(action, *args, **kwargs)
     
     def _get_delay(self):
         """Retorna o delay configurado."""
-        return float(self.app.delay_var.get())
+        return self.spec.delay
     
     def _get_click_delay(self):
         """Retorna o delay de click em segundos."""
-        return float(self.app.click_delay_var.get()) / 1000.0
+        return self.spec.click_delay
     
     def _get_max_attempts(self):
         """Retorna o número máximo de tentativas."""
-        return int(self.app.max_attempts_var.get())
+        return self.spec.max_attempts
+    
+    def _capture(self, region=None):
+        """Captura a região configurada (ou a região informada)."""
+        self._profile_tick()
+        self.metrics['captures'] += 1
+        region = region or self.spec.region
+        started = time.perf_counter()
+        image = self.ocr.capture_region(region)
+        elapsed = time.perf_counter() - started
+        self.instruments.record('capture', elapsed)
+        self.events.emit('capture', region=region, ms=elapsed * 1000.0)
+        return image
+    
+    def _checkpoint(self, force=False, **fields):
+        """
+        Atualiza o progresso e salva o checkpoint a cada N rolagens.
+        
+        Args:
+            force: Salva mesmo sem ter atingido o intervalo.
+            **fields: Campos do progresso a atualizar.
+        """
+        self.progress.update(fields)
+        self.progress['rolls'] = self.metrics.get('rolls', 0)
+        
+        interval = CHECKPOINT_CONFIG['interval_rolls']
+        if force or self.progress['rolls'] - self._last_checkpoint_rolls >= interval:
+            self._last_checkpoint_rolls = self.progress['rolls']
+            self.checkpoints.save(self.spec, dict(self.progress))
+    
+    def _complete(self):
+        """Marca a execução como concluída e descarta o checkpoint."""
+        self._completed = True
+        self.checkpoints.clear()
+    
+    def _finish(self, title, message, success=True):
+        """Encerra a execução e notifica o host."""
+        self._complete()
+        self.metrics['success'] = success
+        self.metrics['finished_at'] = time.time()
+        if success:
+            self.totals['successes'] += 1
+            TRACER.instant('preset atingido', 'decision', preset=self.matched.name if self.matched else None)
+        if success and self.matched:
+            self.metrics['matched_preset'] = self.matched.name
+            message = f"{message}\n\nPreset atingido: {self.matched.name}"
+        self.app.stop_automation()
+        self.app.notify(title, message)
+    
+    def _on_error(self, error):
+        """Loga um erro do loop (a execução continua)."""
+        self.app.log(f"Erro: {error}")
+        self.app.log_to_detail(f"❌ ERRO: {error}", 'error')
+        self.events.emit('error', error=str(error), type=type(error).__name__)
     
     def _do_shift_click(self):
         """Executa Shift+Click."""
         click_delay = self._get_click_delay()
+        self.events.emit('input', action='shift_click')
         
-        keyboard.press('shift')
-        time.sleep(click_delay)
-        pyautogui.mouseDown(button='left')
-        time.sleep(click_delay)
-        pyautogui.mouseUp(button='left')
-        time.sleep(click_delay)
-        keyboard.release('shift')
+        # Ação atômica: uma vez iniciado, o click termina (shift nunca fica preso)
+        with self.instruments.span('input'), self.cancel.guard():
+            keyboard.press('shift')
+            try:
+                time.sleep(click_delay)
+                pyautogui.mouseDown(button='left')
+                time.sleep(click_delay)
+                pyautogui.mouseUp(button='left')
+                time.sleep(click_delay)
+            finally:
+                keyboard.release('shift')
+        self.metrics['rolls'] += 1
     
     def _loop_values(self):
         """Loop de automação para busca por valores específicos."""
         delay = self._get_delay()
         max_attempts = self._get_max_attempts()
-        attempts = 0
+        attempts = self.progress['attempts']
         
         self.app.log("Iniciando automação (Busca por VALORES específicos)...")
         self.app.log_to_detail("="*60, 'header')
@@ -100,21 +530,20 @@ class AutomationEngine:
         while self.is_running and attempts < max_attempts:
             try:
                 # Captura a tela
-                screenshot = self.ocr.capture_region(self.app.region)
+                screenshot = self._capture()
                 text, current_values = self.ocr.extract_text_with_processing(screenshot)
                 
                 self.app.log_to_detail(f"\n--- Tentativa #{attempts + 1} ---", 'header')
                 
                 if not current_values:
                     self.app.log_to_detail("⏸️ Aguardando... Nenhum valor identificado", 'warning')
-                    time.sleep(0.5)
+                    self._wait(0.5)
                     continue
                 
                 self.app.log_to_detail(f"✓ Valores capturados: {current_values}", 'info')
-                
                 # Verifica se atingiu o alvo
-                reached, message = self.app.check_target_reached(current_values)
-                self.app.log_to_detail(message, 'success' if reached else 'warning')
+                reached = self._match(current_values)
+                self._observe_roll(current_values, remaining=max_attempts - attempts, matched=reached)
                 self.app.update_status(f"Tentativa {attempts + 1}: {'Atingido!' if reached else 'Continuando...'}")
                 
                 if reached:
@@ -126,34 +555,40 @@ class AutomationEngine:
                 self._do_shift_click()
                 self.app.log_to_detail(f"🖱️ Shift+Click (pos: {current_pos.x}, {current_pos.y})", 'info')
                 attempts += 1
+                self._checkpoint(attempts=attempts)
                 
-                time.sleep(delay)
+                self._wait(delay)
                 
                 # Verificação extra pós-click
-                if self._check_post_click_values():
+                values = self._check_post_click_values()
+                if values:
+                    self._observe_roll(values, remaining=max_attempts - attempts, matched=True)
                     self._on_success_values(attempts)
                     break
                 
             except Exception as e:
-                self.app.log(f"Erro: {e}")
-                self.app.log_to_detail(f"❌ ERRO: {e}", 'error')
-                time.sleep(delay)
+                self._on_error(e)
+                self._wait(delay)
         
         if attempts >= max_attempts:
             self._on_max_attempts(max_attempts)
     
     def _check_post_click_values(self):
-        """Verifica valores após o click."""
+        """
+        Verifica valores após o click.
+        
+        Returns:
+            dict: Valores lidos, se atingiram o preset (senão None).
+        """
         try:
-            screenshot = self.ocr.capture_region(self.app.region)
+            screenshot = self._capture()
             _, values = self.ocr.extract_text_with_processing(screenshot)
             
-            if values:
-                reached, _ = self.app.check_target_reached(values)
-                return reached
-        except:
+            if values and self._match(values, explain=False):
+                return values
+        except Exception:
             pass
-        return False
+        return None
     
     def _on_success_values(self, attempts):
         """Callback de sucesso para modo valores."""
@@ -161,14 +596,13 @@ class AutomationEngine:
         self.app.log_to_detail("\n" + "="*60, 'success')
         self.app.log_to_detail("🎉 SUCESSO! TODOS OS VALORES ATINGIDOS!", 'success')
         self.app.log_to_detail("="*60, 'success')
-        self.app.stop_automation()
-        messagebox.showinfo("Sucesso", f"Valores desejados atingidos!\n\nTentativas: {attempts}")
+        self._finish("Sucesso", f"Valores desejados atingidos!\n\nTentativas: {attempts}")
     
     def _loop_attributes(self):
         """Loop de automação para busca por presença de atributos."""
         delay = self._get_delay()
         max_attempts = self._get_max_attempts()
-        attempts = 0
+        attempts = self.progress['attempts']
         
         self.app.log("Iniciando automação (Busca por PRESENÇA de atributos)...")
         self.app.log_to_detail("="*60, 'header')
@@ -177,20 +611,19 @@ class AutomationEngine:
         
         while self.is_running and attempts < max_attempts:
             try:
-                screenshot = self.ocr.capture_region(self.app.region)
+                screenshot = self._capture()
                 _, current_values = self.ocr.extract_text_with_processing(screenshot)
                 
                 self.app.log_to_detail(f"\n--- Tentativa #{attempts + 1} ---", 'header')
                 
                 if not current_values:
                     self.app.log_to_detail("⏸️ Aguardando... Nenhum valor identificado", 'warning')
-                    time.sleep(0.5)
+                    self._wait(0.5)
                     continue
                 
                 self.app.log_to_detail(f"✓ Atributos encontrados: {list(current_values.keys())}", 'info')
-                
-                found, message = self.app.check_attributes_found(current_values)
-                self.app.log_to_detail(message, 'success' if found else 'warning')
+                found = self._match(current_values)
+                self._observe_roll(current_values, remaining=max_attempts - attempts, matched=found)
                 self.app.update_status(f"Tentativa {attempts + 1}: {'Todos encontrados!' if found else 'Procurando...'}")
                 
                 if found:
@@ -201,34 +634,40 @@ class AutomationEngine:
                 self._do_shift_click()
                 self.app.log_to_detail(f"🖱️ Shift+Click (pos: {current_pos.x}, {current_pos.y})", 'info')
                 attempts += 1
+                self._checkpoint(attempts=attempts)
                 
-                time.sleep(delay)
+                self._wait(delay)
                 
                 # Verificação extra
-                if self._check_post_click_attributes():
+                values = self._check_post_click_attributes()
+                if values:
+                    self._observe_roll(values, remaining=max_attempts - attempts, matched=True)
                     self._on_success_attributes(attempts)
                     break
                 
             except Exception as e:
-                self.app.log(f"Erro: {e}")
-                self.app.log_to_detail(f"❌ ERRO: {e}", 'error')
-                time.sleep(delay)
+                self._on_error(e)
+                self._wait(delay)
         
         if attempts >= max_attempts:
             self._on_max_attempts(max_attempts)
     
     def _check_post_click_attributes(self):
-        """Verifica atributos após o click."""
+        """
+        Verifica atributos após o click.
+        
+        Returns:
+            dict: Atributos lidos, se atingiram o preset (senão None).
+        """
         try:
-            screenshot = self.ocr.capture_region(self.app.region)
+            screenshot = self._capture()
             _, values = self.ocr.extract_text_with_processing(screenshot)
             
-            if values:
-                found, _ = self.app.check_attributes_found(values)
-                return found
-        except:
+            if values and self._match(values, explain=False):
+                return values
+        except Exception:
             pass
-        return False
+        return None
     
     def _on_success_attributes(self, attempts):
         """Callback de sucesso para modo atributos."""
@@ -236,15 +675,18 @@ class AutomationEngine:
         self.app.log_to_detail("\n" + "="*60, 'success')
         self.app.log_to_detail("🎉 SUCESSO! TODOS OS ATRIBUTOS ENCONTRADOS!", 'success')
         self.app.log_to_detail("="*60, 'success')
-        self.app.stop_automation()
-        messagebox.showinfo("Sucesso", f"Todos os atributos encontrados!\n\nTentativas: {attempts}")
+        self._finish("Sucesso", f"Todos os atributos encontrados!\n\nTentativas: {attempts}")
     
     def _loop_keys(self):
         """Loop de automação para rolagem de chaves."""
+        if self.spec.key_grid:
+            self._loop_keys_grid()
+            return
+        
         delay = self._get_delay()
         click_delay = self._get_click_delay()
         
-        keys_processed = 0
+        keys_processed = self.progress['keys_processed']
         empty_attempts = 0
         max_empty_attempts = 5
         
@@ -263,14 +705,14 @@ class AutomationEngine:
                     break
                 
                 # Move para posição da chave
-                pyautogui.moveTo(self.app.key_position[0], self.app.key_position[1])
-                time.sleep(0.5)
+                self._input(pyautogui.moveTo, self.spec.key_position[0], self.spec.key_position[1])
+                self._wait(0.5)
                 
                 if not self.is_running:
                     break
                 
                 # Captura atributos
-                screenshot = self.ocr.capture_region(self.app.region)
+                screenshot = self._capture()
                 _, current_values = self.ocr.extract_text_with_processing(screenshot)
                 
                 if not current_values:
@@ -281,14 +723,14 @@ class AutomationEngine:
                         self._on_keys_finished(keys_processed)
                         break
                     
-                    time.sleep(delay)
+                    self._wait(delay)
                     continue
                 
                 empty_attempts = 0
                 self.app.log_to_detail(f"✓ Atributos: {list(current_values.keys())}", 'info')
-                
-                found, message = self.app.check_keys_attributes(current_values)
-                self.app.log_to_detail(message, 'success' if found else 'warning')
+                found = self._match(current_values)
+                self._observe_roll(current_values, remaining=MAX_KEY_ROLLS - self.progress['key_roll_attempt'],
+                                   matched=found)
                 
                 if found:
                     # Chave boa - mover para BP
@@ -298,77 +740,94 @@ class AutomationEngine:
                     self.app.log("🎉 CHAVE BOA! Movendo para BP...")
                     self.app.log_to_detail("🎉 CHAVE PERFEITA! Movendo para BP...", 'success')
                     
-                    pyautogui.click(button='right')
-                    time.sleep(0.15)
+                    self._input(pyautogui.click, button='right')
+                    self._wait(0.15)
                     
                     if not self.is_running:
                         break
                     
                     # Drag and drop
-                    pyautogui.moveTo(self.app.key_position[0], self.app.key_position[1])
-                    time.sleep(0.1)
-                    pyautogui.mouseDown(button='left')
-                    time.sleep(0.1)
-                    pyautogui.moveTo(self.app.bp_position[0], self.app.bp_position[1], duration=0.3)
-                    time.sleep(0.1)
-                    pyautogui.mouseUp(button='left')
+                    self._drag_to_bp(self.spec.key_position, self._bp_destination(BPSlots(self.spec.bp_position)))
                     
                     keys_processed += 1
+                    self._checkpoint(force=True, keys_processed=keys_processed, key_roll_attempt=0)
                     self.app.update_status(f"Chaves processadas: {keys_processed}")
                     
-                    time.sleep(0.3)
-                    pyautogui.moveTo(self.app.key_position[0], self.app.key_position[1])
-                    time.sleep(delay)
+                    self._wait(0.3)
+                    self._input(pyautogui.moveTo, self.spec.key_position[0], self.spec.key_position[1])
+                    self._wait(delay)
                     
                 else:
                     # Chave ruim - rolar
                     self._roll_key(delay, click_delay, keys_processed)
+                    self._checkpoint(force=True, keys_processed=keys_processed, key_roll_attempt=0)
                 
             except Exception as e:
-                self.app.log(f"Erro: {e}")
-                self.app.log_to_detail(f"❌ ERRO: {e}", 'error')
-                time.sleep(delay)
+                self._on_error(e)
+                self._wait(delay)
         
         if keys_processed > 0:
             self.app.log(f"✓ Automação concluída! {keys_processed} chave(s) processada(s)")
     
-    def _roll_key(self, delay, click_delay, keys_processed):
-        """Rola uma chave com Orb of Chance."""
+    def _roll_key(self, delay, click_delay, keys_processed, key_pos=None, region=None, bp_slots=None):
+        """
+        Rola uma chave com Orb of Chance.
+        
+        Retoma a contagem de rolagens da chave atual se a execução veio de
+        um checkpoint.
+        
+        Args:
+            delay: Delay entre rolagens.
+            click_delay: Delay do click.
+            keys_processed: Chaves processadas até agora.
+            key_pos: Posição da chave (padrão: key_position do spec).
+            region: Região do tooltip (padrão: região do spec).
+            bp_slots: Destinos na BP (padrão: bp_position do spec).
+        
+        Returns:
+            bool: True se a chave atingiu o preset e foi movida para a BP.
+        """
+        key_pos = key_pos or self.spec.key_position
+        bp_slots = bp_slots or BPSlots(self.spec.bp_position)
+        saved = False
+        
         self.app.log_to_detail("❌ Atributos não desejados. Rolando...", 'info')
         
         # Clica no Orb
-        pyautogui.moveTo(self.app.orb_position[0], self.app.orb_position[1])
-        time.sleep(0.1)
-        pyautogui.click(button='right')
-        time.sleep(0.2)
+        self._input(pyautogui.moveTo, self.spec.orb_position[0], self.spec.orb_position[1])
+        self._wait(0.1)
+        self._input(pyautogui.click, button='right')
+        self._wait(0.2)
         
-        max_roll_attempts = 100
-        roll_attempt = 0
+        max_roll_attempts = MAX_KEY_ROLLS
+        roll_attempt = self.progress.get('key_roll_attempt', 0)
         
         while self.is_running and roll_attempt < max_roll_attempts:
             if not self.is_running:
                 break
             
-            pyautogui.moveTo(self.app.key_position[0], self.app.key_position[1])
-            time.sleep(0.05)
+            self._input(pyautogui.moveTo, key_pos[0], key_pos[1])
+            self._wait(0.05)
             
             self._do_shift_click()
             roll_attempt += 1
+            self._checkpoint(key_roll_attempt=roll_attempt)
             
-            time.sleep(delay)
+            self._wait(delay)
             
             if not self.is_running:
                 break
             
             # Verifica atributos
-            pyautogui.moveTo(self.app.key_position[0], self.app.key_position[1])
-            time.sleep(0.5)
+            self._input(pyautogui.moveTo, key_pos[0], key_pos[1])
+            self._wait(0.5)
             
-            screenshot = self.ocr.capture_region(self.app.region)
+            screenshot = self._capture(region)
             _, values = self.ocr.extract_text_with_processing(screenshot)
             
             if values:
-                found, msg = self.app.check_keys_attributes(values)
+                found = self._match(values, explain=False)
+                self._observe_roll(values, remaining=max_roll_attempts - roll_attempt, matched=found)
                 
                 if roll_attempt % 10 == 0:
                     self.app.log_to_detail(f"  Roll #{roll_attempt}: {list(values.keys())}", 'info')
@@ -380,43 +839,182 @@ class AutomationEngine:
                     self.app.log(f"🎉 ATRIBUTOS CONSEGUIDOS após {roll_attempt} rolagens!")
                     self.app.log_to_detail(f"🎉 SUCESSO após {roll_attempt} rolagens!", 'success')
                     
-                    pyautogui.click(button='right')
-                    time.sleep(0.15)
+                    self._input(pyautogui.click, button='right')
+                    self._wait(0.15)
                     
                     if not self.is_running:
                         break
                     
                     # Mover para BP
-                    pyautogui.moveTo(self.app.key_position[0], self.app.key_position[1])
-                    time.sleep(0.1)
-                    pyautogui.mouseDown(button='left')
-                    time.sleep(0.1)
-                    pyautogui.moveTo(self.app.bp_position[0], self.app.bp_position[1], duration=0.3)
-                    time.sleep(0.1)
-                    pyautogui.mouseUp(button='left')
+                    self._drag_to_bp(key_pos, self._bp_destination(bp_slots))
                     
                     self.app.log("✓ Chave BOA salva na BP!")
+                    saved = True
                     
-                    time.sleep(0.3)
-                    pyautogui.moveTo(self.app.key_position[0], self.app.key_position[1])
+                    self._wait(0.3)
+                    self._input(pyautogui.moveTo, key_pos[0], key_pos[1])
                     break
         
         if roll_attempt >= max_roll_attempts:
             self.app.log(f"⚠️ Limite de {max_roll_attempts} rolagens atingido")
             
             # Desseleciona o orb antes de continuar para próxima chave
-            pyautogui.click(button='right')
-            time.sleep(0.15)
+            self._input(pyautogui.click, button='right')
+            self._wait(0.15)
+        
+        self._wait(delay * 0.5)
+        return saved
+    
+    def _drag_to_bp(self, key_pos, bp_pos):
+        """Arrasta a chave da posição atual para a BP."""
+        self._input(pyautogui.moveTo, key_pos[0], key_pos[1])
+        self._wait(0.1)
+        
+        # Ação atômica: um arrasto interrompido deixaria a chave presa no cursor
+        with self.cancel.guard():
+            pyautogui.mouseDown(button='left')
+            try:
+                time.sleep(0.1)
+                pyautogui.moveTo(bp_pos[0], bp_pos[1], duration=0.3)
+                time.sleep(0.1)
+            finally:
+                pyautogui.mouseUp(button='left')
+    
+    def _loop_keys_grid(self):
+        """Loop de chaves em lote: percorre as chaves de uma grade de inventário."""
+        delay = self._get_delay()
+        click_delay = self._get_click_delay()
+        grid = InventoryGrid.from_dict(thaw(self.spec.key_grid))
+        bp_grid = InventoryGrid.from_dict(thaw(self.spec.bp_grid))
+        
+        self.app.log("Iniciando automação de CHAVES (grade)...")
+        self.app.log_to_detail("="*60, 'header')
+        self.app.log_to_detail(f"🔑 AUTOMAÇÃO DE CHAVES - GRADE {grid.rows}x{grid.cols}", 'header')
+        self.app.log_to_detail("="*60, 'header')
+        
+        # Uma captura da grade inteira detecta todos os slots ocupados
+        try:
+            occupied = detect_occupied(self._capture(grid.bounds()), grid)
+            if bp_grid:
+                bp_slots = BPSlots.scan(self.spec.bp_position, bp_grid, self._capture(bp_grid.bounds()))
+            else:
+                bp_slots = BPSlots(self.spec.bp_position)
+        except Exception as e:
+            self._on_error(e)
+            self.app.stop_automation()
+            return
+        
+        done = [tuple(cell) for cell in self.progress.get('grid_done', [])]
+        pending = [cell for cell in occupied if cell not in done]
+        route = plan_route(grid, pending, tuple(pyautogui.position()))
+        
+        self.app.log(f"🗺️ {len(occupied)} chave(s) na grade, {len(route)} pendente(s)")
+        if bp_grid:
+            self.app.log_to_detail(f"🎒 {bp_slots.remaining()} slot(s) livre(s) na BP", 'info')
+        
+        keys_processed = self.progress['keys_processed']
+        keys_saved = 0
+        
+        for cell in route:
+            if not self.is_running:
+                break
+            
+            if bp_slots.remaining() == 0:
+                self.app.log("⚠️ BP cheia")
+                break
+            
+            position = grid.cell_center(cell)
+            region = offset_region(self.spec.region, self.spec.key_position, position)
+            
+            self.app.log(f"🔍 Processando chave #{keys_processed + 1} (slot {cell[0] + 1},{cell[1] + 1})...")
+            self.app.log_to_detail(f"\n{'='*50}", 'header')
+            self.app.log_to_detail(f"🔍 CHAVE #{keys_processed + 1} - SLOT {cell[0] + 1},{cell[1] + 1}", 'header')
+            
+            try:
+                if self._process_grid_key(position, region, bp_slots, delay, click_delay, keys_processed):
+                    keys_saved += 1
+            except Exception as e:
+                self._on_error(e)
+                self._wait(delay)
+            
+            if not self.is_running:
+                break
+            
+            done.append(cell)
+            keys_processed += 1
+            self._checkpoint(force=True, keys_processed=keys_processed, key_roll_attempt=0,
+                             grid_done=[list(c) for c in done])
+            self.app.update_status(f"Chaves processadas: {keys_processed}/{len(occupied)}")
         
-        time.sleep(delay * 0.5)
+        if not self.is_running:
+            return
+        
+        self.app.log(f"✓ Grade concluída! {keys_processed} chave(s) verificada(s), {keys_saved} na BP")
+        self.app.log_to_detail("\n" + "="*60, 'success')
+        self.app.log_to_detail("🎉 GRADE CONCLUÍDA", 'success')
+        self.app.log_to_detail("="*60, 'success')
+        self._finish(
+            "Automação Concluída",
+            f"Chaves verificadas: {keys_processed}\nChaves boas na BP: {keys_saved}"
+        )
+    
+    def _process_grid_key(self, position, region, bp_slots, delay, click_delay, keys_processed):
+        """
+        Verifica uma chave da grade e rola se necessário.
+        
+        Args:
+            position: Centro (x, y) do slot.
+            region: Região do tooltip para este slot.
+            bp_slots: Destinos na BP.
+            delay: Delay entre rolagens.
+            click_delay: Delay do click.
+            keys_processed: Chaves processadas até agora.
+        
+        Returns:
+            bool: True se a chave terminou na BP.
+        """
+        current_values = None
+        for _ in range(1 + GRID_CONFIG['empty_retries']):
+            self._input(pyautogui.moveTo, position[0], position[1])
+            self._wait(GRID_CONFIG['hover_delay'])
+            
+            if not self.is_running:
+                return False
+            
+            _, current_values = self.ocr.extract_text_with_processing(self._capture(region))
+            if current_values:
+                break
+        
+        if not current_values:
+            self.app.log_to_detail("⚠️ Nenhum atributo - slot ignorado", 'warning')
+            return False
+        
+        self.app.log_to_detail(f"✓ Atributos: {list(current_values.keys())}", 'info')
+        found = self._match(current_values)
+        self._observe_roll(current_values, remaining=MAX_KEY_ROLLS - self.progress['key_roll_attempt'], matched=found)
+        
+        if not found:
+            return self._roll_key(delay, click_delay, keys_processed, position, region, bp_slots)
+        
+        self.app.log("🎉 CHAVE BOA! Movendo para BP...")
+        self.app.log_to_detail("🎉 CHAVE PERFEITA! Movendo para BP...", 'success')
+        
+        self._input(pyautogui.click, button='right')
+        self._wait(0.15)
+        
+        if not self.is_running:
+            return False
+        
+        self._drag_to_bp(position, self._bp_destination(bp_slots))
+        self._wait(0.3)
+        return True
     
     def _on_keys_finished(self, keys_processed):
         """Callback quando as chaves acabam."""
         self.app.log("⚠️ Chaves acabaram")
         self.app.log_to_detail("\n" + "="*60, 'warning')
         self.app.log_to_detail("⚠️ CHAVES ACABARAM", 'warning')
-        self.app.stop_automation()
-        messagebox.showinfo(
+        self._finish(
             "Automação Concluída",
             f"Chaves processadas: {keys_processed}\n\nNão foi possível detectar mais atributos."
         )
@@ -425,19 +1023,25 @@ class AutomationEngine:
         """Callback quando atinge máximo de tentativas."""
         self.app.log(f"⚠ Máximo de tentativas ({max_attempts}) atingido")
         self.app.log_to_detail(f"\n⚠️ Máximo de tentativas ({max_attempts}) atingido", 'warning')
+        self._complete()
+        self.metrics['finished_at'] = time.time()
         self.app.stop_automation()
     
     def _loop_t7(self):
         """Loop de automação para busca por atributos T7."""
         delay = self._get_delay()
         max_attempts = self._get_max_attempts()
-        attempts = 0
+        attempts = self.progress['attempts']
         
-        # Pega configurações da aba T7
-        t7_mode = self.app.tab_t7.get_mode()
-        specific_attrs = self.app.tab_t7.get_specific_attributes()
+        # Pega configurações do preset T7
+        preset = self.spec.preset or {}
+        t7_mode = preset.get('mode', 'ANY')
+        specific_attrs = [a.strip().lower() for a in preset.get('specific_attributes', ())]
         
-        mode_text = "QUALQUER T7" if t7_mode == "ANY" else f"T7 em: {', '.join(specific_attrs)}"
+        if self.spec.rule:
+            mode_text = f"REGRA: {self.spec.rule}"
+        else:
+            mode_text = "QUALQUER T7" if t7_mode == "ANY" else f"T7 em: {', '.join(specific_attrs)}"
         
         self.app.log(f"Iniciando automação T7 ({mode_text})...")
         self.app.log_to_detail("="*60, 'header')
@@ -447,7 +1051,7 @@ class AutomationEngine:
         while self.is_running and attempts < max_attempts:
             try:
                 # Captura a tela
-                screenshot = self.ocr.capture_region(self.app.region)
+                screenshot = self._capture()
                 
                 # Tenta múltiplos métodos de OCR para melhor resultado
                 from PIL import ImageEnhance, ImageOps
@@ -487,6 +1091,9 @@ class AutomationEngine:
                 
                 self.app.log_to_detail(f"\n--- Tentativa #{attempts + 1} ---", 'header')
                 
+                # Rolagem compacta (atributo repetido fica com o maior tier)
+                roll = Roll.from_tier_attrs(all_tiers + t7_attrs)
+                
                 # Mostra todos os tiers encontrados
                 if all_tiers:
                     for attr in all_tiers:
@@ -503,26 +1110,11 @@ class AutomationEngine:
                 else:
                     self.app.log_to_detail("  (nenhum atributo com tier detectado)", 'warning')
                 
-                # Verifica se encontrou T7
-                found_t7 = False
-                found_attr = None
-                
-                if t7_attrs:
-                    if t7_mode == "ANY":
-                        # Qualquer T7 serve
-                        found_t7 = True
-                        found_attr = t7_attrs[0]
-                    else:
-                        # Precisa ser T7 de atributo específico
-                        for t7 in t7_attrs:
-                            attr_name = t7['name'].lower()
-                            for specific in specific_attrs:
-                                if specific in attr_name or attr_name in specific:
-                                    found_t7 = True
-                                    found_attr = t7
-                                    break
-                            if found_t7:
-                                break
+                # Verifica se encontrou T7 (qualquer um ou de atributo específico)
+                found_attr = self._find_t7(t7_attrs, roll)
+                found_t7 = found_attr is not None
+                if all_tiers:
+                    self._observe_roll(roll, remaining=max_attempts - attempts, matched=found_t7)
                 
                 if t7_attrs:
                     self.app.log_to_detail(f"🎯 T7 DETECTADO!", 'success')
@@ -540,50 +1132,44 @@ class AutomationEngine:
                 self._do_shift_click()
                 self.app.log_to_detail(f"🖱️ Shift+Click (pos: {current_pos.x}, {current_pos.y})", 'info')
                 attempts += 1
+                self._checkpoint(attempts=attempts)
                 
-                time.sleep(delay)
+                self._wait(delay)
                 
                 # Verificação extra pós-click
-                if self._check_post_click_t7(t7_mode, specific_attrs):
-                    # Recaptura para pegar o atributo
-                    screenshot = self.ocr.capture_region(self.app.region)
-                    _, t7_attrs = self.ocr.extract_t7_attributes(screenshot)
-                    if t7_attrs:
-                        self._on_success_t7(attempts, t7_attrs[0])
-                    else:
-                        self._on_success_t7(attempts, {'name': 'desconhecido', 'value': '?'})
+                found = self._check_post_click_t7()
+                if found:
+                    roll, found_attr = found
+                    self._observe_roll(roll, remaining=max_attempts - attempts, matched=True)
+                    self._on_success_t7(attempts, found_attr)
                     break
                 
             except Exception as e:
-                self.app.log(f"Erro: {e}")
-                self.app.log_to_detail(f"❌ ERRO: {e}", 'error')
-                time.sleep(delay)
+                self._on_error(e)
+                self._wait(delay)
         
         if attempts >= max_attempts:
             self._on_max_attempts(max_attempts)
     
-    def _check_post_click_t7(self, t7_mode, specific_attrs):
-        """Verifica se encontrou T7 após o click."""
+    def _check_post_click_t7(self):
+        """
+        Verifica se encontrou T7 após o click.
+        
+        Returns:
+            tuple: (Roll lido, atributo exibido) se atingiu, senão None.
+        """
         try:
-            screenshot = self.ocr.capture_region(self.app.region)
-            _, t7_attrs = self.ocr.extract_t7_attributes(screenshot)
+            screenshot = self._capture()
+            text, t7_attrs = self.ocr.extract_t7_attributes(screenshot)
             
-            if not t7_attrs:
-                return False
-            
-            if t7_mode == "ANY":
-                return True
-            
-            # Verifica se é o T7 específico
-            for t7 in t7_attrs:
-                attr_name = t7['name'].lower()
-                for specific in specific_attrs:
-                    if specific in attr_name or attr_name in specific:
-                        return True
-            
-            return False
-        except:
-            return False
+            # Os demais tiers saem do mesmo texto (sem outra passada de OCR)
+            roll = Roll.from_tier_attrs(self.ocr.extract_attributes_with_tiers(text) + t7_attrs)
+            found_attr = self._find_t7(t7_attrs, roll)
+            if found_attr is not None:
+                return roll, found_attr
+        except Exception:
+            pass
+        return None
     
     def _on_success_t7(self, attempts, t7_attr):
         """Callback de sucesso para modo T7."""
@@ -595,10 +1181,76 @@ class AutomationEngine:
         self.app.log_to_detail(f"⭐ T7 ENCONTRADO: {attr_name}: +{attr_value}", 'success')
         self.app.log_to_detail(f"🎉 SUCESSO após {attempts} tentativas!", 'success')
         self.app.log_to_detail("="*60, 'success')
-        self.app.stop_automation()
-        messagebox.showinfo(
+        self._finish(
             "⭐ T7 Encontrado!",
             f"Atributo T7 encontrado!\n\n"
             f"T7 {attr_name}: +{attr_value}\n\n"
             f"Tentativas: {attempts}"
         )
+
+    
+    def _loop_jobs(self):
+        """Loop de automação multi-item (vários itens intercalados)."""
+        max_attempts = self._get_max_attempts()
+        
+        try:
+            jobs = [RollJob.from_dict(data, None, max_attempts) for data in self.spec.jobs]
+            for job, saved in zip(jobs, self.progress['jobs']):
+                job.attempts = saved.get('attempts', 0)
+                if saved.get('state') in (JOB_DONE, JOB_EXHAUSTED):
+                    job.state = saved['state']
+        except Exception as e:
+            self._on_error(e)
+            self.app.stop_automation()
+            return
+        
+        self.app.log(f"Iniciando automação MULTI-ITEM ({len(jobs)} itens)...")
+        self.app.log_to_detail("="*60, 'header')
+        self.app.log_to_detail(f"🧩 AUTOMAÇÃO MULTI-ITEM INICIADA - {len(jobs)} ITENS", 'header')
+        for job in jobs:
+            self.app.log_to_detail(f"  • {job.name}: preset '{job.preset_name}' ({job.tab_type})", 'info')
+        self.app.log_to_detail("="*60, 'header')
+        
+        scheduler = JobScheduler(
+            jobs, self.ocr,
+            delay=self._get_delay(),
+            click_delay=self._get_click_delay(),
+            log=self.app.log,
+            log_detail=self.app.log_to_detail,
+            detail_enabled=self._detail_enabled,
+            update_status=self.app.update_status,
+            on_roll=lambda: self._checkpoint_jobs(scheduler),
+            cancel=self.cancel,
+            events=self.events,
+            history_store=self.history_store,
+            session=self.events.session
+        )
+        scheduler.total_rolls = self.metrics['rolls']
+        done = scheduler.run(lambda: self.is_running)
+        self.metrics['rolls'] = scheduler.total_rolls
+        
+        if not self.is_running:
+            return
+        
+        summary = "\n".join(
+            f"{'✓' if job in done else '⚠'} {job.name}: {job.attempts} tentativas"
+            for job in jobs
+        )
+        self.app.log(f"✓ Multi-item concluído: {len(done)}/{len(jobs)} itens ({scheduler.rolls_per_minute():.0f} rolagens/min)")
+        self.app.log_to_detail("\n" + "="*60, 'success')
+        self.app.log_to_detail(f"🎉 MULTI-ITEM CONCLUÍDO: {len(done)}/{len(jobs)} ITENS", 'success')
+        self.app.log_to_detail(summary, 'info')
+        self.app.log_to_detail("="*60, 'success')
+        self._finish(
+            "Multi-item Concluído",
+            f"Itens atingidos: {len(done)}/{len(jobs)}\n\n{summary}",
+            success=len(done) == len(jobs)
+        )
+    
+    def _checkpoint_jobs(self, scheduler):
+        """Salva o progresso de cada item do multi-item."""
+        self._profile_tick()
+        self.metrics['rolls'] = scheduler.total_rolls
+        self._checkpoint(jobs=[
+            {'attempts': job.attempts, 'state': job.state} for job in scheduler.jobs
+        ])
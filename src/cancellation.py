@@ -0,0 +1,115 @@
+"""
+Módulo de cancelamento cooperativo.
+Um CancelToken (baseado em threading.Event) é passado para o motor, o
+agendador multi-item e o OCR: toda espera vira event.wait(timeout), toda ação
+de input é verificada antes de executar e o tesseract em andamento é
+encerrado, então o F6 para a automação em milissegundos.
+"""
+import time
+import threading
+import contextlib
+
+
+class Cancelled(BaseException):
+    """
+    Levantada quando a automação é cancelada.
+    
+    Herda de BaseException (como KeyboardInterrupt) para atravessar os
+    'except Exception' dos loops sem ser tratada como erro de rolagem.
+    """
+
+
+class CancelToken:
+    """Token de cancelamento compartilhado entre as threads da automação."""
+    
+    def __init__(self):
+        self._event = threading.Event()
+        self.cancelled_at = None
+        self.last_input_at = None
+        self.inputs_after_cancel = 0
+    
+    def cancel(self):
+        """Sinaliza o cancelamento (idempotente)."""
+        if not self._event.is_set():
+            self.cancelled_at = time.perf_counter()
+            self._event.set()
+    
+    def is_cancelled(self):
+        """Retorna se o cancelamento foi sinalizado."""
+        return self._event.is_set()
+    
+    def check(self):
+        """Levanta Cancelled se o cancelamento foi sinalizado."""
+        if self._event.is_set():
+            raise Cancelled()
+    
+    def wait(self, timeout):
+        """
+        Espera até timeout segundos ou até o cancelamento.
+        
+        Args:
+            timeout: Tempo máximo de espera (s).
+        
+        Returns:
+            bool: True se foi cancelado durante a espera.
+        """
+        return self._event.wait(timeout if timeout and timeout > 0 else 0)
+    
+    def sleep(self, seconds):
+        """
+        Substituto de time.sleep que acorda imediatamente no cancelamento.
+        
+        Args:
+            seconds: Tempo de espera (s).
+        
+        Raises:
+            Cancelled: Se o cancelamento for sinalizado antes ou durante a espera.
+        """
+        if self._event.wait(seconds if seconds and seconds > 0 else 0):
+            raise Cancelled()
+    
+    def run_input(self, action, *args, **kwargs):
+        """
+        Executa uma ação de input (mouse/teclado) somente se não cancelado.
+        
+        Args:
+            action: Função de input (ex: pyautogui.moveTo).
+            *args, **kwargs: Argumentos da ação.
+        
+        Returns:
+            Retorno da ação.
+        
+        Raises:
+            Cancelled: Se o cancelamento já foi sinalizado.
+        """
+        self.check()
+        result = action(*args, **kwargs)
+        self._record_input()
+        return result
+    
+    @contextlib.contextmanager
+    def guard(self):
+        """Contexto para um bloco de input: verifica antes e registra depois."""
+        self.check()
+        yield
+        self._record_input()
+    
+    def _record_input(self):
+        """Registra o horário da última ação de input."""
+        self.last_input_at = time.perf_counter()
+        if self.cancelled_at is not None and self.last_input_at >= self.cancelled_at:
+            self.inputs_after_cancel += 1
+    
+    def stop_latency_ms(self):
+        """
+        Mede o atraso entre o cancelamento e a última ação de input.
+        
+        Returns:
+            float: Milissegundos (0.0 se nenhum input ocorreu após o cancelamento)
+                ou None se não houve cancelamento.
+        """
+        if self.cancelled_at is None:
+            return None
+        if self.last_input_at is None or self.last_input_at < self.cancelled_at:
+            return 0.0
+        return (self.last_input_at - self.cancelled_at) * 1000.0
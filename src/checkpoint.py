@@ -0,0 +1,132 @@
+"""
+Módulo de checkpoint de sessão.
+Salva o progresso de uma execução longa (tentativas, rolagens, chaves
+processadas e estado da chave atual) em um arquivo pequeno, para retomar
+depois de uma queda ou de uma parada com F6.
+"""
+import os
+import json
+import time
+import hashlib
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import CHECKPOINT_FILE, CHECKPOINT_CONFIG
+from src.runspec import thaw
+from src.storage import atomic_write_json, read_json
+
+
+def spec_fingerprint(spec):
+    """
+    Gera a identidade de uma execução: mesmo modo, preset, região, posições e grades.
+    
+    Args:
+        spec: RunSpec da execução.
+    
+    Returns:
+        str: Hash hexadecimal estável.
+    """
+    identity = {
+        'mode': spec.mode,
+        'preset_name': spec.preset_name,
+        'preset': thaw(spec.preset),
+        'region': thaw(spec.region),
+        'key_position': thaw(spec.key_position),
+        'orb_position': thaw(spec.orb_position),
+        'bp_position': thaw(spec.bp_position),
+        'jobs': thaw(spec.jobs),
+    }
+    if spec.key_grid:
+        identity['key_grid'] = thaw(spec.key_grid)
+    if spec.bp_grid:
+        identity['bp_grid'] = thaw(spec.bp_grid)
+    if spec.rule:
+        identity['rule'] = spec.rule
+    if spec.alternatives:
+        identity['alternatives'] = thaw(spec.alternatives)
+    encoded = json.dumps(identity, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()
+
+
+class CheckpointStore:
+    """Armazena o checkpoint da sessão em um arquivo JSON."""
+    
+    def __init__(self, checkpoint_file=None):
+        self.checkpoint_file = checkpoint_file or CHECKPOINT_FILE
+    
+    def save(self, spec, progress):
+        """
+        Salva o progresso atual (escrita atômica).
+        
+        Args:
+            spec: RunSpec da execução.
+            progress: Dict com o progresso (tentativas, rolagens, etc).
+        """
+        try:
+            atomic_write_json(self.checkpoint_file, {
+                'fingerprint': spec_fingerprint(spec),
+                'mode': spec.mode,
+                'preset_name': spec.preset_name,
+                'region': thaw(spec.region),
+                'saved_at': time.time(),
+                'progress': progress,
+            })
+        except Exception as e:
+            print(f"Erro ao salvar checkpoint: {e}")
+    
+    def load_matching(self, spec):
+        """
+        Retorna o checkpoint salvo se ele for da mesma execução.
+        
+        Args:
+            spec: RunSpec da execução que vai começar.
+        
+        Returns:
+            dict: Checkpoint salvo ou None.
+        """
+        try:
+            checkpoint = read_json(self.checkpoint_file)
+        except Exception as e:
+            print(f"Erro ao carregar checkpoint: {e}")
+            return None
+        
+        if not checkpoint or checkpoint.get('fingerprint') != spec_fingerprint(spec):
+            return None
+        
+        max_age = CHECKPOINT_CONFIG['max_age_hours'] * 3600
+        if time.time() - checkpoint.get('saved_at', 0) > max_age:
+            return None
+        
+        return checkpoint
+    
+    def clear(self):
+        """Remove o checkpoint (execução concluída)."""
+        try:
+            if os.path.exists(self.checkpoint_file):
+                os.remove(self.checkpoint_file)
+        except OSError as e:
+            print(f"Erro ao remover checkpoint: {e}")
+
+
+def describe_checkpoint(checkpoint):
+    """
+    Descreve um checkpoint para o usuário.
+    
+    Args:
+        checkpoint: Checkpoint carregado.
+    
+    Returns:
+        str: Resumo legível.
+    """
+    progress = checkpoint.get('progress', {})
+    saved = time.strftime('%d/%m %H:%M', time.localtime(checkpoint.get('saved_at', 0)))
+    parts = [f"Preset: {checkpoint.get('preset_name') or '-'} ({checkpoint.get('mode')})",
+             f"Salvo em: {saved}",
+             f"Tentativas: {progress.get('attempts', 0)}",
+             f"Rolagens: {progress.get('rolls', 0)}"]
+    if checkpoint.get('mode') == 'keys':
+        parts.append(f"Chaves processadas: {progress.get('keys_processed', 0)}")
+        if progress.get('key_roll_attempt'):
+            parts.append(f"Rolagens na chave atual: {progress['key_roll_attempt']}")
+    return "\n".join(parts)
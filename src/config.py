@@ -17,6 +17,10 @@ GITHUB_REPO = "wiguiri/reroll-do-cadeiras"
 # ============================================
 CONFIG_FILE = 'game_automation_config.json'
 PRESETS_FILE = 'game_automation_presets.json'
+CHECKPOINT_FILE = 'game_automation_checkpoint.json'
+ROLL_STATS_FILE = 'game_automation_roll_stats.json'
+EVENT_LOG_FILE = 'game_automation_events.jsonl'
+DATABASE_FILE = 'game_automation.db'
 
 # ============================================
 # CAMINHOS DO SISTEMA
@@ -80,6 +84,68 @@ DEFAULT_SETTINGS = {
     'max_attempts': '1000',
 }
 
+# ============================================
+# CHECKPOINT DE SESSÃO
+# ============================================
+CHECKPOINT_CONFIG = {
+    'interval_rolls': 10,       # Salva o progresso a cada N rolagens
+    'max_age_hours': 72,        # Checkpoints mais antigos são ignorados
+}
+
+# ============================================
+# PERSISTÊNCIA (presets e configurações)
+# ============================================
+STORAGE_CONFIG = {
+    'presets_flush_ms': 200,    # Alterações de presets dentro deste intervalo viram uma escrita só
+    'config_flush_ms': 500,     # Configurações são gravadas após este tempo sem alterações
+    'config_snapshot_ms': 250,  # A interface junta os pedidos de salvar dentro deste intervalo
+    'backend': 'json',          # 'json' (arquivos) ou 'sqlite' (DATABASE_FILE, para bibliotecas grandes)
+    'history_batch': 500,       # Rolagens por transação no histórico (só no backend sqlite)
+    'history_flush_interval': 2.0,  # Segundos entre as gravações do histórico
+}
+
+# ============================================
+# ESTATÍSTICAS DE ROLAGEM
+# ============================================
+ROLL_STATS_CONFIG = {
+    'max_bins': 64,                 # Faixas máximas do histograma de valores por atributo
+    'max_attributes': 512,          # Atributos distintos guardados (lidos uma vez só saem ao encher)
+    'report_every': 50,             # Loga a estimativa a cada N rolagens
+    'min_rolls': 200,               # Rolagens observadas antes de julgar um preset inviável
+    'hopeless_probability': 0.01,   # Chance mínima de sucesso nas tentativas restantes
+    'auto_abort': False,            # Para sozinho quando o preset é inviável
+}
+
+# ============================================
+# HISTÓRICO DE ROLAGENS
+# ============================================
+ROLL_HISTORY_CONFIG = {
+    'max_rolls': 20000,         # Rolagens guardadas em memória por execução
+}
+
+# ============================================
+# LOG DE EVENTOS (JSONL)
+# ============================================
+EVENT_LOG_CONFIG = {
+    'enabled': True,            # Grava os eventos do motor em EVENT_LOG_FILE
+    'flush_interval': 1.0,      # Segundos entre as gravações em lote
+    'max_pending': 100000,      # Eventos na fila (os mais antigos são descartados)
+    'max_bytes': 20 * 1024 * 1024,  # Roda o arquivo ao passar deste tamanho
+    'max_age_hours': 24,        # Roda o arquivo ao passar desta idade (0 = nunca)
+    'gzip': True,               # Comprime os arquivos rodados
+    'keep': 10,                 # Arquivos rodados mantidos
+}
+
+# ============================================
+# GRADE DE INVENTÁRIO (modo chaves)
+# ============================================
+GRID_CONFIG = {
+    'occupied_stddev': 12.0,    # Desvio padrão mínimo (tons de cinza) de um slot ocupado
+    'cell_margin': 0.2,         # Fração de cada borda do slot ignorada na detecção
+    'hover_delay': 0.5,         # Espera (s) do tooltip após mover para a célula
+    'empty_retries': 1,         # Novas leituras de uma célula ocupada sem atributos
+}
+
 # ============================================
 # ATRIBUTOS ESPECIAIS (sem valor numérico)
 # ============================================
@@ -122,6 +188,74 @@ UI_CONFIG = {
     'color_theme': "blue",
 }
 
+# ============================================
+# INSTRUMENTAÇÃO (latência por etapa)
+# ============================================
+INSTRUMENTATION_CONFIG = {
+    'enabled': True,            # Mede cada etapa da rolagem
+    'dump_file': 'game_automation_latency.json',  # Resumo gravado ao parar
+    'panel_refresh_ms': 1000,   # Intervalo de atualização do painel
+}
+
+# ============================================
+# TRACING (Chrome trace / Perfetto)
+# ============================================
+TRACING_CONFIG = {
+    'env_var': 'REROLL_TRACE',  # Variável de ambiente com o arquivo de saída
+    'max_events': 200000,       # Anel de eventos em memória (~70 MB; os mais antigos são descartados)
+}
+
+# ============================================
+# AQUECIMENTO DO OCR
+# ============================================
+OCR_WARMUP_CONFIG = {
+    'enabled': True,            # Roda o OCR numa amostra ao abrir a interface
+    'sample_lines': ['T5 Mana: +274', 'T3 Fire Resistance: +25%'],  # Amostra (lida pelo parser)
+    'scale': 3,                 # Ampliação da amostra
+}
+
+# ============================================
+# PROFILING SOB DEMANDA
+# ============================================
+PROFILING_CONFIG = {
+    'env_var': 'REROLL_PROFILE',  # N[:cprofile|sample][:mem] perfila as próximas N iterações
+    'hotkey': 'F9',             # Liga/desliga o profiling na interface
+    'iterations': 200,          # Iterações perfiladas por padrão
+    'mode': 'cprofile',         # 'cprofile' (.pstats) ou 'sample' (.folded para flamegraph)
+    'tracemalloc': False,       # Compara alocações do início e do fim (mais lento)
+    'tracemalloc_frames': 10,   # Profundidade das pilhas do tracemalloc
+    'sample_interval_ms': 5,    # Intervalo do amostrador de pilhas
+    'output_dir': 'profiles',   # Pasta dos arquivos gerados
+    'top': 40,                  # Linhas no relatório de memória
+}
+
+# ============================================
+# ENDPOINT DE MÉTRICAS (Prometheus)
+# ============================================
+METRICS_SERVER_CONFIG = {
+    'enabled': False,           # Sobe o servidor ao abrir a interface
+    'host': '127.0.0.1',        # Só localhost
+    'port': 9464,               # GET http://127.0.0.1:9464/metrics
+}
+
+# ============================================
+# FILA DE LOG DA INTERFACE
+# ============================================
+LOG_PIPELINE_CONFIG = {
+    'fps': 20,                  # Ticks de drenagem por segundo
+    'max_batch': 500,           # Registros entregues por tick
+    'max_backlog': 5000,        # Registros na fila (os mais antigos são descartados)
+}
+
+# ============================================
+# JANELA DE LOG DETALHADO
+# ============================================
+LOG_WINDOW_CONFIG = {
+    'capacity': 20000,          # Mensagens guardadas no buffer circular
+    'view_lines': 1000,         # Linhas mantidas no widget
+    'trim_chunk': 200,          # Linhas removidas de uma vez quando passa do limite
+}
+
 # ============================================
 # SPLASH SCREEN
 # ============================================
@@ -131,5 +265,4 @@ SPLASH_CONFIG = {
     'bg_color': "#0f0f1a",
     'accent_color': "#6366f1",
     'animation_fps': 30,
-    'duration_seconds': 2,
 }
@@ -0,0 +1,222 @@
+"""
+Módulo de log de eventos.
+Cada evento do motor (captura, passada de OCR, rolagem lida, decisão, input,
+erro) vira uma linha JSON em game_automation_events.jsonl. O loop só
+enfileira o evento; uma thread de fundo serializa e grava em lotes, roda o
+arquivo por tamanho/idade e, opcionalmente, comprime os arquivos antigos
+com gzip. Os arquivos podem ser analisados depois por ferramentas offline.
+"""
+import os
+import gzip
+import json
+import time
+import atexit
+import shutil
+import threading
+from collections import deque
+from collections.abc import Mapping
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import EVENT_LOG_FILE, EVENT_LOG_CONFIG
+
+
+def _to_json(obj):
+    """Serializa objetos que o json não conhece (Roll, tuplas nomeadas, etc)."""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    return str(obj)
+
+
+class EventLog:
+    """Log de eventos em JSONL com escrita em segundo plano."""
+    
+    def __init__(self, path=None, config=None):
+        """
+        Cria o log (a thread só sobe no start).
+        
+        Args:
+            path: Arquivo de destino (padrão EVENT_LOG_FILE).
+            config: Configuração (padrão EVENT_LOG_CONFIG).
+        """
+        config = config or EVENT_LOG_CONFIG
+        self.path = path or EVENT_LOG_FILE
+        self.enabled = config['enabled']
+        self.max_bytes = config['max_bytes']
+        self.max_age = config['max_age_hours'] * 3600.0
+        self.compress = config['gzip']
+        self.keep = config['keep']
+        self.flush_interval = config['flush_interval']
+        self.session = None
+        self.dropped = 0
+        
+        self._pending = deque(maxlen=config['max_pending'])
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._thread = None
+        self._file = None
+        self._opened_at = None
+        self._atexit = False
+    
+    def start(self, session=None):
+        """
+        Inicia a thread de escrita (se ainda não estiver rodando).
+        
+        Args:
+            session: Identificador gravado em cada evento.
+        """
+        self.session = session
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        
+        self._closing.clear()
+        self._thread = threading.Thread(target=self._run, name='eventlog', daemon=True)
+        self._thread.start()
+        if not self._atexit:
+            atexit.register(self.close)
+            self._atexit = True
+    
+    def emit(self, event, **fields):
+        """
+        Enfileira um evento (qualquer thread; não faz I/O).
+        
+        Args:
+            event: Tipo do evento ('capture', 'ocr', 'roll', ...).
+            **fields: Dados do evento (serializados depois, na thread de escrita).
+        """
+        if not self.enabled:
+            return
+        pending = self._pending
+        if len(pending) == pending.maxlen:
+            self.dropped += 1
+        pending.append((time.time(), event, self.session, fields))
+    
+    def flush(self):
+        """Pede à thread de escrita que grave o que estiver pendente."""
+        self._wake.set()
+    
+    def close(self, timeout=2.0):
+        """Grava o que falta e encerra a thread de escrita."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._closing.set()
+        self._wake.set()
+        thread.join(timeout)
+        self._thread = None
+    
+    # ============================================
+    # THREAD DE ESCRITA
+    # ============================================
+    
+    def _run(self):
+        """Loop da thread de escrita: grava um lote a cada flush_interval."""
+        try:
+            while not self._closing.is_set():
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                self._write_pending()
+            self._write_pending()
+        finally:
+            if self._file:
+                self._file.close()
+                self._file = None
+    
+    def _write_pending(self):
+        """Serializa e grava todos os eventos pendentes em uma escrita."""
+        pending = self._pending
+        if not pending:
+            return
+        
+        lines = []
+        while pending:
+            timestamp, event, session, fields = pending.popleft()
+            record = {'t': round(timestamp, 6), 'event': event}
+            if session:
+                record['session'] = session
+            record.update(fields)
+            try:
+                lines.append(json.dumps(record, ensure_ascii=False, default=_to_json))
+            except (TypeError, ValueError) as e:
+                lines.append(json.dumps({'t': record['t'], 'event': 'eventlog_error', 'error': str(e)}))
+        
+        if self.dropped:
+            lines.append(json.dumps({'t': round(time.time(), 6), 'event': 'eventlog_dropped', 'count': self.dropped}))
+            self.dropped = 0
+        
+        try:
+            self._open()
+            self._file.write('\n'.join(lines) + '\n')
+            self._file.flush()
+            if self._should_rotate():
+                self._rotate()
+        except OSError as e:
+            print(f"Erro ao gravar log de eventos: {e}")
+    
+    def _open(self):
+        """Abre o arquivo atual em modo append."""
+        if self._file is not None:
+            return
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._opened_at = (self._first_timestamp() if self._file.tell() else None) or time.time()
+    
+    def _first_timestamp(self):
+        """
+        Lê o horário do primeiro evento do arquivo atual (sua criação).
+        
+        A data de modificação não serve: é a da última escrita, e a idade
+        máxima nunca seria atingida entre reinícios.
+        
+        Returns:
+            float: Horário do primeiro evento ou None se ilegível.
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return float(json.loads(f.readline())['t'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def _should_rotate(self):
+        """Se o arquivo atual passou do tamanho ou da idade máxima."""
+        if self._file.tell() >= self.max_bytes:
+            return True
+        return self.max_age > 0 and time.time() - self._opened_at >= self.max_age
+    
+    def _rotate(self):
+        """Fecha o arquivo atual, renomeia com o horário e comprime (opcional)."""
+        self._file.close()
+        self._file = None
+        
+        base, ext = os.path.splitext(self.path)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        rotated = f"{base}.{stamp}{ext}"
+        suffix = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + '.gz'):
+            rotated = f"{base}.{stamp}-{suffix}{ext}"
+            suffix += 1
+        os.replace(self.path, rotated)
+        
+        if self.compress:
+            with open(rotated, 'rb') as src, gzip.open(rotated + '.gz', 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+        
+        self._prune(base, ext)
+    
+    def _prune(self, base, ext):
+        """Remove os arquivos rodados mais antigos além de keep."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        prefix = os.path.basename(base) + '.'
+        current = os.path.basename(self.path)
+        rotated = sorted(
+            name for name in os.listdir(directory)
+            if name.startswith(prefix) and name != current and (name.endswith(ext) or name.endswith(ext + '.gz'))
+        )
+        for name in rotated[:max(0, len(rotated) - self.keep)]:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
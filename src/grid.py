@@ -0,0 +1,264 @@
+"""
+Módulo de grade de inventário.
+Descreve uma grade de slots (origem, tamanho da célula, linhas/colunas),
+detecta quais células estão ocupadas a partir de uma única captura da grade
+inteira e planeja a ordem de visita que minimiza o deslocamento do mouse.
+"""
+import math
+from dataclasses import dataclass
+from PIL import ImageStat
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import GRID_CONFIG
+
+
+@dataclass(frozen=True)
+class InventoryGrid:
+    """Grade de slots do inventário (ou da BP)."""
+    
+    origin: tuple       # (x, y) do canto superior esquerdo da primeira célula
+    cell_size: tuple    # (largura, altura) de cada célula
+    rows: int
+    cols: int
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Cria a grade a partir da configuração salva.
+        
+        Args:
+            data: Dict com 'origin', 'cell_size', 'rows' e 'cols'.
+        
+        Returns:
+            InventoryGrid: Grade descrita (ou None se data for vazio).
+        """
+        if not data:
+            return None
+        return cls(
+            origin=tuple(int(v) for v in data['origin']),
+            cell_size=tuple(int(v) for v in data['cell_size']),
+            rows=int(data['rows']),
+            cols=int(data['cols'])
+        )
+    
+    def to_dict(self):
+        """Retorna a grade em formato serializável."""
+        return {
+            'origin': list(self.origin),
+            'cell_size': list(self.cell_size),
+            'rows': self.rows,
+            'cols': self.cols,
+        }
+    
+    def bounds(self):
+        """Retorna a região (left, top, right, bottom) da grade inteira."""
+        left, top = self.origin
+        return (left, top, left + self.cols * self.cell_size[0], top + self.rows * self.cell_size[1])
+    
+    def cells(self):
+        """Retorna todas as células (linha, coluna), linha a linha."""
+        return [(row, col) for row in range(self.rows) for col in range(self.cols)]
+    
+    def cell_center(self, cell):
+        """
+        Retorna o centro de uma célula em coordenadas de tela.
+        
+        Args:
+            cell: Tupla (linha, coluna).
+        
+        Returns:
+            tuple: (x, y) do centro da célula.
+        """
+        row, col = cell
+        width, height = self.cell_size
+        return (self.origin[0] + col * width + width // 2, self.origin[1] + row * height + height // 2)
+    
+    def cell_box(self, cell, margin=0.0):
+        """
+        Retorna a caixa da célula relativa à captura da grade.
+        
+        Args:
+            cell: Tupla (linha, coluna).
+            margin: Fração da célula descartada em cada borda.
+        
+        Returns:
+            tuple: (left, top, right, bottom) dentro da imagem da grade.
+        """
+        row, col = cell
+        width, height = self.cell_size
+        dx, dy = int(width * margin), int(height * margin)
+        return (col * width + dx, row * height + dy, (col + 1) * width - dx, (row + 1) * height - dy)
+
+
+def is_cell_occupied(image, grid, cell, threshold=None, margin=None):
+    """
+    Verifica se uma célula tem um item.
+    
+    Slots vazios são praticamente uniformes; um item desenhado no slot gera
+    variação de brilho. Usa o desvio padrão dos tons de cinza no interior da
+    célula (as bordas do slot são descartadas).
+    
+    Args:
+        image: Captura da grade inteira (PIL Image, região grid.bounds()).
+        grid: InventoryGrid.
+        cell: Tupla (linha, coluna).
+        threshold: Desvio padrão mínimo para considerar ocupado.
+        margin: Fração da célula descartada em cada borda.
+    
+    Returns:
+        bool: True se a célula parece ocupada.
+    """
+    threshold = GRID_CONFIG['occupied_stddev'] if threshold is None else threshold
+    margin = GRID_CONFIG['cell_margin'] if margin is None else margin
+    
+    crop = image.crop(grid.cell_box(cell, margin)).convert('L')
+    return ImageStat.Stat(crop).stddev[0] >= threshold
+
+
+def detect_occupied(image, grid, threshold=None, margin=None):
+    """
+    Detecta as células ocupadas de uma grade a partir de uma captura.
+    
+    Args:
+        image: Captura da grade inteira (região grid.bounds()).
+        grid: InventoryGrid.
+        threshold: Desvio padrão mínimo para considerar ocupado.
+        margin: Fração da célula descartada em cada borda.
+    
+    Returns:
+        list: Células (linha, coluna) ocupadas.
+    """
+    return [cell for cell in grid.cells() if is_cell_occupied(image, grid, cell, threshold, margin)]
+
+
+def _distance(a, b):
+    """Distância euclidiana entre dois pontos."""
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+def plan_route(grid, cells, start=None):
+    """
+    Ordena as células para minimizar o deslocamento do mouse.
+    
+    Vizinho mais próximo a partir de start, refinado com 2-opt (inverte
+    trechos do caminho enquanto isso encurtar o percurso).
+    
+    Args:
+        grid: InventoryGrid.
+        cells: Células (linha, coluna) a visitar.
+        start: Posição (x, y) inicial do mouse (padrão: origem da grade).
+    
+    Returns:
+        list: Células na ordem de visita.
+    """
+    if len(cells) < 2:
+        return list(cells)
+    
+    start = tuple(start) if start else grid.origin
+    centers = {cell: grid.cell_center(cell) for cell in cells}
+    
+    # Vizinho mais próximo
+    remaining = set(cells)
+    route = []
+    current = start
+    while remaining:
+        nearest = min(remaining, key=lambda c: (_distance(current, centers[c]), c))
+        route.append(nearest)
+        remaining.remove(nearest)
+        current = centers[nearest]
+    
+    # 2-opt no caminho aberto (a origem é fixa)
+    points = [start] + [centers[cell] for cell in route]
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(points) - 1):
+            for j in range(i + 1, len(points)):
+                a, b = points[i - 1], points[i]
+                c = points[j]
+                d = points[j + 1] if j + 1 < len(points) else None
+                
+                before = _distance(a, b) + (_distance(c, d) if d else 0.0)
+                after = _distance(a, c) + (_distance(b, d) if d else 0.0)
+                if after + 1e-9 < before:
+                    points[i:j + 1] = reversed(points[i:j + 1])
+                    route[i - 1:j] = reversed(route[i - 1:j])
+                    improved = True
+    
+    return route
+
+
+class BPSlots:
+    """Destinos para as chaves boas: slots livres da BP ou a posição fixa."""
+    
+    def __init__(self, bp_position, bp_grid=None, free_cells=None):
+        """
+        Cria o alocador de slots.
+        
+        Args:
+            bp_position: Posição (x, y) fixa da BP (usada sem grade).
+            bp_grid: InventoryGrid da BP (opcional).
+            free_cells: Células livres da BP, na ordem de preenchimento.
+        """
+        self.bp_position = tuple(bp_position) if bp_position else None
+        self.bp_grid = bp_grid
+        self.free_cells = list(free_cells or [])
+    
+    @classmethod
+    def scan(cls, bp_position, bp_grid, image):
+        """
+        Cria o alocador detectando os slots livres em uma captura da BP.
+        
+        Args:
+            bp_position: Posição fixa da BP (fallback).
+            bp_grid: InventoryGrid da BP.
+            image: Captura da região bp_grid.bounds().
+        
+        Returns:
+            BPSlots: Alocador com os slots livres.
+        """
+        occupied = set(detect_occupied(image, bp_grid))
+        free = [cell for cell in bp_grid.cells() if cell not in occupied]
+        return cls(bp_position, bp_grid, free)
+    
+    def remaining(self):
+        """Retorna quantos slots livres restam (None = ilimitado)."""
+        return len(self.free_cells) if self.bp_grid else None
+    
+    def next_slot(self):
+        """
+        Reserva o próximo destino.
+        
+        Returns:
+            tuple: Posição (x, y) ou None se a BP estiver cheia.
+        """
+        if not self.bp_grid:
+            return self.bp_position
+        if not self.free_cells:
+            return None
+        return self.bp_grid.cell_center(self.free_cells.pop(0))
+
+
+def offset_region(region, anchor, position):
+    """
+    Desloca a região do tooltip de acordo com a posição do item.
+    
+    A região configurada vale para o tooltip do item em anchor; para um item
+    em outra célula, o tooltip aparece deslocado da mesma distância.
+    
+    Args:
+        region: Região (left, top, right, bottom) do tooltip em anchor.
+        anchor: Posição (x, y) de referência (key_position) ou None.
+        position: Posição (x, y) do item visitado.
+    
+    Returns:
+        tuple: Região deslocada.
+    """
+    if not anchor:
+        return tuple(region)
+    dx, dy = position[0] - anchor[0], position[1] - anchor[1]
+    left, top, right, bottom = region
+    return (left + dx, top + dy, right + dx, bottom + dy)
@@ -0,0 +1,290 @@
+"""
+Módulo de instrumentação.
+Mede o tempo de cada etapa de uma rolagem (captura, pré-processamento,
+tesseract, parse, avaliação, log, input, espera) em histogramas no estilo
+HDR: buckets log-lineares de tamanho fixo, registro O(1) e percentis com
+~6% de resolução, sem guardar as amostras. Os resultados aparecem no painel
+de latência e são gravados ao parar a automação.
+"""
+import time
+import contextlib
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import INSTRUMENTATION_CONFIG
+from src.storage import atomic_write_json
+from src.tracing import TRACER
+
+
+# 16 sub-buckets por potência de 2 (erro relativo máximo de 1/16)
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+# Potências de 2 cobertas (em microssegundos, 2^40 us ~ 12 dias)
+MAX_EXPONENT = 40
+
+# Ordem de exibição das etapas conhecidas (outras vêm depois, em ordem alfabética)
+STAGES = ('capture', 'preprocess', 'tesseract', 'parse', 'match', 'stats', 'log', 'input', 'sleep')
+
+# Span que não mede nada (instrumentação desligada)
+NULL_SPAN = contextlib.nullcontext()
+
+
+def _bucket_index(micros):
+    """Índice do bucket de um valor (us)."""
+    if micros < SUB_BUCKETS:
+        return micros
+    shift = micros.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (micros >> shift) - SUB_BUCKETS
+
+
+def _bucket_value(index):
+    """Valor representativo (ponto médio) de um bucket, em us."""
+    if index < SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    low = (index % SUB_BUCKETS + SUB_BUCKETS) << shift
+    return low + ((1 << shift) - 1) / 2.0
+
+
+class LatencyHistogram:
+    """Histograma de latências (em microssegundos) com memória constante."""
+    
+    __slots__ = ('counts', 'count', 'total', 'max')
+    
+    def __init__(self):
+        self.counts = [0] * ((MAX_EXPONENT + 1) * SUB_BUCKETS)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+    
+    def record(self, micros):
+        """
+        Registra uma amostra.
+        
+        Args:
+            micros: Duração em microssegundos (int).
+        """
+        if micros < 0:
+            micros = 0
+        index = _bucket_index(micros)
+        if index >= len(self.counts):
+            index = len(self.counts) - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += micros
+        if micros > self.max:
+            self.max = micros
+    
+    def percentile(self, p):
+        """
+        Retorna o percentil p (0-100), em us.
+        
+        Args:
+            p: Percentil desejado.
+        
+        Returns:
+            float: Valor aproximado (ponto médio do bucket) ou 0 se vazio.
+        """
+        if not self.count:
+            return 0.0
+        target = max(1, int(self.count * p / 100.0 + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(_bucket_value(index), self.max)
+        return float(self.max)
+    
+    def merge(self, other):
+        """
+        Soma as amostras de outro histograma a este.
+        
+        Args:
+            other: LatencyHistogram.
+        """
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.max > self.max:
+            self.max = other.max
+    
+    def copy(self):
+        """Retorna uma cópia independente."""
+        histogram = LatencyHistogram()
+        histogram.merge(self)
+        return histogram
+    
+    def mean(self):
+        """Média em us."""
+        return self.total / self.count if self.count else 0.0
+    
+    def summary(self):
+        """Resumo em milissegundos: count, p50, p95, p99, max e mean."""
+        return {
+            'count': self.count,
+            'p50': self.percentile(50) / 1000.0,
+            'p95': self.percentile(95) / 1000.0,
+            'p99': self.percentile(99) / 1000.0,
+            'max': self.max / 1000.0,
+            'mean': self.mean() / 1000.0,
+        }
+
+
+class _Span:
+    """Context manager que mede um trecho e registra no histograma (e no trace)."""
+    
+    __slots__ = ('_histogram', '_tracer', '_stage', '_start')
+    
+    def __init__(self, histogram, tracer=None, stage=None):
+        self._histogram = histogram
+        self._tracer = tracer
+        self._stage = stage
+    
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter_ns() - self._start
+        self._histogram.record(elapsed // 1000)
+        if self._tracer is not None:
+            self._tracer.complete(self._stage, self._start, elapsed, 'stage')
+        return False
+
+
+class Instruments:
+    """
+    Histogramas por etapa de uma execução.
+    
+    Pensado para o loop do motor e os workers de OCR: o registro é só um
+    incremento de lista (com o GIL, a perda eventual de uma amostra entre
+    threads é aceitável).
+    """
+    
+    def __init__(self, enabled=None, tracer=TRACER):
+        """
+        Cria os histogramas.
+        
+        Args:
+            enabled: Liga a medição (padrão INSTRUMENTATION_CONFIG['enabled']).
+            tracer: Tracer que também recebe as etapas, quando ligado.
+        """
+        self.enabled = INSTRUMENTATION_CONFIG['enabled'] if enabled is None else enabled
+        self.tracer = tracer
+        self.histograms = {}
+        # Execuções anteriores (o endpoint de métricas expõe o acumulado)
+        self.totals = {}
+        self.started_at = time.time()
+    
+    def span(self, stage):
+        """
+        Mede um trecho: with instruments.span('tesseract'): ...
+        
+        Args:
+            stage: Nome da etapa.
+        
+        Returns:
+            Context manager (NULL_SPAN se desligado).
+        """
+        tracer = self.tracer if self.tracer.enabled else None
+        if not self.enabled:
+            return tracer.span(stage, 'stage') if tracer else NULL_SPAN
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms.setdefault(stage, LatencyHistogram())
+        return _Span(histogram, tracer, stage)
+    
+    def record(self, stage, seconds):
+        """Registra uma duração medida por fora (em segundos), terminada agora."""
+        if self.tracer.enabled:
+            duration_ns = int(seconds * 1e9)
+            self.tracer.complete(stage, time.perf_counter_ns() - duration_ns, duration_ns, 'stage')
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms.setdefault(stage, LatencyHistogram())
+        histogram.record(int(seconds * 1_000_000))
+    
+    def reset(self):
+        """Começa as medições de uma nova execução (as anteriores vão para totals)."""
+        for stage, histogram in list(self.histograms.items()):
+            total = self.totals.get(stage)
+            if total is None:
+                self.totals[stage] = histogram
+            else:
+                total.merge(histogram)
+        self.histograms = {}
+        self.started_at = time.time()
+    
+    def cumulative(self):
+        """
+        Histogramas de todas as execuções, incluindo a atual.
+        
+        Returns:
+            dict: {etapa: LatencyHistogram} (cópias; nunca diminuem).
+        """
+        merged = {stage: histogram.copy() for stage, histogram in list(self.totals.items())}
+        for stage, histogram in list(self.histograms.items()):
+            if stage in merged:
+                merged[stage].merge(histogram)
+            else:
+                merged[stage] = histogram.copy()
+        return merged
+    
+    def snapshot(self):
+        """
+        Resumo de todas as etapas.
+        
+        Returns:
+            dict: {etapa: {'count', 'p50', 'p95', 'p99', 'max', 'mean'}} em ms,
+                na ordem de STAGES.
+        """
+        order = {stage: i for i, stage in enumerate(STAGES)}
+        # Cópia: os workers de OCR podem criar etapas durante a iteração
+        items = sorted(list(self.histograms.items()), key=lambda item: (order.get(item[0], len(order)), item[0]))
+        return {stage: histogram.summary() for stage, histogram in items}
+    
+    def format_table(self, rolls_per_minute=None):
+        """
+        Tabela de texto com p50/p95/max por etapa.
+        
+        Args:
+            rolls_per_minute: Taxa de rolagens exibida no cabeçalho.
+        
+        Returns:
+            str: Tabela pronta para o log.
+        """
+        lines = []
+        if rolls_per_minute is not None:
+            lines.append(f"⏱️ Latência por etapa ({rolls_per_minute:.1f} rolagens/min)")
+        lines.append(f"{'etapa':<12}{'n':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for stage, s in self.snapshot().items():
+            lines.append(f"{stage:<12}{s['count']:>8}{s['p50']:>10.1f}{s['p95']:>10.1f}{s['max']:>10.1f}")
+        return "\n".join(lines)
+    
+    def dump(self, path=None, metrics=None):
+        """
+        Grava o resumo em JSON (escrita atômica).
+        
+        Args:
+            path: Arquivo de destino (padrão INSTRUMENTATION_CONFIG['dump_file']).
+            metrics: Métricas da execução gravadas junto.
+        """
+        data = {
+            'started_at': self.started_at,
+            'dumped_at': time.time(),
+            'stages': self.snapshot(),
+        }
+        if metrics:
+            data['metrics'] = metrics
+        atomic_write_json(path or INSTRUMENTATION_CONFIG['dump_file'], data)
+
+
+# Instrumentação desligada (padrão de quem não é ligado a um motor)
+DISABLED = Instruments(enabled=False)
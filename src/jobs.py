@@ -0,0 +1,320 @@
+"""
+Módulo de rolagem multi-item.
+Permite rolar vários itens (cada um com sua região, preset e posição do mouse)
+em um agendamento intercalado: enquanto o tooltip de um item assenta após o
+click, o motor age sobre os outros, e o OCR roda em um pool de workers.
+"""
+import time
+import contextlib
+import pyautogui
+import keyboard
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.matcher import compile_preset
+from src.rules import compile_rule
+from src.cancellation import CancelToken
+from src.roll import Roll
+
+
+# Estados de um job
+JOB_CAPTURE = 'capture'     # Aguardando o tooltip assentar para capturar
+JOB_OCR = 'ocr'             # Captura enviada ao pool de OCR
+JOB_CLICK = 'click'         # Rolagem reprovada, precisa de novo Shift+Click
+JOB_DONE = 'done'           # Preset atingido
+JOB_EXHAUSTED = 'exhausted' # Máximo de tentativas atingido
+
+
+class RollJob:
+    """Um item a ser rolado no modo multi-item."""
+    
+    def __init__(self, name, region, position, tab_type, preset_name, preset_data, max_attempts=1000, rule=None):
+        """
+        Cria um job de rolagem.
+        
+        Args:
+            name: Nome para exibição no log.
+            region: Tupla (left, top, right, bottom) do tooltip do item.
+            position: Tupla (x, y) do item na tela.
+            tab_type: Tipo do preset ('values', 'search', 't7').
+            preset_name: Nome do preset.
+            preset_data: Dados do preset.
+            max_attempts: Máximo de rolagens para este item.
+            rule: Texto de uma regra que substitui o preset (opcional).
+        """
+        self.name = name
+        self.region = tuple(region)
+        self.position = tuple(position)
+        self.tab_type = tab_type
+        self.preset_name = preset_name
+        self.preset_data = preset_data
+        self.rule = rule
+        self.matcher = compile_rule(rule) if rule else compile_preset(tab_type, preset_data)
+        self.max_attempts = max_attempts
+        
+        self.attempts = 0
+        self.state = JOB_CAPTURE
+        self.ready_at = 0.0
+        self.future = None
+        self.message = ''
+    
+    @classmethod
+    def from_dict(cls, data, preset_manager, default_max_attempts=1000):
+        """
+        Cria um job a partir da configuração salva.
+        
+        Args:
+            data: Dict com 'region', 'position', 'tab_type', 'preset' e, opcionais,
+                'name', 'preset_data' (preset já resolvido) e 'rule_expression'
+                (regra já resolvida, usada no lugar do preset).
+            preset_manager: PresetManager para resolver o preset (ou None).
+            default_max_attempts: Máximo de tentativas se o job não definir.
+        
+        Returns:
+            RollJob: Job pronto para o agendador.
+        """
+        tab_type = data.get('tab_type', 'search')
+        preset_name = data.get('preset', 'Preset 1')
+        rule = data.get('rule_expression')
+        if data.get('rule') and not rule:
+            raise ValueError(f"Regra '{data['rule']}' não encontrada")
+        preset_data = data.get('preset_data')
+        if preset_data is None and preset_manager is not None:
+            preset_data = preset_manager.get_preset(tab_type, preset_name)
+        if preset_data is None and not rule:
+            raise ValueError(f"Preset '{preset_name}' ({tab_type}) não encontrado")
+        
+        return cls(
+            name=data.get('name') or f"{preset_name} @ {tuple(data['position'])}",
+            region=data['region'],
+            position=data['position'],
+            tab_type=tab_type,
+            preset_name=preset_name,
+            preset_data=preset_data,
+            max_attempts=int(data.get('max_attempts', default_max_attempts)),
+            rule=rule
+        )
+    
+    def is_active(self):
+        """Retorna se o job ainda precisa de trabalho."""
+        return self.state not in (JOB_DONE, JOB_EXHAUSTED)
+
+
+class JobScheduler:
+    """Agendador intercalado de jobs de rolagem."""
+    
+    def __init__(self, jobs, ocr, delay, click_delay, hover_delay=0.15,
+                 max_workers=None, log=None, log_detail=None, update_status=None,
+                 input_lock=None, on_roll=None, cancel=None, detail_enabled=None, events=None,
+                 history_store=None, session=None):
+        """
+        Inicializa o agendador.
+        
+        Args:
+            jobs: Lista de RollJob.
+            ocr: OCREngine usado pelos workers.
+            delay: Tempo (s) para o tooltip assentar após o click.
+            click_delay: Delay (s) entre as etapas do Shift+Click.
+            hover_delay: Tempo (s) sobre o item antes de capturar o tooltip.
+            max_workers: Tamanho do pool de OCR (padrão: um por item).
+            log: Callback log(mensagem).
+            log_detail: Callback log_detail(mensagem, tag).
+            update_status: Callback update_status(texto).
+            input_lock: Lock opcional mantido durante cada ação de input
+                (instâncias que compartilham o mesmo mouse/teclado).
+            on_roll: Callback on_roll() chamado após cada Shift+Click.
+            cancel: CancelToken que interrompe esperas e bloqueia novos inputs.
+            detail_enabled: Callback detail_enabled() que diz se o log detalhado
+                está visível (o texto da avaliação só é montado nesse caso).
+            events: EventLog opcional (rolagens e decisões de cada job).
+            history_store: RollHistoryStore opcional (rolagens de cada job,
+                gravadas na execução 'session:nome_do_job').
+            session: Identificador da execução no histórico.
+        """
+        self.jobs = list(jobs)
+        self.ocr = ocr
+        self.delay = delay
+        self.click_delay = click_delay
+        self.hover_delay = hover_delay
+        self.max_workers = max_workers or max(1, len(self.jobs))
+        self._log = log or (lambda message: None)
+        self._log_detail = log_detail or (lambda message, tag='info': None)
+        self._update_status = update_status or (lambda text: None)
+        self._detail_enabled = detail_enabled or (lambda: True)
+        self._input_lock = input_lock or contextlib.nullcontext()
+        self._on_roll = on_roll or (lambda: None)
+        self.cancel = cancel or CancelToken()
+        self.events = events
+        self.history_store = history_store
+        self.session = session
+        self.total_rolls = 0
+        self.started_at = None
+    
+    def run(self, is_running):
+        """
+        Executa os jobs até todos terminarem ou a automação parar.
+        
+        Args:
+            is_running: Callable que retorna False para interromper.
+        
+        Returns:
+            list: Jobs concluídos com sucesso.
+        
+        Raises:
+            Cancelled: Se o cancel_token for sinalizado durante uma espera ou input.
+        """
+        self.started_at = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ocr') as pool:
+            try:
+                while is_running() and not self.cancel.is_cancelled():
+                    active = [job for job in self.jobs if job.is_active()]
+                    if not active:
+                        break
+                
+                    for job in active:
+                        if job.state == JOB_OCR and job.future.done():
+                            self._collect(job)
+                
+                    job = self._next_action()
+                    if job is None:
+                        self._wait_for_work()
+                        continue
+                
+                    if job.state == JOB_CLICK:
+                        self._click(job)
+                    else:
+                        self._capture(job, pool)
+            finally:
+                # Não deixa resultados pendentes para trás
+                for job in self.jobs:
+                    if job.state == JOB_OCR:
+                        job.future.cancel()
+        
+        return [job for job in self.jobs if job.state == JOB_DONE]
+    
+    def rolls_per_minute(self):
+        """Retorna a taxa agregada de rolagens por minuto."""
+        if not self.started_at:
+            return 0.0
+        elapsed = time.perf_counter() - self.started_at
+        return self.total_rolls * 60.0 / elapsed if elapsed > 0 else 0.0
+    
+    def _next_action(self):
+        """Escolhe o próximo job que pode receber input agora."""
+        now = time.perf_counter()
+        
+        # Clicks primeiro: liberam o tooltip para assentar enquanto agimos nos outros
+        for job in self.jobs:
+            if job.state == JOB_CLICK:
+                return job
+        
+        ready = [job for job in self.jobs if job.state == JOB_CAPTURE and job.ready_at <= now]
+        if ready:
+            return min(ready, key=lambda j: j.ready_at)
+        
+        return None
+    
+    def _wait_for_work(self):
+        """Espera o próximo resultado de OCR ou o próximo tooltip assentar."""
+        pending = [job.future for job in self.jobs if job.state == JOB_OCR]
+        waiting = [job.ready_at for job in self.jobs if job.state == JOB_CAPTURE]
+        
+        timeout = 0.05
+        if waiting:
+            timeout = max(0.0, min(min(waiting) - time.perf_counter(), timeout))
+        
+        if pending:
+            wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        elif timeout > 0:
+            self.cancel.wait(timeout)
+    
+    def _click(self, job):
+        """Move até o item e executa o Shift+Click."""
+        with self._input_lock:
+            self.cancel.run_input(pyautogui.moveTo, job.position[0], job.position[1])
+            
+            # Ação atômica: uma vez iniciado, o click termina (shift nunca fica preso)
+            with self.cancel.guard():
+                keyboard.press('shift')
+                try:
+                    time.sleep(self.click_delay)
+                    pyautogui.mouseDown(button='left')
+                    time.sleep(self.click_delay)
+                    pyautogui.mouseUp(button='left')
+                    time.sleep(self.click_delay)
+                finally:
+                    keyboard.release('shift')
+        
+        job.attempts += 1
+        self.total_rolls += 1
+        job.state = JOB_CAPTURE
+        job.ready_at = time.perf_counter() + self.delay
+        self._on_roll()
+        
+        self._log_detail(f"🖱️ [{job.name}] Shift+Click #{job.attempts}", 'info')
+        self._update_status(
+            f"Multi-item: {self.total_rolls} rolagens ({self.rolls_per_minute():.0f}/min)"
+        )
+    
+    def _capture(self, job, pool):
+        """Move até o item, captura o tooltip e envia para o pool de OCR."""
+        with self._input_lock:
+            self.cancel.run_input(pyautogui.moveTo, job.position[0], job.position[1])
+            self.cancel.sleep(self.hover_delay)
+            screenshot = self.ocr.capture_region(job.region)
+        
+        job.future = pool.submit(self._run_ocr, job.tab_type, screenshot)
+        job.state = JOB_OCR
+    
+    def _run_ocr(self, tab_type, screenshot):
+        """Executa o OCR em um worker do pool."""
+        if tab_type == 't7':
+            _, t7_attrs = self.ocr.extract_t7_attributes(screenshot)
+            return {}, t7_attrs
+        
+        _, values = self.ocr.extract_text_with_processing(screenshot)
+        return values, None
+    
+    def _collect(self, job):
+        """Processa o resultado de OCR de um job."""
+        try:
+            values, t7_attrs = job.future.result()
+        except Exception as e:
+            self._log_detail(f"❌ [{job.name}] ERRO: {e}", 'error')
+            job.state = JOB_CAPTURE
+            job.ready_at = time.perf_counter() + self.delay
+            return
+        finally:
+            job.future = None
+        
+        if not values and t7_attrs is None:
+            self._log_detail(f"⏸️ [{job.name}] Nenhum valor identificado", 'warning')
+            job.state = JOB_CAPTURE
+            job.ready_at = time.perf_counter() + 0.5
+            return
+        
+        found = job.matcher.match(values, t7_attrs)
+        if self.events is not None:
+            self.events.emit('roll', job=job.name, values=values, tiers=t7_attrs)
+            self.events.emit('decision', job=job.name, matched=found, preset=job.preset_name)
+        if self.history_store is not None:
+            roll = Roll.from_tier_attrs(t7_attrs) if t7_attrs is not None else Roll.from_dict(values)
+            self.history_store.add(f"{self.session}:{job.name}", roll, matched=found)
+        
+        if self._detail_enabled():
+            job.message = job.matcher.explain(values, t7_attrs)
+            self._log_detail(f"\n--- [{job.name}] Tentativa #{job.attempts + 1} ---", 'header')
+            self._log_detail(job.message, 'success' if found else 'warning')
+        
+        if found:
+            job.state = JOB_DONE
+            self._log(f"✓ [{job.name}] SUCESSO após {job.attempts} tentativas")
+        elif job.attempts >= job.max_attempts:
+            job.state = JOB_EXHAUSTED
+            self._log(f"⚠ [{job.name}] Máximo de tentativas ({job.max_attempts}) atingido")
+        else:
+            job.state = JOB_CLICK
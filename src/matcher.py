@@ -0,0 +1,360 @@
+"""
+Módulo de presets compilados.
+Um preset é compilado uma vez no início da execução em um matcher imutável:
+nomes de atributos viram os ids do registro global (roll.py), obrigatórios/
+opcionais viram máscaras de bits e os limiares já ficam convertidos para
+float. Com um Roll, a rolagem já chega com a máscara pronta e a avaliação é
+só operação de bits, sem trabalho de string nem widgets; o
+texto explicativo só é montado quando alguém pede (log detalhado aberto).
+Vários presets (de tipos diferentes) podem ser combinados em um único
+matcher que lê a rolagem uma vez e informa qual deles foi atingido.
+"""
+from collections import namedtuple
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.matching import normalize_name, check_preset
+from src.roll import REGISTRY, Roll
+
+
+# Máximo de nomes de T7 memorizados por matcher (lixo de OCR)
+MAX_ALIASES = 4096
+
+
+class _NameIndex:
+    """Atributos de um preset, com os ids do registro global (usados como bits)."""
+    
+    __slots__ = ('_ids',)
+    
+    def __init__(self):
+        self._ids = {}
+    
+    def intern(self, name):
+        """Retorna o id do nome no registro global (registrando se preciso)."""
+        attr_id = REGISTRY.intern(name)
+        self._ids.setdefault(REGISTRY.name(attr_id), attr_id)
+        return attr_id
+    
+    def lookup(self, key):
+        """Retorna o id de um nome lido pelo OCR (ou None se nunca registrado)."""
+        return REGISTRY.lookup(key)
+    
+    def names(self):
+        """Retorna os pares (nome, id) dos atributos do preset, na ordem de criação."""
+        return list(self._ids.items())
+    
+    def __len__(self):
+        return len(self._ids)
+
+
+class PresetMatcher:
+    """Base dos matchers compilados."""
+    
+    __slots__ = ('tab_type', 'data', '_index')
+    
+    def __init__(self, tab_type, data, index=None):
+        self.tab_type = tab_type
+        self.data = data
+        self._index = index if index is not None else _NameIndex()
+    
+    def bind(self, values):
+        """
+        Lê a rolagem uma única vez contra a tabela de nomes.
+        
+        Args:
+            values: Dicionário {nome_atributo: valor} lido pelo OCR.
+        
+        Returns:
+            tuple: (máscara dos atributos presentes, função id -> valor).
+        """
+        if isinstance(values, Roll):
+            return values.mask, values.value_of
+        
+        found = 0
+        bound = {}
+        lookup = self._index.lookup
+        for key, value in values.items():
+            bit = lookup(key)
+            if bit is not None:
+                found |= 1 << bit
+                bound[bit] = value
+        return found, bound.get
+    
+    def match(self, values, t7_attrs=None):
+        """
+        Avalia uma rolagem.
+        
+        Args:
+            values: Roll (ou dicionário {nome_atributo: valor}) lido pelo OCR.
+            t7_attrs: Atributos T7 (apenas para presets T7).
+        
+        Returns:
+            bool: True se o preset foi atingido.
+        """
+        found, value_of = self.bind(values or {})
+        return self.match_bound(found, value_of, t7_attrs)
+    
+    def match_bound(self, found, value_of, t7_attrs=None):
+        """Avalia uma rolagem já lida por bind()."""
+        raise NotImplementedError
+    
+    def explain(self, values, t7_attrs=None):
+        """
+        Monta o texto detalhado da avaliação (mesmo formato do matching.py).
+        
+        Só deve ser chamado quando o texto vai ser exibido.
+        """
+        return check_preset(self.tab_type, self.data, values, t7_attrs)[1]
+
+
+class ValuesMatcher(PresetMatcher):
+    """Matcher de valores mínimos ('values')."""
+    
+    __slots__ = ('_thresholds', '_all_mask')
+    
+    def __init__(self, tab_type, data, index=None):
+        super().__init__(tab_type, data, index)
+        thresholds = {}
+        for target in data or []:
+            name = normalize_name(target.get('name', ''))
+            value = str(target.get('value', '')).strip()
+            if not name or not value:
+                continue
+            try:
+                target_val = float(value)
+            except ValueError:
+                continue
+            bit = self._index.intern(name)
+            # Mesmo atributo repetido: todos os alvos precisam passar
+            thresholds[bit] = max(thresholds.get(bit, target_val), target_val)
+        
+        self._thresholds = tuple(thresholds.items())
+        self._all_mask = sum(1 << bit for bit in thresholds)
+    
+    def match_bound(self, found, value_of, t7_attrs=None):
+        if found & self._all_mask != self._all_mask:
+            return False
+        return all(value_of(bit) >= threshold for bit, threshold in self._thresholds)
+
+
+class AttributesMatcher(PresetMatcher):
+    """Matcher de presença de atributos ('search' e 'keys', modos ALL/MIN)."""
+    
+    __slots__ = ('_required_mask', '_wanted_mask', '_weights', '_mode_all', '_min_count')
+    
+    def __init__(self, tab_type, data, index=None):
+        super().__init__(tab_type, data, index)
+        data = data or {}
+        required_mask = 0
+        weights = {}
+        
+        for attr in data.get('attributes', []):
+            if isinstance(attr, str):
+                attr = {'name': attr}
+            name = normalize_name(attr.get('name', ''))
+            if not name:
+                continue
+            bit = self._index.intern(name)
+            # Atributo repetido na lista conta uma vez por entrada (como no matching.py)
+            weights[bit] = weights.get(bit, 0) + 1
+            if attr.get('required', False):
+                required_mask |= 1 << bit
+        
+        self._required_mask = required_mask
+        self._wanted_mask = sum(1 << bit for bit in weights)
+        self._weights = tuple(weights.items()) if any(w > 1 for w in weights.values()) else None
+        self._mode_all = data.get('mode', 'ALL') == 'ALL'
+        
+        try:
+            self._min_count = int(data.get('min_count', '1'))
+        except (TypeError, ValueError):
+            self._min_count = 1
+    
+    def _count(self, found):
+        """Quantidade de entradas do preset encontradas."""
+        if self._weights is None:
+            return bin(found & self._wanted_mask).count('1')
+        return sum(w for bit, w in self._weights if found >> bit & 1)
+    
+    def match_bound(self, found, value_of, t7_attrs=None):
+        if not self._wanted_mask:
+            return False
+        
+        if self._mode_all:
+            return found & self._wanted_mask == self._wanted_mask
+        
+        if found & self._required_mask != self._required_mask:
+            return False
+        return self._count(found) >= self._min_count
+
+
+class T7Matcher(PresetMatcher):
+    """Matcher de T7 ('t7', modos ANY/SPECIFIC)."""
+    
+    __slots__ = ('_any', '_specific', '_accepted')
+    
+    def __init__(self, tab_type, data, index=None):
+        super().__init__(tab_type, data, index)
+        data = data or {}
+        self._any = data.get('mode', 'ANY') == 'ANY'
+        self._specific = tuple(normalize_name(a) for a in data.get('specific_attributes', []))
+        self._accepted = {}
+    
+    def _accepts(self, name):
+        """Se o nome de um T7 é aceito no modo SPECIFIC (memorizado)."""
+        accepted = self._accepted.get(name)
+        if accepted is None:
+            lowered = name.lower()
+            accepted = any(s in lowered or lowered in s for s in self._specific)
+            if len(self._accepted) < MAX_ALIASES:
+                self._accepted[name] = accepted
+        return accepted
+    
+    def find(self, t7_attrs, tier_attrs=None):
+        """
+        Retorna o primeiro T7 aceitável (como matching.find_t7).
+        
+        Args:
+            t7_attrs: Lista de dicts {'tier', 'name', 'value'} com tier 7.
+            tier_attrs: Todos os atributos com tier (não usado aqui).
+        
+        Returns:
+            dict: Atributo T7 encontrado ou None.
+        """
+        if not t7_attrs:
+            return None
+        if self._any:
+            return t7_attrs[0]
+        for t7 in t7_attrs:
+            if self._accepts(t7['name']):
+                return t7
+        return None
+    
+    def match(self, values, t7_attrs=None):
+        if t7_attrs is None and isinstance(values, Roll):
+            t7_attrs = [attr for attr in values.tier_attrs() if attr['tier'] == 7]
+        return self.find(t7_attrs) is not None
+    
+    def match_bound(self, found, value_of, t7_attrs=None):
+        return self.find(t7_attrs) is not None
+
+
+_MATCHERS = {
+    'values': ValuesMatcher,
+    'search': AttributesMatcher,
+    'keys': AttributesMatcher,
+    't7': T7Matcher,
+}
+
+
+def compile_preset(tab_type, data, index=None):
+    """
+    Compila um preset salvo em um matcher.
+    
+    Args:
+        tab_type: Tipo do preset ('values', 'search', 't7', 'keys').
+        data: Dados do preset como salvos em game_automation_presets.json.
+        index: Tabela de nomes compartilhada (usada pelo CombinedMatcher).
+    
+    Returns:
+        PresetMatcher: Matcher imutável para o preset.
+    """
+    return _MATCHERS[tab_type](tab_type, data, index)
+
+
+# Preset candidato de um CombinedMatcher
+Candidate = namedtuple('Candidate', ['name', 'tab_type', 'bp_position'])
+
+
+class CombinedMatcher(PresetMatcher):
+    """
+    Vários presets aceitos na mesma execução ("para no primeiro atingido").
+    
+    Os presets compartilham uma única tabela de nomes, então a rolagem é lida
+    uma vez e cada candidato é avaliado só com operações de bits. Regras têm
+    tabela própria e são avaliadas com os atributos de tier.
+    """
+    
+    __slots__ = ('candidates', '_matchers')
+    
+    def __init__(self, entries):
+        """
+        Compila os candidatos, na ordem de prioridade.
+        
+        Args:
+            entries: Dicts com 'name', 'tab_type', 'preset_data' ou
+                'rule_expression' e, opcional, 'bp_position'.
+        """
+        super().__init__('combined', entries)
+        candidates = []
+        matchers = []
+        for entry in entries:
+            rule = entry.get('rule_expression')
+            if rule:
+                from src.rules import compile_rule
+                matchers.append((compile_rule(rule), False))
+            else:
+                matchers.append((compile_preset(entry['tab_type'], entry.get('preset_data'), self._index), True))
+            
+            bp_position = entry.get('bp_position')
+            candidates.append(Candidate(
+                entry.get('name', ''), entry['tab_type'], tuple(bp_position) if bp_position else None
+            ))
+        self.candidates = tuple(candidates)
+        self._matchers = tuple(matchers)
+    
+    def first(self, values, t7_attrs=None, tier_attrs=None):
+        """
+        Avalia todos os candidatos com uma única leitura da rolagem.
+        
+        Args:
+            values: Roll (ou dicionário {nome_atributo: valor}) lido pelo OCR.
+            t7_attrs: Atributos T7 lidos (presets T7).
+            tier_attrs: Todos os atributos com tier (regras).
+        
+        Returns:
+            Candidate: Primeiro candidato atingido ou None.
+        """
+        values = values or {}
+        found, value_of = self.bind(values)
+        for candidate, (matcher, shared) in zip(self.candidates, self._matchers):
+            if shared:
+                hit = matcher.match_bound(found, value_of, t7_attrs)
+            else:
+                hit = matcher.match(values, tier_attrs or t7_attrs)
+            if hit:
+                return candidate
+        return None
+    
+    def match_bound(self, found, value_of, t7_attrs=None):
+        for matcher, shared in self._matchers:
+            if shared and matcher.match_bound(found, value_of, t7_attrs):
+                return True
+        return False
+    
+    def match(self, values, t7_attrs=None):
+        return self.first(values, t7_attrs) is not None
+    
+    def explain(self, values, t7_attrs=None):
+        """Texto detalhado de cada candidato."""
+        sections = []
+        for candidate, (matcher, _) in zip(self.candidates, self._matchers):
+            sections.append(f"📋 {candidate.name} ({candidate.tab_type})")
+            sections.append(matcher.explain(values, t7_attrs))
+        return "\n".join(sections)
+
+
+def compile_combined(entries):
+    """
+    Compila um conjunto de presets aceitos na mesma execução.
+    
+    Args:
+        entries: Dicts com 'name', 'tab_type', 'preset_data' ou
+            'rule_expression' e, opcional, 'bp_position'.
+    
+    Returns:
+        CombinedMatcher: Matcher que informa qual candidato foi atingido.
+    """
+    return CombinedMatcher(entries)
@@ -0,0 +1,204 @@
+"""
+Módulo de verificação de presets.
+Funções puras que avaliam valores capturados contra os dados de um preset,
+sem depender dos widgets da interface.
+"""
+
+
+def normalize_name(name):
+    """
+    Normaliza o nome de um atributo para comparação.
+    
+    Args:
+        name: Nome para normalizar.
+    
+    Returns:
+        str: Nome em minúsculas com espaços simples.
+    """
+    return ' '.join(name.lower().split())
+
+
+def check_values(targets, current_values):
+    """
+    Verifica se os valores alvo foram atingidos.
+    
+    Args:
+        targets: Lista de dicts {'name': str, 'value': str}.
+        current_values: Dicionário {nome_atributo: valor} capturado.
+    
+    Returns:
+        tuple: (atingido, mensagem_detalhada)
+    """
+    all_reached = True
+    details = []
+    
+    for target in targets:
+        name = normalize_name(target.get('name', ''))
+        value = str(target.get('value', '')).strip()
+        
+        if not name or not value:
+            continue
+        
+        try:
+            target_val = float(value)
+        except ValueError:
+            continue
+        
+        if name not in current_values:
+            all_reached = False
+            details.append(f"❌ {name.upper()}: NÃO ENCONTRADO (alvo: ≥{target_val})")
+            continue
+        
+        current_val = current_values[name]
+        
+        if current_val >= target_val:
+            details.append(f"✅ {name.upper()}: {current_val} (alvo: ≥{target_val}) - ATINGIDO!")
+        else:
+            all_reached = False
+            diff = target_val - current_val
+            details.append(f"⏳ {name.upper()}: {current_val} (falta: {diff:.1f})")
+    
+    return all_reached, "\n".join(details)
+
+
+def check_attributes(attributes, mode, min_count_str, current_values):
+    """
+    Verifica se os atributos desejados estão presentes.
+    
+    Args:
+        attributes: Lista de dicts {'name': str, 'required': bool} (ou nomes).
+        mode: 'ALL' ou 'MIN'.
+        min_count_str: Contagem mínima (modo MIN).
+        current_values: Dicionário {nome_atributo: valor} capturado.
+    
+    Returns:
+        tuple: (sucesso, mensagem_detalhada)
+    """
+    required_must_have = []
+    required_optional = []
+    
+    for attr in attributes:
+        if isinstance(attr, str):
+            attr = {'name': attr}
+        name = normalize_name(attr.get('name', ''))
+        if name:
+            if attr.get('required', False):
+                required_must_have.append(name)
+            else:
+                required_optional.append(name)
+    
+    all_attrs = required_must_have + required_optional
+    
+    if not all_attrs:
+        return False, "❌ Nenhum atributo especificado"
+    
+    # Normaliza valores atuais (comparação EXATA após normalização)
+    normalized_current = {normalize_name(k): v for k, v in current_values.items()}
+    
+    found_must_have = []
+    missing_must_have = []
+    found_optional = []
+    details = []
+    
+    # Verifica obrigatórios
+    for attr_name in required_must_have:
+        found_value = normalized_current.get(attr_name)
+        
+        if found_value is not None:
+            found_must_have.append(attr_name)
+            details.append(f"⭐ {attr_name.upper()}: {found_value} - OBRIGATÓRIO!")
+        else:
+            missing_must_have.append(attr_name)
+            details.append(f"❌ {attr_name.upper()}: OBRIGATÓRIO NÃO ENCONTRADO")
+    
+    # Verifica opcionais
+    for attr_name in required_optional:
+        found_value = normalized_current.get(attr_name)
+        
+        if found_value is not None:
+            found_optional.append(attr_name)
+            details.append(f"✅ {attr_name.upper()}: {found_value}")
+        else:
+            details.append(f"❌ {attr_name.upper()}: NÃO ENCONTRADO")
+    
+    total_found = len(found_must_have) + len(found_optional)
+    
+    if mode == "ALL":
+        success = (total_found == len(all_attrs))
+        details.insert(0, f"📊 Modo: TODOS - {total_found}/{len(all_attrs)}")
+    else:
+        try:
+            min_required = int(min_count_str)
+        except (TypeError, ValueError):
+            min_required = 1
+        
+        all_must_have_found = (len(missing_must_have) == 0)
+        enough_total = (total_found >= min_required)
+        
+        success = all_must_have_found and enough_total
+        details.insert(0, f"📊 Modo: MÍNIMO - {total_found}/{len(all_attrs)} (precisa: {min_required})")
+    
+    return success, "\n".join(details)
+
+
+def find_t7(t7_attrs, t7_mode, specific_attrs):
+    """
+    Procura um T7 aceitável entre os atributos T7 detectados.
+    
+    Args:
+        t7_attrs: Lista de dicts {'tier', 'name', 'value'} com tier 7.
+        t7_mode: 'ANY' ou 'SPECIFIC'.
+        specific_attrs: Nomes aceitos no modo SPECIFIC.
+    
+    Returns:
+        dict: Atributo T7 encontrado ou None.
+    """
+    if not t7_attrs:
+        return None
+    
+    if t7_mode == "ANY":
+        return t7_attrs[0]
+    
+    for t7 in t7_attrs:
+        attr_name = t7['name'].lower()
+        for specific in specific_attrs:
+            if specific in attr_name or attr_name in specific:
+                return t7
+    
+    return None
+
+
+def check_preset(tab_type, data, current_values, t7_attrs=None):
+    """
+    Avalia um preset salvo contra uma rolagem.
+    
+    Args:
+        tab_type: Tipo do preset ('values', 'search', 't7', 'keys').
+        data: Dados do preset como salvos em game_automation_presets.json.
+        current_values: Dicionário {nome_atributo: valor} capturado.
+        t7_attrs: Lista de atributos T7 (apenas para tab_type 't7').
+    
+    Returns:
+        tuple: (sucesso, mensagem_detalhada)
+    """
+    if tab_type == 'values':
+        return check_values(data or [], current_values)
+    
+    if tab_type == 't7':
+        data = data or {}
+        found = find_t7(
+            t7_attrs or [],
+            data.get('mode', 'ANY'),
+            [normalize_name(a) for a in data.get('specific_attributes', [])]
+        )
+        if found:
+            return True, f"⭐ T7 {found['name'].upper()}: +{found['value']}"
+        return False, "❌ Nenhum T7 aceitável"
+    
+    data = data or {}
+    return check_attributes(
+        data.get('attributes', []),
+        data.get('mode', 'ALL'),
+        data.get('min_count', '1'),
+        current_values
+    )
@@ -0,0 +1,209 @@
+"""
+Módulo do endpoint de métricas.
+Servidor HTTP opcional, só em localhost, que expõe os contadores internos do
+motor no formato texto do Prometheus (GET /metrics): rolagens, sucessos,
+passadas de OCR por variante, cache de nomes, latência por etapa e jitter
+do skill spam. Desligado por padrão; quando desligado nada é criado.
+    
+    curl http://127.0.0.1:9464/metrics
+"""
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import METRICS_SERVER_CONFIG
+from src.roll import REGISTRY
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    """Escapa o valor de um label."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    """Formata um valor sem perder precisão (inteiros exatos, floats com repr)."""
+    if isinstance(value, int):
+        return str(int(value))
+    value = float(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(value)
+
+
+class MetricsWriter:
+    """Monta o texto de exposição (uma família de métricas por vez)."""
+    
+    def __init__(self):
+        self.lines = []
+    
+    def family(self, name, kind, help_text, samples):
+        """
+        Adiciona uma família de métricas.
+        
+        Args:
+            name: Nome da métrica (prefixo reroll_).
+            kind: 'counter', 'gauge' ou 'summary'.
+            help_text: Descrição.
+            samples: Lista de (sufixo, labels, valor).
+        """
+        if not samples:
+            return
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            label_text = ''
+            if labels:
+                label_text = '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+            self.lines.append(f"{name}{suffix}{label_text} {_format_value(value)}")
+    
+    def summary(self, name, help_text, histograms, label):
+        """
+        Adiciona histogramas de latência como summary (em segundos).
+        
+        Args:
+            name: Nome da métrica.
+            help_text: Descrição.
+            histograms: Dict {valor_do_label: LatencyHistogram}.
+            label: Nome do label (ex: 'stage').
+        """
+        samples = []
+        for key, histogram in list(histograms.items()):
+            for quantile in (0.5, 0.95, 0.99):
+                samples.append(('', {label: key, 'quantile': quantile}, histogram.percentile(quantile * 100) / 1e6))
+            samples.append(('_sum', {label: key}, histogram.total / 1e6))
+            samples.append(('_count', {label: key}, histogram.count))
+        self.family(name, 'summary', help_text, samples)
+    
+    def text(self):
+        """Retorna o texto final."""
+        return '\n'.join(self.lines) + '\n'
+
+
+def engine_metrics(writer, engine):
+    """
+    Escreve as métricas do motor.
+    
+    Args:
+        writer: MetricsWriter.
+        engine: AutomationEngine.
+    """
+    counters = engine.counters()
+    writer.family('reroll_rolls_total', 'counter', "Rolagens feitas (todas as execuções).",
+                  [('', None, counters['rolls'])])
+    writer.family('reroll_captures_total', 'counter', "Capturas de tela.", [('', None, counters['captures'])])
+    writer.family('reroll_runs_total', 'counter', "Execuções iniciadas.", [('', None, counters['runs'])])
+    writer.family('reroll_successes_total', 'counter', "Execuções que atingiram o alvo.",
+                  [('', None, counters['successes'])])
+    writer.family('reroll_running', 'gauge', "1 se a automação está rodando.",
+                  [('', None, 1 if engine.is_running else 0)])
+    if engine.is_running:
+        writer.family('reroll_rolls_per_minute', 'gauge', "Taxa da execução atual.",
+                      [('', None, engine.get_metrics().get('rolls_per_minute', 0.0))])
+    
+    passes = engine.ocr.pass_counts()
+    writer.family('reroll_ocr_passes_total', 'counter', "Passadas de OCR por variante de pré-processamento.",
+                  [('', {'variant': variant}, count) for variant, count in sorted(passes.items())])
+    
+    writer.family('reroll_name_cache_total', 'counter', "Consultas ao cache de nomes de atributos.", [
+        ('', {'result': 'hit'}, REGISTRY.hits),
+        ('', {'result': 'miss'}, REGISTRY.misses),
+    ])
+    
+    writer.summary('reroll_stage_latency_seconds', "Latência por etapa da rolagem (todas as execuções).",
+                   engine.instruments.cumulative(), 'stage')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """GET /metrics."""
+    
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        try:
+            body = self.server.render().encode('utf-8')
+        except Exception as e:
+            self.send_error(500, str(e))
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        # Sem log de acesso no stdout
+        pass
+
+
+class MetricsServer:
+    """Servidor de métricas em uma thread de fundo."""
+    
+    def __init__(self, engine, host=None, port=None):
+        """
+        Cria o servidor (só escuta no start).
+        
+        Args:
+            engine: AutomationEngine.
+            host: Endereço (padrão METRICS_SERVER_CONFIG['host'], localhost).
+            port: Porta (padrão METRICS_SERVER_CONFIG['port']; 0 = qualquer livre).
+        """
+        self.engine = engine
+        self.host = host or METRICS_SERVER_CONFIG['host']
+        self.port = METRICS_SERVER_CONFIG['port'] if port is None else port
+        self.collectors = [lambda writer: engine_metrics(writer, engine)]
+        self._server = None
+        self._thread = None
+    
+    def add_collector(self, collector):
+        """
+        Registra uma fonte extra de métricas.
+        
+        Args:
+            collector: Função collector(writer) chamada a cada requisição.
+        """
+        self.collectors.append(collector)
+    
+    def render(self):
+        """Monta o texto de exposição."""
+        writer = MetricsWriter()
+        for collector in self.collectors:
+            collector(writer)
+        return writer.text()
+    
+    def start(self):
+        """
+        Começa a escutar.
+        
+        Returns:
+            str: URL do endpoint.
+        """
+        if self._server is None:
+            self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+            self._server.daemon_threads = True
+            self._server.render = self.render
+            self.port = self._server.server_address[1]
+            self._thread = threading.Thread(target=self._server.serve_forever, name='metrics', daemon=True)
+            self._thread.start()
+        return self.url
+    
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/metrics"
+    
+    def stop(self):
+        """Para o servidor."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
@@ -3,29 +3,81 @@ Módulo de OCR e extração de atributos.
 Responsável por captura de tela e processamento de texto.
 """
 import re
-import pytesseract
+import time
+import shlex
+import tempfile
+import subprocess
+import threading
 from PIL import Image, ImageGrab, ImageEnhance, ImageOps
 
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.cancellation import Cancelled
+from src.roll import Roll
+from src.instrumentation import DISABLED
+from src.tracing import TRACER
 from src.config import (
     get_tesseract_path,
     SPECIAL_ATTRIBUTES,
     OCR_CORRECTIONS
 )
 
-# Configura o caminho do Tesseract
-pytesseract.pytesseract.tesseract_cmd = get_tesseract_path()
+_pytesseract = None
+_pytesseract_lock = threading.Lock()
+
+
+def tesseract():
+    """
+    Importa o pytesseract na primeira passada de OCR e configura o caminho do
+    executável (fora do caminho de inicialização da interface).
+    
+    Returns:
+        module: O módulo pytesseract configurado.
+    """
+    global _pytesseract
+    if _pytesseract is None:
+        with _pytesseract_lock:
+            if _pytesseract is None:
+                import pytesseract
+                pytesseract.pytesseract.tesseract_cmd = get_tesseract_path()
+                _pytesseract = pytesseract
+    return _pytesseract
 
 
 class OCREngine:
     """Motor de OCR para extração de atributos de imagens."""
     
-    def __init__(self):
+    def __init__(self, cancel_token=None):
+        """
+        Inicializa o motor de OCR.
+        
+        Args:
+            cancel_token: CancelToken opcional; com ele, cada passada verifica o
+                cancelamento e o tesseract em andamento é encerrado no stop.
+        """
         self.special_attributes = SPECIAL_ATTRIBUTES
         self.ocr_corrections = OCR_CORRECTIONS
+        self.cancel_token = cancel_token
+        # EventLog e Instruments (o motor liga durante a execução)
+        self.events = None
+        self.instruments = DISABLED
+        # Passadas de OCR por variante de pré-processamento (endpoint de métricas);
+        # incrementadas pelos workers do pool e lidas pela thread HTTP
+        self.passes = {}
+        self._passes_lock = threading.Lock()
+    
+    def _pass(self, variant):
+        """Conta uma passada da variante e retorna o span dela no trace."""
+        with self._passes_lock:
+            self.passes[variant] = self.passes.get(variant, 0) + 1
+        return TRACER.span(f'ocr:{variant}', 'ocr')
+    
+    def pass_counts(self):
+        """Retorna uma cópia das passadas por variante (qualquer thread)."""
+        with self._passes_lock:
+            return dict(self.passes)
     
     def capture_region(self, region):
         """
@@ -58,8 +110,62 @@ class OCREngine:
             
         Returns:
             str: Texto extraído.
+        
+        Raises:
+            Cancelled: Se o cancel_token for sinalizado antes ou durante o OCR.
         """
-        return pytesseract.image_to_string(image, lang='eng', config=config)
+        started = time.perf_counter()
+        if self.cancel_token is None:
+            text = tesseract().image_to_string(image, lang='eng', config=config)
+        else:
+            self.cancel_token.check()
+            text = self._run_tesseract_cancellable(image, config)
+        
+        elapsed = time.perf_counter() - started
+        self.instruments.record('tesseract', elapsed)
+        if self.events is not None:
+            self.events.emit('ocr', config=config, ms=elapsed * 1000.0, chars=len(text))
+        return text
+    
+    def _run_tesseract_cancellable(self, image, config=''):
+        """
+        Executa o tesseract em um subprocesso que é encerrado no cancelamento.
+        
+        Args:
+            image: Imagem PIL para processar.
+            config: Configuração adicional do Tesseract.
+            
+        Returns:
+            str: Texto extraído.
+        """
+        with tempfile.TemporaryDirectory(prefix='ocr_') as temp_dir:
+            image_path = os.path.join(temp_dir, 'input.png')
+            image.save(image_path)
+            
+            cmd = [tesseract().pytesseract.tesseract_cmd, image_path, 'stdout', '-l', 'eng']
+            cmd += shlex.split(config)
+            
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+            )
+            
+            while True:
+                try:
+                    output, error = process.communicate(timeout=0.01)
+                    break
+                except subprocess.TimeoutExpired:
+                    if self.cancel_token.is_cancelled():
+                        process.kill()
+                        process.communicate()
+                        raise Cancelled()
+        
+        if process.returncode != 0:
+            raise tesseract().TesseractError(process.returncode, error.decode('utf-8', 'ignore').strip())
+        
+        return output.decode('utf-8', 'ignore')
     
     def extract_text_with_processing(self, image):
         """
@@ -69,38 +175,45 @@ class OCREngine:
             image: Imagem PIL para processar.
             
         Returns:
-            tuple: (texto, valores_extraídos)
+            tuple: (texto, Roll com os valores extraídos)
         """
         # Tenta primeiro com imagem normal
-        text = self.extract_text(image)
-        values = self.extract_attributes_from_text(text)
+        with self._pass('normal'):
+            text = self.extract_text(image)
+            values = self.extract_attributes_from_text(text)
         
         # Se leu menos de 6 atributos, tenta com processamento
         if len(values) < 6:
             best_values = values
             
             # Tentativa 1: Escala de cinza + contraste alto
-            gray = image.convert('L')
-            enhanced = ImageEnhance.Contrast(gray).enhance(2.5)
-            text_enhanced = self.extract_text(enhanced, '--psm 6')
-            retry_values = self.extract_attributes_from_text(text_enhanced)
+            with self._pass('contrast'):
+                with self.instruments.span('preprocess'):
+                    gray = image.convert('L')
+                    enhanced = ImageEnhance.Contrast(gray).enhance(2.5)
+                text_enhanced = self.extract_text(enhanced, '--psm 6')
+                retry_values = self.extract_attributes_from_text(text_enhanced)
             if len(retry_values) > len(best_values):
                 best_values = retry_values
             
             # Tentativa 2: Brightness aumentado
             if len(best_values) < 6:
-                bright = ImageEnhance.Brightness(gray).enhance(1.5)
-                text_bright = self.extract_text(bright, '--psm 6')
-                retry_values2 = self.extract_attributes_from_text(text_bright)
+                with self._pass('bright'):
+                    with self.instruments.span('preprocess'):
+                        bright = ImageEnhance.Brightness(gray).enhance(1.5)
+                    text_bright = self.extract_text(bright, '--psm 6')
+                    retry_values2 = self.extract_attributes_from_text(text_bright)
                 if len(retry_values2) > len(best_values):
                     best_values = retry_values2
             
             # Tentativa 3: Inversão (para texto laranja em fundo escuro)
             if len(best_values) < 6:
-                inverted = ImageOps.invert(gray)
-                inverted_contrast = ImageEnhance.Contrast(inverted).enhance(3.0)
-                text_inv = self.extract_text(inverted_contrast, '--psm 6')
-                retry_values3 = self.extract_attributes_from_text(text_inv)
+                with self._pass('invert'):
+                    with self.instruments.span('preprocess'):
+                        inverted = ImageOps.invert(gray)
+                        inverted_contrast = ImageEnhance.Contrast(inverted).enhance(3.0)
+                    text_inv = self.extract_text(inverted_contrast, '--psm 6')
+                    retry_values3 = self.extract_attributes_from_text(text_inv)
                 if len(retry_values3) > len(best_values):
                     best_values = retry_values3
             
@@ -118,6 +231,7 @@ class OCREngine:
         Returns:
             list: Lista de dicts {'tier': int, 'name': str, 'value': int/str}
         """
+        started = time.perf_counter()
         attributes_with_tiers = []
         lines = text.split('\n')
         
@@ -156,6 +270,7 @@ class OCREngine:
                     'value': attr_value
                 })
         
+        self.instruments.record('parse', time.perf_counter() - started)
         return attributes_with_tiers
     
     def extract_t7_attributes(self, image):
@@ -169,26 +284,31 @@ class OCREngine:
             tuple: (texto, lista_de_t7s)
         """
         # Tenta com imagem normal primeiro
-        text = self.extract_text(image)
-        t7_attrs = [a for a in self.extract_attributes_with_tiers(text) if a['tier'] == 7]
+        with self._pass('normal'):
+            text = self.extract_text(image)
+            t7_attrs = [a for a in self.extract_attributes_with_tiers(text) if a['tier'] == 7]
         
         # Se não encontrou T7, tenta com processamento
         if not t7_attrs:
-            gray = image.convert('L')
-            enhanced = ImageEnhance.Contrast(gray).enhance(2.5)
-            text_enhanced = self.extract_text(enhanced, '--psm 6')
-            t7_attrs = [a for a in self.extract_attributes_with_tiers(text_enhanced) if a['tier'] == 7]
+            with self._pass('contrast'):
+                with self.instruments.span('preprocess'):
+                    gray = image.convert('L')
+                    enhanced = ImageEnhance.Contrast(gray).enhance(2.5)
+                text_enhanced = self.extract_text(enhanced, '--psm 6')
+                t7_attrs = [a for a in self.extract_attributes_with_tiers(text_enhanced) if a['tier'] == 7]
             
             if t7_attrs:
                 text = text_enhanced
         
         # Tentativa com inversão
         if not t7_attrs:
-            gray = image.convert('L')
-            inverted = ImageOps.invert(gray)
-            inverted_contrast = ImageEnhance.Contrast(inverted).enhance(3.0)
-            text_inv = self.extract_text(inverted_contrast, '--psm 6')
-            t7_attrs = [a for a in self.extract_attributes_with_tiers(text_inv) if a['tier'] == 7]
+            with self._pass('invert'):
+                with self.instruments.span('preprocess'):
+                    gray = image.convert('L')
+                    inverted = ImageOps.invert(gray)
+                    inverted_contrast = ImageEnhance.Contrast(inverted).enhance(3.0)
+                text_inv = self.extract_text(inverted_contrast, '--psm 6')
+                t7_attrs = [a for a in self.extract_attributes_with_tiers(text_inv) if a['tier'] == 7]
             
             if t7_attrs:
                 text = text_inv
@@ -203,8 +323,9 @@ class OCREngine:
             text: Texto para processar.
             
         Returns:
-            dict: Dicionário {nome_atributo: valor}
+            Roll: Rolagem compacta (lida como {nome_atributo: valor})
         """
+        started = time.perf_counter()
         attributes = {}
         lines = text.split('\n')
         
@@ -224,7 +345,9 @@ class OCREngine:
             # Tenta extrair atributos sem valor (booleanos)
             self._extract_boolean_attribute(line, attributes)
         
-        return attributes
+        roll = Roll.from_dict(attributes)
+        self.instruments.record('parse', time.perf_counter() - started)
+        return roll
     
     def _check_special_attribute(self, line, attributes):
         """
@@ -1,14 +1,52 @@
 """
 Módulo de gerenciamento de presets.
 Responsável por salvar, carregar e gerenciar presets de configuração.
+Presets e configurações ficam em memória (JsonDocument): o arquivo só é
+relido quando muda em disco e as gravações são atômicas, agrupadas e feitas
+em segundo plano.
 """
 import os
+import copy
 import json
 
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.config import PRESETS_FILE, CONFIG_FILE
+from src.config import PRESETS_FILE, CONFIG_FILE, STORAGE_CONFIG
+from src.storage import JsonDocument
+
+
+# Tipos que sempre têm um 'Preset 1'
+DEFAULT_PRESET_TYPES = ('values', 'search', 't7', 'keys')
+
+
+def _empty_presets():
+    """Conteúdo inicial do arquivo de presets."""
+    return {'values': {}, 'search': {}, 'keys': {}}
+
+
+def default_preset(tab_type):
+    """
+    Retorna os dados do preset padrão de um tipo de aba.
+    
+    Args:
+        tab_type: Tipo da aba.
+    
+    Returns:
+        dict ou list: Preset vazio.
+    """
+    if tab_type == 'values':
+        return []
+    if tab_type == 't7':
+        return {
+            'mode': 'ANY',
+            'specific_attributes': []
+        }
+    return {
+        'attributes': [],
+        'mode': 'ALL',
+        'min_count': '3' if tab_type == 'search' else '2'
+    }
 
 
 class PresetManager:
@@ -17,22 +55,20 @@ class PresetManager:
     def __init__(self, presets_file=None, config_file=None):
         self.presets_file = presets_file or PRESETS_FILE
         self.config_file = config_file or CONFIG_FILE
+        self.document = JsonDocument(
+            self.presets_file, _empty_presets,
+            delay=STORAGE_CONFIG['presets_flush_ms'] / 1000.0, label='presets'
+        )
     
     def load_all_presets(self):
         """
         Carrega todos os presets do arquivo.
         
         Returns:
-            dict: Dicionário com todos os presets por tipo.
+            dict: Cópia do dicionário com todos os presets por tipo.
         """
-        try:
-            if os.path.exists(self.presets_file):
-                with open(self.presets_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f"Erro ao carregar presets: {e}")
-        
-        return {'values': {}, 'search': {}, 'keys': {}}
+        with self.document.lock:
+            return copy.deepcopy(self.document.get())
     
     def save_all_presets(self, presets):
         """
@@ -41,11 +77,11 @@ class PresetManager:
         Args:
             presets: Dicionário com todos os presets.
         """
-        try:
-            with open(self.presets_file, 'w', encoding='utf-8') as f:
-                json.dump(presets, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Erro ao salvar presets: {e}")
+        self.document.replace(copy.deepcopy(presets))
+    
+    def flush(self):
+        """Grava agora as alterações pendentes (ao fechar)."""
+        self.document.flush()
     
     def get_preset_names(self, tab_type):
         """
@@ -57,8 +93,8 @@ class PresetManager:
         Returns:
             list: Lista de nomes de presets.
         """
-        presets = self.load_all_presets()
-        return list(presets.get(tab_type, {}).keys())
+        with self.document.lock:
+            return list(self.document.get().get(tab_type, {}).keys())
     
     def get_preset(self, tab_type, name):
         """
@@ -71,8 +107,8 @@ class PresetManager:
         Returns:
             dict ou list: Dados do preset ou None.
         """
-        presets = self.load_all_presets()
-        return presets.get(tab_type, {}).get(name)
+        with self.document.lock:
+            return copy.deepcopy(self.document.get().get(tab_type, {}).get(name))
     
     def save_preset(self, tab_type, name, data):
         """
@@ -83,13 +119,14 @@ class PresetManager:
             name: Nome do preset.
             data: Dados do preset.
         """
-        presets = self.load_all_presets()
+        with self.document.lock:
+            presets = self.document.get()
         
-        if tab_type not in presets:
-            presets[tab_type] = {}
+            if tab_type not in presets:
+                presets[tab_type] = {}
         
-        presets[tab_type][name] = data
-        self.save_all_presets(presets)
+            presets[tab_type][name] = copy.deepcopy(data)
+            self.document.changed()
     
     def delete_preset(self, tab_type, name):
         """
@@ -102,12 +139,13 @@ class PresetManager:
         Returns:
             bool: True se excluiu com sucesso.
         """
-        presets = self.load_all_presets()
+        with self.document.lock:
+            presets = self.document.get()
         
-        if name in presets.get(tab_type, {}):
-            del presets[tab_type][name]
-            self.save_all_presets(presets)
-            return True
+            if name in presets.get(tab_type, {}):
+                del presets[tab_type][name]
+                self.document.changed()
+                return True
         
         return False
     
@@ -118,24 +156,12 @@ class PresetManager:
         presets = self.load_all_presets()
         modified = False
         
-        for tab_type in ['values', 'search', 't7', 'keys']:
+        for tab_type in DEFAULT_PRESET_TYPES:
             if 'Preset 1' not in presets.get(tab_type, {}):
                 if tab_type not in presets:
                     presets[tab_type] = {}
                 
-                if tab_type == 'values':
-                    presets[tab_type]['Preset 1'] = []
-                elif tab_type == 't7':
-                    presets[tab_type]['Preset 1'] = {
-                        'mode': 'ANY',
-                        'specific_attributes': []
-                    }
-                else:
-                    presets[tab_type]['Preset 1'] = {
-                        'attributes': [],
-                        'mode': 'ALL',
-                        'min_count': '3' if tab_type == 'search' else '2'
-                    }
+                presets[tab_type]['Preset 1'] = default_preset(tab_type)
                 modified = True
         
         if modified:
@@ -149,35 +175,45 @@ class ConfigManager:
     
     def __init__(self, config_file=None):
         self.config_file = config_file or CONFIG_FILE
+        self.document = JsonDocument(
+            self.config_file, dict,
+            delay=STORAGE_CONFIG['config_flush_ms'] / 1000.0, label='configurações'
+        )
     
     def load_config(self):
         """
         Carrega configurações do arquivo.
         
         Returns:
-            dict: Configurações carregadas ou dicionário vazio.
+            dict: Cópia das configurações carregadas ou dicionário vazio.
         """
-        try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f"Erro ao carregar configurações: {e}")
-        
-        return {}
+        with self.document.lock:
+            return copy.deepcopy(self.document.get())
     
     def save_config(self, config):
         """
         Salva configurações no arquivo.
         
+        Só agenda a gravação (em segundo plano, depois de config_flush_ms sem
+        alterações) e nada é agendado se o conteúdo não mudou.
+        
         Args:
             config: Dicionário de configurações.
+        
+        Returns:
+            bool: True se havia alguma mudança.
         """
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Erro ao salvar configurações: {e}")
+        # Ida e volta pelo JSON: copia e deixa tuplas como listas, igual ao disco
+        config = json.loads(json.dumps(config, ensure_ascii=False))
+        with self.document.lock:
+            if config == self.document.get():
+                return False
+            self.document.replace(config)
+        return True
+    
+    def flush(self):
+        """Grava agora as configurações pendentes (ao fechar)."""
+        self.document.flush()
     
     def get(self, key, default=None):
         """
@@ -190,8 +226,8 @@ class ConfigManager:
         Returns:
             Valor da configuração ou default.
         """
-        config = self.load_config()
-        return config.get(key, default)
+        with self.document.lock:
+            return copy.deepcopy(self.document.get().get(key, default))
     
     def set(self, key, value):
         """
@@ -201,9 +237,67 @@ class ConfigManager:
             key: Chave da configuração.
             value: Valor a definir.
         """
-        config = self.load_config()
-        config[key] = value
-        self.save_config(config)
+        with self.document.lock:
+            config = self.document.get()
+            if key in config and config[key] == value:
+                return
+            config[key] = copy.deepcopy(value)
+            self.document.changed()
+
+
+# ============================================
+# SELEÇÃO DO BACKEND
+# ============================================
+
+def _use_sqlite(path):
+    """Se o backend SQLite vale para esta chamada (arquivo explícito é sempre JSON)."""
+    return path is None and STORAGE_CONFIG['backend'] == 'sqlite'
+
+
+def create_preset_manager(presets_file=None):
+    """
+    Cria o gerenciador de presets do backend configurado (STORAGE_CONFIG['backend']).
+    
+    Args:
+        presets_file: Arquivo JSON de presets; quando informado, usa sempre o JSON.
+    
+    Returns:
+        PresetManager ou SqlitePresetManager.
+    """
+    if _use_sqlite(presets_file):
+        from src.sqlite_store import SqlitePresetManager
+        return SqlitePresetManager()
+    return PresetManager(presets_file)
+
+
+def create_config_manager(config_file=None):
+    """
+    Cria o gerenciador de configurações do backend configurado.
+    
+    Args:
+        config_file: Arquivo JSON de configuração; quando informado, usa sempre o JSON.
+    
+    Returns:
+        ConfigManager ou SqliteConfigManager.
+    """
+    if _use_sqlite(config_file):
+        from src.sqlite_store import SqliteConfigManager
+        return SqliteConfigManager()
+    return ConfigManager(config_file)
+
+
+def create_history_store():
+    """
+    Cria o histórico persistente de rolagens.
+    
+    Returns:
+        RollHistoryStore no backend SQLite; None no JSON (o histórico fica só
+        em memória e no log de eventos).
+    """
+    if not _use_sqlite(None):
+        return None
+    from src.sqlite_store import RollHistoryStore
+    return RollHistoryStore()
 
 
 # Instâncias globais para uso conveniente
@@ -0,0 +1,313 @@
+"""
+Módulo de profiling sob demanda.
+Perfila as próximas N iterações do loop do motor sem editar código, com
+cProfile (grava .pstats, abre com pstats/snakeviz) ou com um amostrador de
+pilhas de todas as threads (grava .folded, pronto para flamegraph.pl ou
+speedscope). Opcionalmente compara snapshots do tracemalloc do início e do
+fim, para achar crescimento de alocação por rolagem (PIL, regex, log).
+Ligue pelo atalho da interface, por --profile no runner headless ou pela
+variável de ambiente REROLL_PROFILE=N[:cprofile|sample][:mem].
+"""
+import time
+import cProfile
+import threading
+import tracemalloc
+from collections import Counter
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import PROFILING_CONFIG
+
+
+# Modos disponíveis
+MODES = ('cprofile', 'sample')
+
+
+class StackSampler:
+    """Amostrador de pilhas: lê as pilhas de todas as threads a cada intervalo."""
+    
+    def __init__(self, interval):
+        """
+        Cria o amostrador (a thread só sobe no start).
+        
+        Args:
+            interval: Intervalo entre amostras (s).
+        """
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """Inicia a thread de amostragem."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Para a amostragem."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+    
+    def _run(self):
+        """Loop da thread de amostragem."""
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+    
+    def write(self, path):
+        """
+        Grava as pilhas no formato "folded" (uma pilha por linha com a contagem).
+        
+        Args:
+            path: Arquivo de destino.
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class _Capture:
+    """Estado de um profiling em andamento."""
+    
+    def __init__(self, iterations, mode, memory):
+        self.iterations = iterations
+        self.mode = mode
+        self.memory = memory
+        self.done = 0
+        self.started = time.perf_counter()
+        self.profile = None
+        self.sampler = None
+        self.snapshot = None
+        self.started_tracemalloc = False
+
+
+class LoopProfiler:
+    """
+    Profiling das próximas N iterações do loop do motor.
+    
+    arm() pode ser chamado de qualquer thread (atalho, runner); tick() e
+    finish() rodam na thread do motor, que é a thread medida pelo cProfile.
+    """
+    
+    def __init__(self, config=None):
+        """
+        Cria o profiler (armado se a variável de ambiente estiver definida).
+        
+        Args:
+            config: Configuração (padrão PROFILING_CONFIG).
+        """
+        config = config or PROFILING_CONFIG
+        self.iterations = config['iterations']
+        self.mode = config['mode']
+        self.memory = config['tracemalloc']
+        self.memory_frames = config['tracemalloc_frames']
+        self.sample_interval = config['sample_interval_ms'] / 1000.0
+        self.output_dir = config['output_dir']
+        self.top = config['top']
+        self.session = None
+        
+        self._armed = None
+        self._active = None
+        self._stop_requested = False
+        
+        env = os.environ.get(config['env_var'])
+        if env:
+            try:
+                self.arm(*parse_spec(env))
+            except ValueError as e:
+                print(f"⚠️ {config['env_var']} ignorada: {e}")
+    
+    @property
+    def active(self):
+        """Se há um profiling em andamento."""
+        return self._active is not None
+    
+    @property
+    def armed(self):
+        """Se há um profiling esperando a próxima iteração."""
+        return self._armed is not None
+    
+    def arm(self, iterations=None, mode=None, memory=None):
+        """
+        Pede o profiling das próximas N iterações.
+        
+        Args:
+            iterations: Número de iterações (padrão da configuração).
+            mode: 'cprofile' ou 'sample'.
+            memory: Compara snapshots do tracemalloc.
+        
+        Raises:
+            ValueError: Se o modo for desconhecido.
+        """
+        mode = mode or self.mode
+        if mode not in MODES:
+            raise ValueError(f"Modo de profiling desconhecido: {mode}")
+        self._stop_requested = False
+        self._armed = (
+            max(1, iterations or self.iterations),
+            mode,
+            self.memory if memory is None else memory,
+        )
+    
+    def toggle(self):
+        """
+        Arma o profiling ou encerra o atual (atalho).
+        
+        Returns:
+            bool: True se ficou armado, False se foi cancelado/encerrado.
+        """
+        if self._active is not None:
+            self._stop_requested = True
+            return False
+        if self._armed is not None:
+            self._armed = None
+            return False
+        self.arm()
+        return True
+    
+    def tick(self):
+        """
+        Marca o início de uma iteração do loop (thread do motor).
+        
+        Returns:
+            list: Arquivos gravados, quando o profiling termina nesta iteração.
+        """
+        capture = self._active
+        if capture is not None:
+            capture.done += 1
+            if capture.done >= capture.iterations or self._stop_requested:
+                return self.finish()
+            return None
+        
+        armed, self._armed = self._armed, None
+        if armed is not None:
+            self._start(*armed)
+        return None
+    
+    def _start(self, iterations, mode, memory):
+        """Começa a medir (thread do motor)."""
+        capture = _Capture(iterations, mode, memory)
+        if memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.memory_frames)
+                capture.started_tracemalloc = True
+            capture.snapshot = tracemalloc.take_snapshot()
+        
+        if mode == 'cprofile':
+            capture.profile = cProfile.Profile()
+            capture.profile.enable()
+        else:
+            capture.sampler = StackSampler(self.sample_interval)
+            capture.sampler.start()
+        self._active = capture
+    
+    def _base_path(self):
+        """Caminho (sem extensão) de uma captura nova, sem sobrescrever outra."""
+        now = time.time()
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1000) % 1000:03d}"
+        base = os.path.join(self.output_dir, f"profile-{self.session or 'idle'}-{stamp}")
+        candidate, suffix = base, 1
+        while any(os.path.exists(candidate + ext) for ext in ('.pstats', '.folded', '.malloc.txt')):
+            candidate = f"{base}-{suffix}"
+            suffix += 1
+        return candidate
+    
+    def finish(self):
+        """
+        Encerra o profiling em andamento e grava os resultados.
+        
+        Returns:
+            list: Arquivos gravados (vazia se não havia profiling).
+        """
+        capture, self._active = self._active, None
+        self._stop_requested = False
+        if capture is None:
+            return []
+        
+        if capture.profile is not None:
+            capture.profile.disable()
+        if capture.sampler is not None:
+            capture.sampler.stop()
+        
+        base = self._base_path()
+        paths = []
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            if capture.profile is not None:
+                capture.profile.dump_stats(base + '.pstats')
+                paths.append(base + '.pstats')
+            if capture.sampler is not None:
+                capture.sampler.write(base + '.folded')
+                paths.append(base + '.folded')
+            if capture.memory:
+                self._write_memory(capture, base + '.malloc.txt')
+                paths.append(base + '.malloc.txt')
+        except OSError as e:
+            print(f"Erro ao salvar profiling: {e}")
+        finally:
+            if capture.started_tracemalloc:
+                tracemalloc.stop()
+        return paths
+    
+    def _write_memory(self, capture, path):
+        """Grava as linhas que mais cresceram em alocação durante o profiling."""
+        ignore = (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, __file__),
+        )
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+        before = capture.snapshot.filter_traces(ignore)
+        stats = after.compare_to(before, 'lineno')
+        iterations = max(1, capture.done)
+        growth = sum(stat.size_diff for stat in stats)
+        
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"# {capture.done} iterações em {time.perf_counter() - capture.started:.1f}s\n")
+            f.write(f"# crescimento total: {growth / 1024:+.1f} KiB ({growth / iterations:+.0f} B/iteração)\n")
+            for stat in stats[:self.top]:
+                f.write(f"{stat.size_diff / iterations:+10.0f} B/iter  {stat}\n")
+
+
+def parse_spec(text):
+    """
+    Interpreta "N[:cprofile|sample][:mem]" (variável de ambiente).
+    
+    Args:
+        text: Texto da especificação.
+    
+    Returns:
+        tuple: (iterações, modo, memória).
+    
+    Raises:
+        ValueError: Se a especificação for inválida.
+    """
+    parts = [part.strip().lower() for part in text.split(':')]
+    iterations = int(parts[0]) if parts[0] else None
+    mode = None
+    memory = None
+    for part in parts[1:]:
+        if part in MODES:
+            mode = part
+        elif part == 'mem':
+            memory = True
+        else:
+            raise ValueError(f"Opção de profiling desconhecida: {part}")
+    return iterations, mode, memory
@@ -0,0 +1,388 @@
+"""
+Módulo de rolagens.
+Define o registro global de atributos (nome normalizado -> inteiro pequeno)
+e o Roll, o registro compacto de uma rolagem produzido uma única vez pelo
+OCR: ids, valores e tiers ficam em arrays, sem dicts nem strings repetidas.
+Só os nomes usados por presets e regras ganham id; o que mais o OCR ler
+fica na própria rolagem, então o registro e as máscaras não crescem com
+lixo de OCR em execuções longas.
+Matchers, estatísticas e o histórico consomem o Roll diretamente; ele
+também se comporta como um mapeamento somente leitura {nome: valor} para o
+código que ainda trabalha com dicts.
+"""
+import time
+import threading
+from array import array
+from collections import deque
+from collections.abc import Mapping
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.matching import normalize_name
+from src.config import ROLL_HISTORY_CONFIG
+
+
+# Máximo de chaves brutas (variações de OCR) memorizadas pelo registro
+MAX_ALIASES = 16384
+# Máximo de nomes fora do registro com a normalização memorizada
+MAX_UNKNOWN = 4096
+
+
+class AttributeRegistry:
+    """
+    Tabela global nome de atributo -> id.
+    
+    Os ids só crescem e nunca mudam durante a execução, então podem ser
+    usados como índices e bits por qualquer thread. Inserções são protegidas
+    por lock; leituras são um dict.get. Só presets e regras registram nomes
+    (intern); o OCR apenas consulta (resolve).
+    """
+    
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+        self._aliases = {}
+        self._unknown = {}
+        self._lock = threading.Lock()
+        # Consultas resolvidas direto (nome normalizado ou alias memorizado) x normalizadas
+        self.hits = 0
+        self.misses = 0
+    
+    def intern(self, name):
+        """
+        Retorna o id do atributo, registrando o nome se for novo.
+        
+        Args:
+            name: Nome do atributo (normalizado aqui).
+        
+        Returns:
+            int: Id do atributo.
+        """
+        attr_id = self._ids.get(name)
+        if attr_id is not None:
+            return attr_id
+        
+        normalized = normalize_name(name)
+        with self._lock:
+            attr_id = self._ids.get(normalized)
+            if attr_id is None:
+                attr_id = len(self._names)
+                self._names.append(normalized)
+                self._ids[normalized] = attr_id
+            if name != normalized and len(self._aliases) < MAX_ALIASES:
+                self._aliases[name] = attr_id
+        return attr_id
+    
+    def lookup(self, name):
+        """
+        Retorna o id de um nome sem registrá-lo.
+        
+        A normalização de uma chave bruta é feita uma vez e memorizada.
+        
+        Args:
+            name: Nome do atributo (como lido).
+        
+        Returns:
+            int: Id do atributo ou None se nunca foi registrado.
+        """
+        attr_id = self._ids.get(name)
+        if attr_id is None:
+            attr_id = self._aliases.get(name)
+        if attr_id is not None:
+            self.hits += 1
+            return attr_id
+        
+        self.misses += 1
+        attr_id = self._ids.get(normalize_name(name))
+        if attr_id is not None and len(self._aliases) < MAX_ALIASES:
+            self._aliases[name] = attr_id
+        return attr_id
+    
+    def resolve(self, name):
+        """
+        Resolve um nome lido pelo OCR sem registrá-lo.
+        
+        Args:
+            name: Nome do atributo (como lido).
+        
+        Returns:
+            tuple: (id, None) para nomes registrados ou (None, nome normalizado).
+        """
+        attr_id = self._ids.get(name)
+        if attr_id is None:
+            attr_id = self._aliases.get(name)
+        if attr_id is not None:
+            self.hits += 1
+            return attr_id, None
+        
+        normalized = self._unknown.get(name)
+        if normalized is None:
+            self.misses += 1
+            normalized = normalize_name(name)
+            if len(self._unknown) < MAX_UNKNOWN:
+                self._unknown[name] = normalized
+        else:
+            self.hits += 1
+        
+        # O nome pode ter sido registrado depois (preset compilado agora)
+        attr_id = self._ids.get(normalized)
+        if attr_id is not None:
+            if len(self._aliases) < MAX_ALIASES:
+                self._aliases[name] = attr_id
+            return attr_id, None
+        return None, normalized
+    
+    def name(self, attr_id):
+        """Retorna o nome normalizado de um id."""
+        return self._names[attr_id]
+    
+    def __len__(self):
+        return len(self._names)
+
+
+# Registro compartilhado por OCR, matchers, estatísticas e histórico
+REGISTRY = AttributeRegistry()
+
+
+class Roll(Mapping):
+    """
+    Rolagem lida pelo OCR.
+    
+    Um único array guarda ids, valores e tiers em sequência
+    ([id...][valor...][tier...], tier 0 = desconhecido) e mask tem um bit
+    por id presente. Atributos fora do registro (nenhum preset os usa) ficam
+    em _extra como (nome, valor, tier), sem id nem bit. Como Mapping,
+    roll['mana'] e roll.items() funcionam com os nomes normalizados.
+    """
+    
+    __slots__ = ('_data', 'mask', '_extra')
+    
+    def __init__(self, ids=(), vals=(), tiers=None, extra=()):
+        data = array('i', ids)
+        count = len(data)
+        data.extend(vals)
+        data.extend(tiers if tiers is not None else [0] * count)
+        self._data = data
+        mask = 0
+        for attr_id in ids:
+            mask |= 1 << attr_id
+        self.mask = mask
+        self._extra = tuple(extra)
+    
+    @classmethod
+    def from_dict(cls, values, registry=REGISTRY):
+        """
+        Cria a rolagem a partir de {nome: valor}.
+        
+        Args:
+            values: Dicionário {nome_atributo: valor}.
+            registry: Registro de atributos.
+        
+        Returns:
+            Roll: Rolagem compacta.
+        """
+        if isinstance(values, Roll):
+            return values
+        ids = []
+        vals = []
+        positions = {}
+        extra = {}
+        for name, value in values.items():
+            attr_id, normalized = registry.resolve(name)
+            if attr_id is None:
+                extra[normalized] = int(value)
+                continue
+            if attr_id in positions:
+                vals[positions[attr_id]] = int(value)
+                continue
+            positions[attr_id] = len(ids)
+            ids.append(attr_id)
+            vals.append(int(value))
+        return cls(ids, vals, extra=[(name, value, 0) for name, value in extra.items()])
+    
+    @classmethod
+    def from_tier_attrs(cls, tier_attrs, registry=REGISTRY):
+        """
+        Cria a rolagem a partir da lista de atributos com tier do OCR.
+        
+        Atributos repetidos ficam com o maior tier lido.
+        
+        Args:
+            tier_attrs: Lista de dicts {'tier', 'name', 'value'}.
+            registry: Registro de atributos.
+        
+        Returns:
+            Roll: Rolagem compacta com tiers.
+        """
+        ids = []
+        vals = []
+        tiers = []
+        positions = {}
+        extra = {}
+        for attr in tier_attrs or ():
+            attr_id, normalized = registry.resolve(attr['name'])
+            if attr_id is None:
+                kept = extra.get(normalized)
+                if kept is None or attr['tier'] > kept[1]:
+                    extra[normalized] = (int(attr['value']), int(attr['tier']))
+                continue
+            index = positions.get(attr_id)
+            if index is None:
+                positions[attr_id] = len(ids)
+                ids.append(attr_id)
+                vals.append(int(attr['value']))
+                tiers.append(int(attr['tier']))
+            elif attr['tier'] > tiers[index]:
+                vals[index] = int(attr['value'])
+                tiers[index] = int(attr['tier'])
+        return cls(ids, vals, tiers, [(name, value, tier) for name, (value, tier) in extra.items()])
+    
+    # Mapping {nome: valor}
+    
+    def __getitem__(self, name):
+        attr_id, normalized = REGISTRY.resolve(name)
+        if attr_id is None:
+            value = next((v for n, v, _ in self._extra if n == normalized), None)
+        else:
+            value = self.value_of(attr_id)
+        if value is None:
+            raise KeyError(name)
+        return value
+    
+    def __iter__(self):
+        data = self._data
+        for k in range(len(data) // 3):
+            yield REGISTRY.name(data[k])
+        for name, _, _ in self._extra:
+            yield name
+    
+    def __len__(self):
+        return len(self._data) // 3 + len(self._extra)
+    
+    def __contains__(self, name):
+        attr_id, normalized = REGISTRY.resolve(name)
+        if attr_id is None:
+            return any(n == normalized for n, _, _ in self._extra)
+        return bool(self.mask >> attr_id & 1)
+    
+    def items(self):
+        """Retorna os pares (nome, valor) sem consultar o registro por nome."""
+        return [(REGISTRY.name(i), v) for i, v, _ in self.entries()] + [(n, v) for n, v, _ in self._extra]
+    
+    def __repr__(self):
+        return repr(self.to_dict())
+    
+    def __reduce__(self):
+        # Ids só valem neste processo: serializa pelos nomes (serviço de OCR)
+        entries = self.named_entries()
+        return _restore_roll, (
+            [n for n, _, _ in entries],
+            [v for _, v, _ in entries],
+            [t for _, _, t in entries],
+        )
+    
+    def named_entries(self):
+        """Retorna as tuplas (nome, valor, tier) de todos os atributos lidos."""
+        return [(REGISTRY.name(i), v, t) for i, v, t in self.entries()] + list(self._extra)
+    
+    # Acesso por id
+    
+    def entries(self):
+        """Retorna as tuplas (id, valor, tier) dos atributos registrados."""
+        data = self._data
+        count = len(data) // 3
+        return [(data[k], data[count + k], data[2 * count + k]) for k in range(count)]
+    
+    def value_of(self, attr_id):
+        """Retorna o valor de um id (ou None se ausente)."""
+        if not self.mask >> attr_id & 1:
+            return None
+        data = self._data
+        count = len(data) // 3
+        return data[count + data.index(attr_id, 0, count)]
+    
+    def tier_of(self, attr_id):
+        """Retorna o tier de um id (ou None se ausente/desconhecido)."""
+        if not self.mask >> attr_id & 1:
+            return None
+        data = self._data
+        count = len(data) // 3
+        return data[2 * count + data.index(attr_id, 0, count)] or None
+    
+    def has_tiers(self):
+        """Retorna se a rolagem tem informação de tier."""
+        data = self._data
+        return any(data[2 * len(data) // 3:]) or any(t for _, _, t in self._extra)
+    
+    def tier_items(self):
+        """Retorna (nome, tier) dos atributos com tier conhecido."""
+        return [(n, t) for n, _, t in self.named_entries() if t]
+    
+    def t7_names(self):
+        """Retorna os nomes dos atributos T7."""
+        return [n for n, _, t in self.named_entries() if t == 7]
+    
+    def tier_attrs(self):
+        """Retorna a lista de dicts {'tier', 'name', 'value'} (para exibição)."""
+        return [{'tier': t, 'name': n, 'value': v} for n, v, t in self.named_entries() if t]
+    
+    def to_dict(self):
+        """Retorna a rolagem como {nome: valor}."""
+        return {n: v for n, v, _ in self.named_entries()}
+
+
+def _restore_roll(names, vals, tiers):
+    """Recria um Roll serializado, com os ids do registro deste processo."""
+    ids, id_vals, id_tiers, extra = [], [], [], []
+    for name, value, tier in zip(names, vals, tiers):
+        attr_id, normalized = REGISTRY.resolve(name)
+        if attr_id is None:
+            extra.append((normalized, value, tier))
+        else:
+            ids.append(attr_id)
+            id_vals.append(value)
+            id_tiers.append(tier)
+    return Roll(ids, id_vals, id_tiers, extra)
+
+
+class RollHistory:
+    """Histórico limitado das rolagens lidas na execução."""
+    
+    def __init__(self, max_rolls=None):
+        """
+        Cria o histórico.
+        
+        Args:
+            max_rolls: Máximo de rolagens guardadas (as mais antigas saem).
+        """
+        self.max_rolls = max_rolls or ROLL_HISTORY_CONFIG['max_rolls']
+        self._rolls = deque(maxlen=self.max_rolls)
+    
+    def append(self, roll, matched=False):
+        """
+        Registra uma rolagem.
+        
+        Args:
+            roll: Roll lido.
+            matched: Se a rolagem atingiu o alvo.
+        """
+        self._rolls.append((time.time(), roll, matched))
+    
+    def __len__(self):
+        return len(self._rolls)
+    
+    def __iter__(self):
+        return iter(self._rolls)
+    
+    def clear(self):
+        """Descarta o histórico."""
+        self._rolls.clear()
+    
+    def to_list(self):
+        """Retorna o histórico em formato serializável."""
+        return [
+            {'time': timestamp, 'values': roll.to_dict(), 'tiers': dict(roll.tier_items()), 'matched': matched}
+            for timestamp, roll, matched in self._rolls
+        ]
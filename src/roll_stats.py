@@ -0,0 +1,473 @@
+"""
+Módulo de estatísticas de rolagem.
+Acumula, em memória constante (histogramas com faixas limitadas e no máximo
+max_attributes nomes por tabela), a frequência de cada atributo, o histograma
+de valores e a frequência de tiers observados em todas as rolagens, e estima
+a chance de um preset ser atingido em uma rolagem e quantas tentativas (ou
+orbs) ainda faltam.
+"""
+import math
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import ROLL_STATS_FILE, ROLL_STATS_CONFIG
+from src.matching import normalize_name
+from src.roll import Roll
+from src.storage import atomic_write_json, read_json
+
+
+class ValueHistogram:
+    """Histograma de valores com número máximo de faixas (memória constante)."""
+    
+    def __init__(self, max_bins=None, width=1):
+        """
+        Cria o histograma.
+        
+        Args:
+            max_bins: Número máximo de faixas; ao passar, a largura dobra.
+            width: Largura inicial de cada faixa.
+        """
+        self.max_bins = max_bins or ROLL_STATS_CONFIG['max_bins']
+        self.width = width
+        self.bins = {}
+        self.count = 0
+    
+    def add(self, value):
+        """Registra um valor observado."""
+        key = int(value // self.width)
+        self.bins[key] = self.bins.get(key, 0) + 1
+        self.count += 1
+        
+        while len(self.bins) > self.max_bins:
+            self._coarsen()
+    
+    def _coarsen(self):
+        """Dobra a largura das faixas, juntando as vizinhas."""
+        merged = {}
+        for key, count in self.bins.items():
+            merged[key // 2] = merged.get(key // 2, 0) + count
+        self.bins = merged
+        self.width *= 2
+    
+    def fraction_at_least(self, threshold):
+        """
+        Fração dos valores observados maiores ou iguais a threshold.
+        
+        A faixa que contém o limiar entra proporcionalmente (distribuição
+        uniforme dentro da faixa).
+        
+        Args:
+            threshold: Valor mínimo.
+        
+        Returns:
+            float: Fração entre 0 e 1 (None se não há observações).
+        """
+        if not self.count:
+            return None
+        
+        total = 0.0
+        for key, count in self.bins.items():
+            low = key * self.width
+            high = low + self.width
+            if low >= threshold:
+                total += count
+            elif high > threshold:
+                total += count * (high - threshold) / self.width
+        return total / self.count
+    
+    def items(self):
+        """Retorna as faixas [(início, contagem)] em ordem."""
+        return [(key * self.width, self.bins[key]) for key in sorted(self.bins)]
+    
+    def to_dict(self):
+        """Retorna o histograma em formato serializável."""
+        return {'width': self.width, 'bins': {str(k): v for k, v in self.bins.items()}}
+    
+    @classmethod
+    def from_dict(cls, data, max_bins=None):
+        """Recria o histograma salvo por to_dict()."""
+        hist = cls(max_bins, data.get('width', 1))
+        hist.bins = {int(k): v for k, v in data.get('bins', {}).items()}
+        hist.count = sum(hist.bins.values())
+        return hist
+
+
+def poisson_binomial_at_least(probabilities, k):
+    """
+    Probabilidade de pelo menos k sucessos em ensaios independentes.
+    
+    Programação dinâmica sobre a distribuição de Poisson-binomial.
+    
+    Args:
+        probabilities: Probabilidade de cada ensaio.
+        k: Mínimo de sucessos.
+    
+    Returns:
+        float: P(sucessos >= k).
+    """
+    if k <= 0:
+        return 1.0
+    if k > len(probabilities):
+        return 0.0
+    
+    dist = [1.0] + [0.0] * len(probabilities)
+    for n, p in enumerate(probabilities, start=1):
+        for j in range(n, 0, -1):
+            dist[j] = dist[j] * (1.0 - p) + dist[j - 1] * p
+        dist[0] *= (1.0 - p)
+    return sum(dist[k:])
+
+
+def attempts_for_confidence(p, confidence):
+    """
+    Tentativas necessárias para atingir o preset com a confiança dada.
+    
+    Args:
+        p: Probabilidade de sucesso por rolagem.
+        confidence: Confiança desejada (ex: 0.9).
+    
+    Returns:
+        int: Número de tentativas (None se p for 0).
+    """
+    if p <= 0:
+        return None
+    if p >= 1:
+        return 1
+    return int(math.ceil(math.log(1.0 - confidence) / math.log(1.0 - p)))
+
+
+class RollStats:
+    """
+    Estatísticas acumuladas de rolagens de um tipo de item.
+    
+    As tabelas por atributo têm no máximo max_attributes nomes: quando
+    enchem, os nomes vistos uma única vez (em geral lixo de OCR) são
+    descartados e, se ainda não houver espaço, o nome novo é ignorado.
+    """
+    
+    def __init__(self, max_bins=None, max_attributes=None):
+        self.max_bins = max_bins or ROLL_STATS_CONFIG['max_bins']
+        self.max_attributes = max_attributes or ROLL_STATS_CONFIG['max_attributes']
+        self.rolls = 0
+        self.tier_rolls = 0
+        self.attribute_counts = {}
+        self.value_histograms = {}
+        self.tier_counts = {}
+        self.rolls_with_tier = {}
+        self.attributes_per_roll = {}
+    
+    def observe(self, values, tiers=None):
+        """
+        Registra uma rolagem lida pelo OCR.
+        
+        Args:
+            values: Roll (ou dicionário {nome_atributo: valor}) da rolagem.
+            tiers: Lista de dicts {'tier', 'name', 'value'} (opcional; com um
+                Roll que tenha tiers, eles são usados diretamente).
+        """
+        self.rolls += 1
+        names = set()
+        
+        # Roll: nomes já vêm normalizados do registro
+        is_roll = isinstance(values, Roll)
+        for name, value in values.items():
+            if not is_roll:
+                name = normalize_name(name)
+            names.add(name)
+            if name not in self.attribute_counts and not self._make_room(self.attribute_counts):
+                continue
+            self.attribute_counts[name] = self.attribute_counts.get(name, 0) + 1
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if name not in self.value_histograms:
+                    self.value_histograms[name] = ValueHistogram(self.max_bins)
+                self.value_histograms[name].add(value)
+        
+        if tiers is not None:
+            tier_items = [(normalize_name(attr['name']), attr['tier']) for attr in tiers]
+        elif isinstance(values, Roll) and values.has_tiers():
+            tier_items = values.tier_items()
+        else:
+            tier_items = None
+        
+        if tier_items is not None:
+            self.tier_rolls += 1
+            for name, tier in tier_items:
+                if name not in self.tier_counts and not self._make_room(self.tier_counts):
+                    continue
+                counts = self.tier_counts.setdefault(name, {})
+                counts[tier] = counts.get(tier, 0) + 1
+            for tier in {tier for _, tier in tier_items}:
+                self.rolls_with_tier[tier] = self.rolls_with_tier.get(tier, 0) + 1
+        
+        count = len(names)
+        self.attributes_per_roll[count] = self.attributes_per_roll.get(count, 0) + 1
+    
+    def _make_room(self, table):
+        """
+        Garante espaço para um nome novo em uma tabela por atributo.
+        
+        Args:
+            table: attribute_counts ou tier_counts.
+        
+        Returns:
+            bool: True se o nome novo cabe.
+        """
+        if len(table) < self.max_attributes:
+            return True
+        
+        if table is self.attribute_counts:
+            rare = [name for name, count in table.items() if count <= 1]
+            for name in rare:
+                del table[name]
+                self.value_histograms.pop(name, None)
+        else:
+            rare = [name for name, counts in table.items() if sum(counts.values()) <= 1]
+            for name in rare:
+                del table[name]
+        return len(table) < self.max_attributes
+    
+    # ============================================
+    # PROBABILIDADES POR ATRIBUTO
+    # ============================================
+    
+    def p_attribute(self, name):
+        """
+        Probabilidade de um atributo aparecer em uma rolagem.
+        
+        Usa o estimador de Jeffreys (c + 0.5) / (n + 1) para que atributos
+        ainda não vistos não tenham probabilidade zero.
+        """
+        count = self.attribute_counts.get(normalize_name(name), 0)
+        return (count + 0.5) / (self.rolls + 1)
+    
+    def p_value_at_least(self, name, threshold):
+        """Probabilidade de o atributo aparecer com valor >= threshold."""
+        name = normalize_name(name)
+        hist = self.value_histograms.get(name)
+        if hist is None or not hist.count:
+            return self.p_attribute(name) * 0.5
+        # Suaviza pela contagem de aparições com valor
+        fraction = (hist.fraction_at_least(threshold) * hist.count + 0.5) / (hist.count + 1)
+        return self.p_attribute(name) * fraction
+    
+    def p_tier(self, name, tier=7):
+        """Probabilidade de o atributo aparecer com o tier dado."""
+        counts = self.tier_counts.get(normalize_name(name), {})
+        return (counts.get(tier, 0) + 0.5) / (self.tier_rolls + 1)
+    
+    def p_any_tier(self, tier=7, names=None):
+        """
+        Probabilidade de pelo menos um atributo com o tier dado.
+        
+        Args:
+            tier: Tier procurado.
+            names: Atributos aceitos (None = qualquer).
+        """
+        if names is None:
+            # Qualquer atributo: contagem direta das rolagens com o tier
+            return (self.rolls_with_tier.get(tier, 0) + 0.5) / (self.tier_rolls + 1)
+        
+        names = [normalize_name(n) for n in names]
+        if not names:
+            return 0.5 / (self.tier_rolls + 1)
+        
+        p_none = 1.0
+        for name in names:
+            p_none *= 1.0 - self.p_tier(name, tier)
+        return 1.0 - p_none
+    
+    # ============================================
+    # PROBABILIDADE DE UM PRESET
+    # ============================================
+    
+    def p_match(self, tab_type, data):
+        """
+        Estima a chance de um preset ser atingido em uma rolagem.
+        
+        Assume atributos independentes; o modo MÍNIMO usa a distribuição de
+        Poisson-binomial dos atributos opcionais.
+        
+        Args:
+            tab_type: Tipo do preset ('values', 'search', 't7', 'keys').
+            data: Dados do preset como salvos.
+        
+        Returns:
+            float: Probabilidade estimada por rolagem.
+        """
+        if tab_type == 'values':
+            p = 1.0
+            for target in data or []:
+                name = normalize_name(target.get('name', ''))
+                try:
+                    threshold = float(str(target.get('value', '')).strip())
+                except ValueError:
+                    continue
+                if name:
+                    p *= self.p_value_at_least(name, threshold)
+            return p
+        
+        data = data or {}
+        if tab_type == 't7':
+            names = None
+            if data.get('mode', 'ANY') == 'SPECIFIC':
+                names = [normalize_name(a) for a in data.get('specific_attributes', [])]
+            return self.p_any_tier(7, names)
+        
+        required = []
+        optional = []
+        for attr in data.get('attributes', []):
+            if isinstance(attr, str):
+                attr = {'name': attr}
+            name = normalize_name(attr.get('name', ''))
+            if name:
+                (required if attr.get('required', False) else optional).append(self.p_attribute(name))
+        
+        if not required and not optional:
+            return 0.0
+        
+        p_required = 1.0
+        for p in required:
+            p_required *= p
+        
+        if data.get('mode', 'ALL') == 'ALL':
+            return p_required * math.prod(optional)
+        
+        try:
+            min_count = int(data.get('min_count', 1))
+        except (TypeError, ValueError):
+            min_count = 1
+        return p_required * poisson_binomial_at_least(optional, min_count - len(required))
+    
+    def estimate(self, tab_type, data, remaining_budget=None):
+        """
+        Estima o custo restante de um preset.
+        
+        Args:
+            tab_type: Tipo do preset.
+            data: Dados do preset.
+            remaining_budget: Tentativas que ainda restam na execução.
+        
+        Returns:
+            dict: p, tentativas esperadas, tentativas para 90% e se é inviável.
+        """
+        p = self.p_match(tab_type, data)
+        expected = 1.0 / p if p > 0 else None
+        p_within_budget = None
+        if remaining_budget is not None:
+            p_within_budget = 1.0 - (1.0 - p) ** max(0, remaining_budget) if p > 0 else 0.0
+        
+        hopeless = (
+            self.rolls >= ROLL_STATS_CONFIG['min_rolls']
+            and p_within_budget is not None
+            and p_within_budget < ROLL_STATS_CONFIG['hopeless_probability']
+        )
+        
+        return {
+            'rolls_observed': self.rolls,
+            'p_match': p,
+            'expected_attempts': expected,
+            'attempts_p90': attempts_for_confidence(p, 0.9),
+            'p_within_budget': p_within_budget,
+            'hopeless': hopeless,
+        }
+    
+    # ============================================
+    # PERSISTÊNCIA
+    # ============================================
+    
+    def to_dict(self):
+        """Retorna as estatísticas em formato serializável."""
+        return {
+            'rolls': self.rolls,
+            'tier_rolls': self.tier_rolls,
+            'attribute_counts': self.attribute_counts,
+            'value_histograms': {k: v.to_dict() for k, v in self.value_histograms.items()},
+            'tier_counts': {k: {str(t): c for t, c in v.items()} for k, v in self.tier_counts.items()},
+            'rolls_with_tier': {str(k): v for k, v in self.rolls_with_tier.items()},
+            'attributes_per_roll': {str(k): v for k, v in self.attributes_per_roll.items()},
+        }
+    
+    @classmethod
+    def from_dict(cls, data, max_bins=None, max_attributes=None):
+        """Recria as estatísticas salvas por to_dict()."""
+        stats = cls(max_bins, max_attributes)
+        data = data or {}
+        stats.rolls = data.get('rolls', 0)
+        stats.tier_rolls = data.get('tier_rolls', 0)
+        stats.attribute_counts = dict(data.get('attribute_counts', {}))
+        stats.value_histograms = {
+            k: ValueHistogram.from_dict(v, stats.max_bins)
+            for k, v in data.get('value_histograms', {}).items()
+        }
+        stats.tier_counts = {
+            k: {int(t): c for t, c in v.items()} for k, v in data.get('tier_counts', {}).items()
+        }
+        stats.rolls_with_tier = {int(k): v for k, v in data.get('rolls_with_tier', {}).items()}
+        stats.attributes_per_roll = {int(k): v for k, v in data.get('attributes_per_roll', {}).items()}
+        return stats
+
+
+class RollStatsStore:
+    """Estatísticas persistidas por tipo de item ('items' e 'keys')."""
+    
+    def __init__(self, stats_file=None):
+        self.stats_file = stats_file or ROLL_STATS_FILE
+        self._pools = None
+    
+    def get(self, pool):
+        """
+        Retorna as estatísticas de um tipo de item (carregando do disco).
+        
+        Args:
+            pool: 'items' (equipamentos) ou 'keys' (chaves).
+        
+        Returns:
+            RollStats: Estatísticas acumuladas.
+        """
+        if self._pools is None:
+            try:
+                saved = read_json(self.stats_file, {}) or {}
+            except Exception as e:
+                print(f"Erro ao carregar estatísticas: {e}")
+                saved = {}
+            self._pools = {name: RollStats.from_dict(data) for name, data in saved.items()}
+        
+        if pool not in self._pools:
+            self._pools[pool] = RollStats()
+        return self._pools[pool]
+    
+    def save(self):
+        """Grava as estatísticas (escrita atômica)."""
+        if self._pools is None:
+            return
+        try:
+            atomic_write_json(self.stats_file, {k: v.to_dict() for k, v in self._pools.items()}, indent=None)
+        except Exception as e:
+            print(f"Erro ao salvar estatísticas: {e}")
+
+
+def pool_for_mode(mode):
+    """Retorna o tipo de item rolado em um modo do motor."""
+    return 'keys' if mode == 'keys' else 'items'
+
+
+def format_estimate(estimate, unit='tentativas'):
+    """
+    Formata uma estimativa para o log.
+    
+    Args:
+        estimate: Dict retornado por RollStats.estimate().
+        unit: Unidade do custo ('tentativas' ou 'orbs').
+    
+    Returns:
+        str: Linha legível.
+    """
+    p = estimate['p_match']
+    if not estimate['expected_attempts']:
+        return f"📈 p(preset)≈0 em {estimate['rolls_observed']} rolagens observadas"
+    return (
+        f"📈 p(preset)≈{p * 100:.2f}% → ~{estimate['expected_attempts']:.0f} {unit} "
+        f"(90%: {estimate['attempts_p90']}) [{estimate['rolls_observed']} rolagens observadas]"
+    )
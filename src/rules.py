@@ -0,0 +1,540 @@
+"""
+Módulo de regras.
+Uma regra é uma expressão booleana sobre a rolagem lida, salva na seção
+'rules' do game_automation_presets.json e compilada uma vez em closures
+Python. Exemplos:
+    
+    ("vida%" >= 10 and mana >= 150) or T7(força)
+    count(vida, mana, dano, defesa) >= 3 and weight(vida: 2, mana: 1, dano: 3) >= 5
+
+Referências a atributos valem o valor lido (ou "ausente"); em contexto
+booleano valem a presença do atributo. Comparações com atributo ausente são
+falsas. Funções: T7(nomes...), tier(nome), count(nomes...),
+weight(nome: peso, ...) e has(nome).
+"""
+import re
+import operator
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.matching import normalize_name
+from src.matcher import PresetMatcher
+from src.roll import REGISTRY, Roll
+
+
+class RuleError(ValueError):
+    """Erro de sintaxe ou de compilação de uma regra."""
+    
+    def __init__(self, message, position=None):
+        if position is not None:
+            message = f"{message} (posição {position + 1})"
+        super().__init__(message)
+        self.position = position
+
+
+# ============================================
+# ANÁLISE LÉXICA
+# ============================================
+
+_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<string>"[^"]*"|'[^']*')
+  | (?P<op>>=|<=|==|!=|>|<|\+|-|\*|/|\(|\)|,|:)
+  | (?P<name>[^\W\d][\w%]*)
+""", re.VERBOSE)
+
+_KEYWORDS = {'and', 'or', 'not', 'true', 'false'}
+
+
+def tokenize(text):
+    """
+    Quebra a expressão em tokens.
+    
+    Args:
+        text: Texto da regra.
+    
+    Returns:
+        list: Tuplas (tipo, valor, posição).
+    
+    Raises:
+        RuleError: Se houver um caractere inválido.
+    """
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if not m:
+            raise RuleError(f"Caractere inválido '{text[pos]}'", pos)
+        kind = m.lastgroup
+        value = m.group()
+        if kind == 'string':
+            kind, value = 'name', value[1:-1]
+        elif kind == 'name' and value.lower() in _KEYWORDS:
+            kind, value = 'keyword', value.lower()
+        if kind != 'space':
+            tokens.append((kind, value, pos))
+        pos = m.end()
+    tokens.append(('end', '', len(text)))
+    return tokens
+
+
+# ============================================
+# ANÁLISE SINTÁTICA
+# ============================================
+# Gramática (da menor para a maior precedência):
+#   or      := and ('or' and)*
+#   and     := not ('and' not)*
+#   not     := 'not' not | compare
+#   compare := sum (('>=' | '<=' | '==' | '!=' | '>' | '<') sum)?
+#   sum     := product (('+' | '-') product)*
+#   product := unary (('*' | '/') unary)*
+#   unary   := '-' unary | atom
+#   atom    := número | 'true' | 'false' | nome | função '(' args ')' | '(' or ')'
+
+class _Parser:
+    """Parser descendente recursivo que gera uma árvore de tuplas."""
+    
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.index = 0
+    
+    def peek(self):
+        return self.tokens[self.index]
+    
+    def take(self):
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+    
+    def accept(self, kind, value=None):
+        token = self.peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            self.index += 1
+            return token
+        return None
+    
+    def expect(self, kind, value=None):
+        token = self.accept(kind, value)
+        if token is None:
+            found = self.peek()
+            raise RuleError(f"Esperado '{value or kind}', encontrado '{found[1] or 'fim'}'", found[2])
+        return token
+    
+    def parse(self):
+        node = self.parse_or()
+        token = self.peek()
+        if token[0] != 'end':
+            raise RuleError(f"Token inesperado '{token[1]}'", token[2])
+        return node
+    
+    def parse_or(self):
+        node = self.parse_and()
+        while self.accept('keyword', 'or'):
+            node = ('or', node, self.parse_and())
+        return node
+    
+    def parse_and(self):
+        node = self.parse_not()
+        while self.accept('keyword', 'and'):
+            node = ('and', node, self.parse_not())
+        return node
+    
+    def parse_not(self):
+        if self.accept('keyword', 'not'):
+            return ('not', self.parse_not())
+        return self.parse_compare()
+    
+    def parse_compare(self):
+        node = self.parse_sum()
+        token = self.peek()
+        if token[0] == 'op' and token[1] in _COMPARISONS:
+            self.take()
+            node = ('cmp', token[1], node, self.parse_sum())
+        return node
+    
+    def parse_sum(self):
+        node = self.parse_product()
+        while True:
+            token = self.peek()
+            if token[0] != 'op' or token[1] not in '+-':
+                return node
+            self.take()
+            node = ('arith', token[1], node, self.parse_product())
+    
+    def parse_product(self):
+        node = self.parse_unary()
+        while True:
+            token = self.peek()
+            if token[0] != 'op' or token[1] not in '*/':
+                return node
+            self.take()
+            node = ('arith', token[1], node, self.parse_unary())
+    
+    def parse_unary(self):
+        if self.accept('op', '-'):
+            return ('arith', '-', ('num', 0.0), self.parse_unary())
+        return self.parse_atom()
+    
+    def parse_atom(self):
+        kind, value, pos = self.take()
+        if kind == 'number':
+            return ('num', float(value))
+        if kind == 'keyword' and value in ('true', 'false'):
+            return ('bool', value == 'true')
+        if kind == 'op' and value == '(':
+            node = self.parse_or()
+            self.expect('op', ')')
+            return node
+        if kind == 'name':
+            if self.peek()[0:2] == ('op', '(') and value.lower() in _FUNCTIONS:
+                self.take()
+                return self.parse_call(value.lower(), pos)
+            return ('attr', normalize_name(value))
+        raise RuleError(f"Token inesperado '{value or 'fim'}'", pos)
+    
+    def parse_call(self, func, pos):
+        """Lê os argumentos de uma função (nomes, ou nome: peso no weight)."""
+        args = []
+        if not self.accept('op', ')'):
+            while True:
+                name = normalize_name(self.expect('name')[1])
+                if func == 'weight':
+                    self.expect('op', ':')
+                    args.append((name, float(self.expect('number')[1])))
+                else:
+                    args.append(name)
+                if self.accept('op', ')'):
+                    break
+                self.expect('op', ',')
+        
+        minimum, maximum = _FUNCTIONS[func]
+        if len(args) < minimum or (maximum is not None and len(args) > maximum):
+            raise RuleError(f"Número de argumentos inválido para {func}()", pos)
+        return ('call', func, tuple(args))
+
+
+_COMPARISONS = {
+    '>=': operator.ge,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '<': operator.lt,
+}
+
+_ARITHMETIC = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': lambda a, b: a / b if b else None,
+}
+
+# função -> (mínimo, máximo) de argumentos
+_FUNCTIONS = {
+    't7': (0, None),
+    'tier': (1, 1),
+    'count': (1, None),
+    'weight': (1, None),
+    'has': (1, 1),
+}
+
+
+def parse_rule(text):
+    """
+    Converte o texto de uma regra em árvore sintática.
+    
+    Args:
+        text: Texto da regra.
+    
+    Returns:
+        tuple: Nó raiz da árvore.
+    
+    Raises:
+        RuleError: Se a regra for inválida.
+    """
+    if not text or not text.strip():
+        raise RuleError("Regra vazia")
+    return _Parser(text).parse()
+
+
+# ============================================
+# COMPILAÇÃO
+# ============================================
+# Cada nó vira uma closure f(vals, tiers, t7_names): vals e tiers são listas
+# com uma posição por atributo citado na regra (None = ausente) e t7_names é
+# a lista de nomes com T7 da rolagem. Valores numéricos ausentes propagam None.
+
+class _Compiler:
+    """Converte a árvore sintática em closures."""
+    
+    def __init__(self, index):
+        self.index = index
+        self.slots = {}
+    
+    def slot(self, name):
+        """Posição do atributo nas listas da rolagem (pelo id do registro global)."""
+        attr_id = self.index.intern(name)
+        return self.slots.setdefault(attr_id, len(self.slots))
+    
+    def value(self, node):
+        """Compila um nó em contexto numérico."""
+        kind = node[0]
+        
+        if kind == 'num':
+            constant = node[1]
+            return lambda vals, tiers, t7: constant
+        
+        if kind == 'attr':
+            bit = self.slot(node[1])
+            return lambda vals, tiers, t7: vals[bit]
+        
+        if kind == 'arith':
+            op = _ARITHMETIC[node[1]]
+            left, right = self.value(node[2]), self.value(node[3])
+            
+            def arith(vals, tiers, t7):
+                a = left(vals, tiers, t7)
+                if a is None:
+                    return None
+                b = right(vals, tiers, t7)
+                return None if b is None else op(a, b)
+            return arith
+        
+        if kind == 'call':
+            return self.call(node[1], node[2])
+        
+        # Booleanos em contexto numérico valem 1/0
+        test = self.test(node)
+        return lambda vals, tiers, t7: 1.0 if test(vals, tiers, t7) else 0.0
+    
+    def test(self, node):
+        """Compila um nó em contexto booleano."""
+        kind = node[0]
+        
+        if kind == 'bool':
+            constant = node[1]
+            return lambda vals, tiers, t7: constant
+        
+        if kind == 'attr':
+            bit = self.slot(node[1])
+            return lambda vals, tiers, t7: vals[bit] is not None
+        
+        if kind == 'and':
+            left, right = self.test(node[1]), self.test(node[2])
+            return lambda vals, tiers, t7: left(vals, tiers, t7) and right(vals, tiers, t7)
+        
+        if kind == 'or':
+            left, right = self.test(node[1]), self.test(node[2])
+            return lambda vals, tiers, t7: left(vals, tiers, t7) or right(vals, tiers, t7)
+        
+        if kind == 'not':
+            inner = self.test(node[1])
+            return lambda vals, tiers, t7: not inner(vals, tiers, t7)
+        
+        if kind == 'cmp':
+            op = _COMPARISONS[node[1]]
+            left, right = self.value(node[2]), self.value(node[3])
+            
+            def compare(vals, tiers, t7):
+                a = left(vals, tiers, t7)
+                if a is None:
+                    return False
+                b = right(vals, tiers, t7)
+                return b is not None and op(a, b)
+            return compare
+        
+        if kind == 'call' and node[1] in ('t7', 'has'):
+            return self.call(node[1], node[2])
+        
+        value = self.value(node)
+        
+        def truthy(vals, tiers, t7):
+            result = value(vals, tiers, t7)
+            return bool(result) if result is not None else False
+        return truthy
+    
+    def call(self, func, args):
+        """Compila uma chamada de função."""
+        if func == 't7':
+            names = args
+            if not names:
+                return lambda vals, tiers, t7: bool(t7)
+            # Mesma comparação por substring do matching.find_t7
+            return lambda vals, tiers, t7: any(
+                s in found or found in s for found in t7 for s in names
+            )
+        
+        if func == 'tier':
+            bit = self.slot(args[0])
+            return lambda vals, tiers, t7: tiers[bit]
+        
+        if func == 'has':
+            bit = self.slot(args[0])
+            return lambda vals, tiers, t7: vals[bit] is not None
+        
+        if func == 'count':
+            bits = tuple(self.slot(name) for name in args)
+            return lambda vals, tiers, t7: float(sum(1 for bit in bits if vals[bit] is not None))
+        
+        if func == 'weight':
+            weights = tuple((self.slot(name), weight) for name, weight in args)
+            return lambda vals, tiers, t7: sum(w for bit, w in weights if vals[bit] is not None)
+        
+        raise RuleError(f"Função desconhecida: {func}()")
+
+
+class RuleMatcher(PresetMatcher):
+    """Matcher de uma regra compilada (usável em qualquer modo)."""
+    
+    __slots__ = ('expression', '_predicate', '_slots')
+    
+    def __init__(self, expression):
+        super().__init__('rules', expression)
+        self.expression = expression
+        compiler = _Compiler(self._index)
+        self._predicate = compiler.test(parse_rule(expression))
+        self._slots = compiler.slots
+    
+    def _bind(self, values, tier_attrs):
+        """Monta as listas da rolagem (uma passada sobre os atributos lidos)."""
+        slots = self._slots
+        vals = [None] * len(slots)
+        tiers = [None] * len(slots)
+        
+        if isinstance(values, Roll):
+            entries = values.entries()
+            t7 = values.t7_names()
+        else:
+            entries = [(REGISTRY.lookup(key), value, 0) for key, value in values.items()]
+            t7 = []
+        if isinstance(tier_attrs, Roll):
+            if tier_attrs is not values:
+                entries += tier_attrs.entries()
+                t7 += tier_attrs.t7_names()
+        elif tier_attrs:
+            for attr in tier_attrs:
+                attr_id, normalized = REGISTRY.resolve(attr['name'])
+                entries.append((attr_id, attr['value'], attr['tier']))
+                if attr['tier'] == 7:
+                    t7.append(normalized or REGISTRY.name(attr_id))
+        
+        for attr_id, value, tier in entries:
+            slot = slots.get(attr_id)
+            if slot is None:
+                continue
+            if vals[slot] is None:
+                vals[slot] = value
+            if tier and (tiers[slot] is None or tier > tiers[slot]):
+                tiers[slot] = tier
+        
+        return vals, tiers, t7
+    
+    def match(self, values, t7_attrs=None):
+        """
+        Avalia a regra.
+        
+        Args:
+            values: Roll (ou dicionário {nome_atributo: valor}) lido pelo OCR.
+            t7_attrs: Atributos com tier (Roll ou lista de {'tier', 'name', 'value'}).
+        
+        Returns:
+            bool: True se a regra foi atingida.
+        """
+        return self._predicate(*self._bind(values or {}, t7_attrs))
+    
+    def find(self, t7_attrs, tier_attrs=None):
+        """
+        Avalia a regra no modo T7 (mesma interface do T7Matcher).
+        
+        Args:
+            t7_attrs: Atributos T7 lidos.
+            tier_attrs: Todos os atributos com tier da rolagem.
+        
+        Returns:
+            dict: Atributo exibido como resultado (o primeiro T7, se houver)
+                ou None se a regra não foi atingida.
+        """
+        if not isinstance(tier_attrs, Roll):
+            tier_attrs = Roll.from_tier_attrs(tier_attrs or t7_attrs)
+        if not self.match(tier_attrs):
+            return None
+        shown = t7_attrs or tier_attrs.tier_attrs()
+        return shown[0] if shown else {'name': 'regra', 'value': '✓'}
+    
+    def explain(self, values, t7_attrs=None):
+        """Texto detalhado: a regra, os atributos referenciados e o resultado."""
+        vals, tiers, _ = self._bind(values or {}, t7_attrs)
+        details = [f"📜 Regra: {self.expression}"]
+        for name, attr_id in self._index.names():
+            slot = self._slots[attr_id]
+            if vals[slot] is None:
+                details.append(f"❌ {name.upper()}: NÃO ENCONTRADO")
+            elif tiers[slot] is not None:
+                details.append(f"✅ {name.upper()}: {vals[slot]} (T{tiers[slot]})")
+            else:
+                details.append(f"✅ {name.upper()}: {vals[slot]}")
+        
+        if self.match(values, t7_attrs):
+            details.append("🎯 REGRA ATINGIDA!")
+        else:
+            details.append("⏳ Regra não atingida")
+        return "\n".join(details)
+
+
+def compile_rule(expression):
+    """
+    Compila o texto de uma regra.
+    
+    Args:
+        expression: Texto da regra.
+    
+    Returns:
+        RuleMatcher: Matcher da regra.
+    
+    Raises:
+        RuleError: Se a regra for inválida.
+    """
+    return RuleMatcher(expression)
+
+
+def rule_uses_tiers(expression):
+    """
+    Indica se a regra depende de tiers (t7() ou tier()).
+    
+    Args:
+        expression: Texto da regra.
+    
+    Returns:
+        bool: True se alguma chamada da regra lê tiers.
+    
+    Raises:
+        RuleError: Se a regra for inválida.
+    """
+    def walk(node):
+        if not isinstance(node, tuple):
+            return False
+        if node[0] == 'call' and node[1] in ('t7', 'tier'):
+            return True
+        return any(walk(child) for child in node[1:])
+    
+    return walk(parse_rule(expression))
+
+
+def rule_expression(data):
+    """
+    Extrai o texto de uma regra salva.
+    
+    Args:
+        data: Regra como salva na seção 'rules' (texto ou {'expression': ...}).
+    
+    Returns:
+        str: Texto da regra ou None.
+    """
+    if isinstance(data, str):
+        return data
+    if data:
+        return data.get('expression')
+    return None
@@ -0,0 +1,263 @@
+"""
+Runner headless do motor de automação.
+Roda o AutomationEngine sem Tk nem GameAutomation, a partir dos arquivos de
+configuração e presets, e imprime as métricas no stdout.
+
+Uso:
+    python -m src.run --preset equip-tank --mode attributes [--max-attempts 500] [--resume]
+"""
+import argparse
+import threading
+import time
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import METRICS_SERVER_CONFIG
+from src.presets import create_preset_manager
+from src.profiling import MODES
+from src.runspec import MODE_TAB_TYPES, load_run_spec
+
+
+class HeadlessHost:
+    """Host do motor que escreve no stdout em vez de widgets."""
+    
+    def __init__(self, verbose=False, output=print):
+        """
+        Cria o host.
+        
+        Args:
+            verbose: Se também imprime o log detalhado e o status.
+            output: Função usada para imprimir.
+        """
+        self.verbose = verbose
+        self.output = output
+        self.engine = None
+        self.finished = threading.Event()
+    
+    def log(self, message):
+        """Log principal."""
+        self.output(f"[{time.strftime('%H:%M:%S')}] {message}")
+    
+    def log_to_detail(self, message, tag='info'):
+        """Log detalhado (apenas no modo verbose)."""
+        if self.verbose:
+            self.output(message)
+    
+    def detail_enabled(self):
+        """O log detalhado só é impresso no modo verbose."""
+        return self.verbose
+    
+    def update_status(self, text, status_type='info'):
+        """Status da execução (apenas no modo verbose)."""
+        if self.verbose:
+            self.output(f"● {text}")
+    
+    def stop_automation(self):
+        """Chamado pelo motor ao terminar."""
+        if self.engine:
+            self.engine.stop()
+        self.finished.set()
+    
+    def notify(self, title, message):
+        """Notificação de fim de execução."""
+        self.output(f"== {title} ==\n{message}")
+
+
+def resolve_preset_name(presets_file, tab_type, name):
+    """
+    Encontra o preset pelo nome, aceitando '-'/'_' no lugar de espaços.
+    
+    Args:
+        presets_file: Arquivo de presets (None = backend configurado).
+        tab_type: Tipo do preset.
+        name: Nome informado na linha de comando.
+    
+    Returns:
+        str: Nome exato do preset salvo (ou o nome informado).
+    """
+    names = create_preset_manager(presets_file).get_preset_names(tab_type)
+    if name in names:
+        return name
+    
+    wanted = ' '.join(name.replace('-', ' ').replace('_', ' ').lower().split())
+    for candidate in names:
+        if ' '.join(candidate.lower().split()) == wanted:
+            return candidate
+    return name
+
+
+def alternative_from_arg(presets_file, text):
+    """
+    Converte TIPO:NOME[@X,Y] da linha de comando em preset alternativo.
+    
+    Args:
+        presets_file: Arquivo de presets.
+        text: Texto informado em --also.
+    
+    Returns:
+        dict: Entrada no formato de 'alternative_presets'.
+    """
+    target, _, position = text.partition('@')
+    tab_type, _, name = target.partition(':')
+    if not name:
+        tab_type, name = 'search', tab_type
+    
+    name = resolve_preset_name(presets_file, tab_type, name)
+    alternative = {'rule': name} if tab_type == 'rules' else {'tab_type': tab_type, 'preset': name}
+    if position:
+        alternative['bp_position'] = [int(v) for v in position.split(',')]
+    return alternative
+
+
+def format_metrics(metrics):
+    """Formata as métricas do motor em uma linha."""
+    line = (
+        f"📊 rolagens={metrics.get('rolls', 0)} capturas={metrics.get('captures', 0)} "
+        f"tempo={metrics.get('elapsed', 0.0):.1f}s taxa={metrics.get('rolls_per_minute', 0.0):.1f}/min "
+        f"sucesso={'sim' if metrics.get('success') else 'não'}"
+    )
+    if metrics.get('matched_preset'):
+        line += f" preset='{metrics['matched_preset']}'"
+    if metrics.get('stop_exit_ms') is not None:
+        line += (
+            f" parada={metrics['stop_exit_ms']:.1f}ms"
+            f" (último input +{metrics['stop_input_ms']:.1f}ms)"
+        )
+    return line
+
+
+def grid_from_args(values):
+    """Converte X Y CELL_W CELL_H ROWS COLS da linha de comando em grade."""
+    if not values:
+        return None
+    x, y, width, height, rows, cols = values
+    return {'origin': [x, y], 'cell_size': [width, height], 'rows': rows, 'cols': cols}
+
+
+def build_parser():
+    """Cria o parser de argumentos."""
+    parser = argparse.ArgumentParser(description="Runner headless do Reroll do Cadeiras")
+    parser.add_argument('--mode', required=True, choices=sorted(list(MODE_TAB_TYPES) + ['jobs']),
+                        help="Modo de automação")
+    parser.add_argument('--preset', default='Preset 1', help="Nome do preset")
+    parser.add_argument('--rule', help="Nome de uma regra da seção 'rules' (substitui o preset)")
+    parser.add_argument('--also', action='append', metavar='TIPO:NOME[@X,Y]',
+                        help="Preset (ou 'rules:NOME') também aceito; @X,Y define a BP das chaves desse preset")
+    parser.add_argument('--config', help="Arquivo de configuração (padrão: backend configurado)")
+    parser.add_argument('--presets', help="Arquivo de presets (padrão: backend configurado)")
+    parser.add_argument('--region', type=int, nargs=4, metavar=('LEFT', 'TOP', 'RIGHT', 'BOTTOM'))
+    parser.add_argument('--delay', type=float, help="Delay entre rolagens (s)")
+    parser.add_argument('--click-delay', type=float, help="Delay do click (ms)")
+    parser.add_argument('--max-attempts', type=int, help="Máximo de tentativas")
+    parser.add_argument('--key-pos', type=int, nargs=2, metavar=('X', 'Y'))
+    parser.add_argument('--orb-pos', type=int, nargs=2, metavar=('X', 'Y'))
+    parser.add_argument('--bp-pos', type=int, nargs=2, metavar=('X', 'Y'))
+    parser.add_argument('--grid', type=int, nargs=6, metavar=('X', 'Y', 'CELL_W', 'CELL_H', 'ROWS', 'COLS'),
+                        help="Grade de chaves do inventário (modo keys em lote)")
+    parser.add_argument('--bp-grid', type=int, nargs=6, metavar=('X', 'Y', 'CELL_W', 'CELL_H', 'ROWS', 'COLS'),
+                        help="Grade da BP (destinos das chaves boas)")
+    parser.add_argument('--resume', action='store_true', help="Retoma do checkpoint salvo, se houver")
+    parser.add_argument('--interval', type=float, default=10.0, help="Intervalo (s) das métricas; 0 desativa")
+    parser.add_argument('--verbose', '-v', action='store_true', help="Imprime o log detalhado")
+    parser.add_argument('--trace', metavar='ARQUIVO',
+                        help="Grava um Chrome trace (Perfetto) da execução em ARQUIVO")
+    parser.add_argument('--profile', type=int, metavar='N',
+                        help="Perfila as primeiras N iterações do loop (grava em profiles/)")
+    parser.add_argument('--profile-mode', choices=MODES, help="cprofile (.pstats) ou sample (.folded)")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="Compara snapshots do tracemalloc do início e do fim do profiling")
+    parser.add_argument('--metrics-port', type=int, metavar='PORTA',
+                        help="Expõe as métricas (Prometheus) em http://127.0.0.1:PORTA/metrics")
+    return parser
+
+
+def main(argv=None):
+    """Ponto de entrada de linha de comando."""
+    args = build_parser().parse_args(argv)
+    
+    preset_name = args.preset
+    if args.mode != 'jobs':
+        preset_name = resolve_preset_name(args.presets, MODE_TAB_TYPES[args.mode], args.preset)
+    
+    spec = load_run_spec(
+        args.mode, preset_name,
+        config_file=args.config,
+        presets_file=args.presets,
+        rule_name=resolve_preset_name(args.presets, 'rules', args.rule) if args.rule else None,
+        alternatives={args.mode: [alternative_from_arg(args.presets, text) for text in args.also]} if args.also else None,
+        region=args.region,
+        delay=args.delay,
+        click_delay=args.click_delay / 1000.0 if args.click_delay is not None else None,
+        max_attempts=args.max_attempts,
+        key_position=args.key_pos,
+        orb_position=args.orb_pos,
+        bp_position=args.bp_pos,
+        key_grid=grid_from_args(args.grid),
+        bp_grid=grid_from_args(args.bp_grid)
+    )
+    
+    error = spec.validate()
+    if error:
+        print(f"❌ {error}")
+        return 2
+    
+    # Importado aqui: o motor puxa pyautogui/keyboard/tesseract
+    from src.automation import AutomationEngine
+    from src.checkpoint import describe_checkpoint
+    from src.tracing import TRACER
+    
+    if args.trace:
+        TRACER.enable(args.trace)
+    
+    host = HeadlessHost(verbose=args.verbose)
+    engine = AutomationEngine(host)
+    host.engine = engine
+    
+    if args.profile:
+        engine.profiler.arm(args.profile, args.profile_mode, args.profile_memory or None)
+    
+    if args.metrics_port is not None or METRICS_SERVER_CONFIG['enabled']:
+        from src.metrics_server import MetricsServer
+        try:
+            host.output(f"📈 Métricas em {MetricsServer(engine, port=args.metrics_port).start()}")
+        except OSError as e:
+            host.output(f"⚠️ Servidor de métricas não iniciado: {e}")
+    
+    resume = engine.checkpoints.load_matching(spec)
+    if resume and args.resume:
+        host.output(f"↩️ Retomando checkpoint:\n{describe_checkpoint(resume)}")
+    elif resume:
+        host.output("ℹ️ Existe um checkpoint desta configuração; use --resume para retomar")
+        resume = None
+    
+    engine.start(args.mode, spec, resume=resume)
+    target = f"regra '{spec.rule_name}'" if spec.rule else f"preset '{spec.preset_name}'"
+    if spec.alternatives:
+        target += f" + {len(spec.alternatives)} alternativo(s)"
+    host.log(f"▶️ Automação INICIADA ({args.mode}, {target})")
+    
+    next_report = time.monotonic() + args.interval
+    try:
+        while engine.is_alive() and not host.finished.wait(0.5):
+            if args.interval and time.monotonic() >= next_report:
+                host.output(format_metrics(engine.get_metrics()))
+                next_report += args.interval
+    except KeyboardInterrupt:
+        host.log("⬛ Interrompido")
+        engine.stop()
+        engine.join(timeout=5)
+        host.output(format_metrics(engine.get_metrics()))
+        host.output(engine.instruments.format_table())
+        return 130
+    
+    engine.join(timeout=5)
+    metrics = engine.get_metrics()
+    host.output(format_metrics(metrics))
+    host.output(engine.instruments.format_table())
+    return 0 if metrics.get('success') else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
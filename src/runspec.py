@@ -0,0 +1,310 @@
+"""
+Módulo de especificação de execução.
+Define o RunSpec, uma descrição imutável de tudo que o motor de automação
+precisa para rodar (modo, região, delays, preset e posições), montada a
+partir da interface ou dos arquivos de configuração/presets.
+"""
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import DEFAULT_SETTINGS
+from src.presets import create_preset_manager, create_config_manager
+from src.rules import RuleError, compile_rule, rule_expression, rule_uses_tiers
+
+
+# Modo do motor -> tipo de preset salvo
+MODE_TAB_TYPES = {
+    'values': 'values',
+    'attributes': 'search',
+    't7': 't7',
+    'keys': 'keys',
+}
+
+# Modo do motor -> tipos de preset que a leitura desse modo consegue avaliar
+# (só o modo T7 lê tiers; os demais entregam ao matcher valores sem tier)
+MODE_ALTERNATIVE_TYPES = {
+    'values': ('values', 'search', 'keys', 'rules'),
+    'attributes': ('values', 'search', 'keys', 'rules'),
+    't7': ('values', 'search', 't7', 'keys', 'rules'),
+    'keys': ('values', 'search', 'keys', 'rules'),
+}
+
+
+def freeze(data):
+    """
+    Converte listas e dicts em estruturas imutáveis (tuplas e mapeamentos).
+    
+    Args:
+        data: Estrutura carregada de JSON.
+    
+    Returns:
+        Estrutura equivalente somente leitura.
+    """
+    if isinstance(data, dict):
+        return MappingProxyType({k: freeze(v) for k, v in data.items()})
+    if isinstance(data, (list, tuple)):
+        return tuple(freeze(v) for v in data)
+    return data
+
+
+def thaw(data):
+    """
+    Converte uma estrutura congelada de volta para listas e dicts.
+    
+    Args:
+        data: Estrutura criada por freeze().
+    
+    Returns:
+        Estrutura serializável em JSON.
+    """
+    if isinstance(data, MappingProxyType):
+        return {k: thaw(v) for k, v in data.items()}
+    if isinstance(data, tuple):
+        return [thaw(v) for v in data]
+    return data
+
+
+@dataclass(frozen=True)
+class RunSpec:
+    """Especificação imutável de uma execução do motor de automação."""
+    
+    mode: str
+    region: tuple
+    delay: float = float(DEFAULT_SETTINGS['delay'])
+    click_delay: float = float(DEFAULT_SETTINGS['click_delay']) / 1000.0
+    max_attempts: int = int(DEFAULT_SETTINGS['max_attempts'])
+    preset_name: str = ''
+    preset: object = None
+    rule_name: str = ''
+    rule: str = None
+    key_position: tuple = None
+    orb_position: tuple = None
+    bp_position: tuple = None
+    key_grid: object = None
+    bp_grid: object = None
+    jobs: tuple = field(default_factory=tuple)
+    alternatives: tuple = field(default_factory=tuple)
+    
+    def __post_init__(self):
+        # Normaliza tipos vindos de JSON/Tk (listas -> tuplas, presets congelados)
+        object.__setattr__(self, 'region', tuple(self.region) if self.region else None)
+        object.__setattr__(self, 'preset', freeze(self.preset))
+        object.__setattr__(self, 'jobs', freeze(self.jobs))
+        object.__setattr__(self, 'alternatives', freeze(self.alternatives))
+        object.__setattr__(self, 'key_grid', freeze(self.key_grid) or None)
+        object.__setattr__(self, 'bp_grid', freeze(self.bp_grid) or None)
+        for name in ('key_position', 'orb_position', 'bp_position'):
+            value = getattr(self, name)
+            object.__setattr__(self, name, tuple(value) if value else None)
+    
+    @property
+    def tab_type(self):
+        """Retorna o tipo de preset usado por este modo."""
+        return MODE_TAB_TYPES.get(self.mode)
+    
+    def validate(self):
+        """
+        Verifica se a especificação é executável.
+        
+        Returns:
+            str: Mensagem de erro ou None se válida.
+        """
+        if self.mode not in MODE_TAB_TYPES and self.mode != 'jobs':
+            return f"Modo inválido: {self.mode}"
+        
+        if self.mode == 'jobs':
+            return None if self.jobs else "Nenhum item configurado para o multi-item"
+        
+        if not self.region:
+            return "Configure a região primeiro"
+        
+        if self.rule_name and not self.rule:
+            return f"Regra '{self.rule_name}' não encontrada"
+        
+        if self.rule:
+            try:
+                compile_rule(self.rule)
+            except RuleError as e:
+                return f"Regra inválida: {e}"
+            if self.mode != 't7' and rule_uses_tiers(self.rule):
+                return "A regra usa tiers, que só são lidos no modo T7"
+        elif self.preset is None:
+            return f"Preset '{self.preset_name}' não encontrado"
+        
+        for alternative in self.alternatives:
+            if alternative.get('rule_expression'):
+                try:
+                    compile_rule(alternative['rule_expression'])
+                except RuleError as e:
+                    return f"Regra '{alternative['name']}' inválida: {e}"
+            elif alternative.get('preset_data') is None:
+                return f"Preset alternativo '{alternative['name']}' não encontrado"
+            error = alternative_error(self.mode, alternative)
+            if error:
+                return error
+        
+        if self.mode == 'keys':
+            # Com grade, a posição da chave é a referência do tooltip: sem ela
+            # toda célula seria lida na mesma região
+            required = [('key_position', 'chave'), ('orb_position', 'Orb')]
+            if not self.bp_grid:
+                required.append(('bp_position', 'BP'))
+            for name, label in required:
+                if not getattr(self, name):
+                    return f"Configure a posição da {label}"
+        
+        return None
+
+
+def load_run_spec(mode, preset_name=None, config_file=None, presets_file=None, rule_name=None,
+                  alternatives=None, **overrides):
+    """
+    Monta um RunSpec a partir dos arquivos de configuração e presets.
+    
+    Args:
+        mode: Modo do motor ('values', 'attributes', 't7', 'keys', 'jobs').
+        preset_name: Nome do preset (padrão: 'Preset 1').
+        config_file: Arquivo de configuração (padrão: backend configurado).
+        presets_file: Arquivo de presets (padrão: backend configurado).
+        rule_name: Nome de uma regra da seção 'rules' (substitui o preset).
+        alternatives: Presets também aceitos, por modo ou em lista (padrão:
+            'alternative_presets' da configuração).
+        **overrides: Campos do RunSpec que substituem a configuração salva.
+    
+    Returns:
+        RunSpec: Especificação pronta para o motor.
+    """
+    config = create_config_manager(config_file).load_config()
+    preset_manager = create_preset_manager(presets_file)
+    preset_name = preset_name or 'Preset 1'
+    
+    values = {
+        'mode': mode,
+        'region': config.get('region'),
+        'delay': float(config.get('delay') or DEFAULT_SETTINGS['delay']),
+        'click_delay': float(config.get('click_delay') or DEFAULT_SETTINGS['click_delay']) / 1000.0,
+        'max_attempts': int(config.get('max_attempts') or DEFAULT_SETTINGS['max_attempts']),
+        'preset_name': preset_name,
+        'key_position': config.get('key_position'),
+        'orb_position': config.get('orb_position'),
+        'bp_position': config.get('bp_position'),
+        'key_grid': config.get('key_grid'),
+        'bp_grid': config.get('bp_grid'),
+    }
+    
+    if mode == 'jobs':
+        values['jobs'] = resolve_jobs(config.get('roll_jobs', []), preset_manager)
+    else:
+        values['preset'] = preset_manager.get_preset(MODE_TAB_TYPES.get(mode), preset_name)
+        if alternatives is None:
+            alternatives = config.get('alternative_presets', [])
+        values['alternatives'] = resolve_alternatives(alternatives, preset_manager, mode)
+    
+    if rule_name:
+        values['rule_name'] = rule_name
+        values['rule'] = rule_expression(preset_manager.get_preset('rules', rule_name))
+    
+    values.update({k: v for k, v in overrides.items() if v is not None})
+    return RunSpec(**values)
+
+
+def resolve_jobs(roll_jobs, preset_manager):
+    """
+    Embute os dados do preset em cada job do multi-item.
+    
+    Args:
+        roll_jobs: Lista de jobs salvos ('roll_jobs' na configuração).
+        preset_manager: PresetManager para resolver os presets.
+    
+    Returns:
+        list: Jobs com 'preset_data' (ou 'rule_expression') preenchido.
+    """
+    resolved = []
+    for job in roll_jobs:
+        job = dict(job)
+        if job.get('rule') and 'rule_expression' not in job:
+            job['rule_expression'] = rule_expression(preset_manager.get_preset('rules', job['rule']))
+        if 'preset_data' not in job:
+            job['preset_data'] = preset_manager.get_preset(
+                job.get('tab_type', 'search'), job.get('preset', 'Preset 1')
+            )
+        resolved.append(job)
+    return resolved
+
+
+def alternative_error(mode, alternative):
+    """
+    Verifica se a leitura do modo consegue avaliar um preset alternativo.
+    
+    Args:
+        mode: Modo do motor.
+        alternative: Candidato resolvido (com 'tab_type' e 'rule_expression').
+    
+    Returns:
+        str: Mensagem de erro ou None se o candidato pode ser atingido.
+    """
+    name = alternative.get('name')
+    tab_type = alternative.get('tab_type')
+    if tab_type not in MODE_ALTERNATIVE_TYPES.get(mode, ()):
+        return f"Preset alternativo '{name}' ({tab_type}) não é lido no modo {mode}"
+    
+    expression = alternative.get('rule_expression')
+    if expression and mode != 't7':
+        try:
+            if rule_uses_tiers(expression):
+                return f"Regra '{name}' usa tiers, que só são lidos no modo T7"
+        except RuleError as e:
+            return f"Regra '{name}' inválida: {e}"
+    return None
+
+
+def resolve_alternatives(alternatives, preset_manager, mode=None):
+    """
+    Resolve os presets alternativos aceitos na mesma execução.
+    
+    Em dict, cada modo usa só a sua lista, validada depois pelo RunSpec. Em
+    lista (formato antigo), os candidatos que a leitura do modo não consegue
+    avaliar são descartados.
+    
+    Args:
+        alternatives: Dict modo -> lista, ou lista de dicts {'tab_type',
+            'preset'} ou {'rule'}, com 'bp_position' opcional (destino das
+            chaves desse preset).
+        preset_manager: PresetManager para resolver os presets.
+        mode: Modo do motor (None resolve a lista inteira).
+    
+    Returns:
+        list: Candidatos com 'name', 'tab_type' e 'preset_data' ou 'rule_expression'.
+    """
+    if isinstance(alternatives, dict):
+        return _resolve_alternatives(alternatives.get(mode, ()), preset_manager)
+    
+    resolved = _resolve_alternatives(alternatives, preset_manager)
+    if mode is None:
+        return resolved
+    return [alternative for alternative in resolved if alternative_error(mode, alternative) is None]
+
+
+def _resolve_alternatives(alternatives, preset_manager):
+    """Embute os dados do preset (ou o texto da regra) em cada candidato."""
+    resolved = []
+    for alternative in alternatives:
+        alternative = dict(alternative)
+        if alternative.get('rule'):
+            alternative.setdefault('name', alternative['rule'])
+            alternative['tab_type'] = 'rules'
+            alternative.setdefault(
+                'rule_expression', rule_expression(preset_manager.get_preset('rules', alternative['rule']))
+            )
+        else:
+            tab_type = alternative.setdefault('tab_type', 'search')
+            preset_name = alternative.get('preset', 'Preset 1')
+            alternative.setdefault('name', preset_name)
+            if 'preset_data' not in alternative:
+                alternative['preset_data'] = preset_manager.get_preset(tab_type, preset_name)
+        resolved.append(alternative)
+    return resolved
@@ -0,0 +1,417 @@
+"""
+Simulador Monte Carlo de presets.
+Sorteia rolagens sintéticas a partir das distribuições aprendidas pelo
+roll_stats (presença, valores e tiers de cada atributo) e avalia cada uma com
+a mesma semântica do matching.py, para estimar quantas tentativas um preset
+leva antes de gastar orbs e comparar presets alternativos. As tentativas
+também são convertidas em tempo pela taxa medida na última execução (ou
+pelos delays configurados).
+
+Com NumPy instalado as rolagens são avaliadas em lotes vetorizados (milhões
+por segundo); sem NumPy o simulador usa o check_preset rolagem a rolagem.
+
+Uso:
+    python -m src.simulator --preset "equip tank" [--type search] [--rolls 2000000]
+    python -m src.simulator --rank [--pool items]
+"""
+import math
+import random
+import argparse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import ROLL_STATS_FILE, DEFAULT_SETTINGS, INSTRUMENTATION_CONFIG
+from src.matching import normalize_name, check_preset
+from src.presets import create_preset_manager, create_config_manager
+from src.storage import read_json
+from src.roll_stats import RollStatsStore, attempts_for_confidence
+
+
+# Tamanho de cada lote vetorizado (limita a memória)
+BATCH_SIZE = 1_000_000
+
+# Tipos de preset simulados para cada tipo de item
+POOL_TAB_TYPES = {
+    'items': ('values', 'search', 't7'),
+    'keys': ('keys',),
+}
+
+
+class RollModel:
+    """Distribuição de rolagens aprendida (atributos independentes)."""
+    
+    def __init__(self, stats, extra_names=()):
+        """
+        Monta o modelo a partir das estatísticas.
+        
+        Args:
+            stats: RollStats com as rolagens observadas.
+            extra_names: Atributos dos presets (incluídos mesmo se nunca vistos).
+        """
+        self.stats = stats
+        names = set(stats.attribute_counts) | set(stats.tier_counts)
+        names |= {normalize_name(n) for n in extra_names if n}
+        self.names = sorted(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        
+        self.p_present = [stats.p_attribute(name) for name in self.names]
+        self.p_t7 = [stats.p_tier(name, 7) for name in self.names]
+        
+        # Faixas de valor por atributo: (inícios, probabilidades, largura)
+        self.value_bins = {}
+        for name, hist in stats.value_histograms.items():
+            items = hist.items()
+            if items:
+                total = float(sum(count for _, count in items))
+                self.value_bins[name] = (
+                    [start for start, _ in items],
+                    [count / total for _, count in items],
+                    hist.width
+                )
+    
+    def p_of(self, name):
+        """Probabilidade de presença de um atributo (mesmo fora do modelo)."""
+        i = self.index.get(name)
+        return self.p_present[i] if i is not None else self.stats.p_attribute(name)
+    
+    def sample_value(self, name, rng):
+        """Sorteia um valor do atributo (rolagem a rolagem)."""
+        bins = self.value_bins.get(name)
+        if bins is None:
+            # Atributo sem valores observados: passa em metade dos limiares
+            return math.inf if rng.random() < 0.5 else -math.inf
+        starts, probs, width = bins
+        start = rng.choices(starts, probs)[0]
+        return start + int(rng.random() * width)
+    
+    def sample_roll(self, rng):
+        """
+        Sorteia uma rolagem como o OCR a entregaria.
+        
+        Returns:
+            tuple: ({nome: valor}, lista de T7 {'tier', 'name', 'value'})
+        """
+        values = {}
+        for i, name in enumerate(self.names):
+            if rng.random() < self.p_present[i]:
+                values[name] = self.sample_value(name, rng)
+        t7_attrs = [
+            {'tier': 7, 'name': name, 'value': 0}
+            for i, name in enumerate(self.names) if rng.random() < self.p_t7[i]
+        ]
+        return values, t7_attrs
+
+
+# ============================================
+# AVALIAÇÃO VETORIZADA (NumPy)
+# ============================================
+
+def _sample_values_np(model, name, size, gen):
+    """Sorteia um vetor de valores do atributo."""
+    bins = model.value_bins.get(name)
+    if bins is None:
+        return np.where(gen.random(size) < 0.5, np.inf, -np.inf)
+    starts, probs, width = bins
+    chosen = gen.choice(np.asarray(starts, dtype=np.float64), size=size, p=np.asarray(probs))
+    return chosen + np.floor(gen.random(size) * width)
+
+
+def _match_batch_np(model, tab_type, data, size, gen):
+    """
+    Avalia um lote de rolagens sintéticas contra o preset.
+    
+    Reproduz check_values, check_attributes e find_t7 (matching.py).
+    
+    Returns:
+        numpy.ndarray: Vetor booleano (rolagem atingiu o preset).
+    """
+    present_cache = {}
+    
+    def present(name):
+        if name not in present_cache:
+            present_cache[name] = gen.random(size) < model.p_of(name)
+        return present_cache[name]
+    
+    if tab_type == 'values':
+        result = np.ones(size, dtype=bool)
+        values_cache = {}
+        for target in data or []:
+            name = normalize_name(target.get('name', ''))
+            value = str(target.get('value', '')).strip()
+            if not name or not value:
+                continue
+            try:
+                target_val = float(value)
+            except ValueError:
+                continue
+            if name not in values_cache:
+                values_cache[name] = _sample_values_np(model, name, size, gen)
+            result &= present(name) & (values_cache[name] >= target_val)
+        return result
+    
+    data = data or {}
+    if tab_type == 't7':
+        if data.get('mode', 'ANY') == 'ANY':
+            accepted = model.names
+        else:
+            specific = [normalize_name(a) for a in data.get('specific_attributes', [])]
+            accepted = [
+                name for name in model.names
+                if any(s in name or name in s for s in specific)
+            ]
+        result = np.zeros(size, dtype=bool)
+        for name in accepted:
+            result |= gen.random(size) < model.p_t7[model.index[name]]
+        return result
+    
+    required = []
+    optional = []
+    for attr in data.get('attributes', []):
+        if isinstance(attr, str):
+            attr = {'name': attr}
+        name = normalize_name(attr.get('name', ''))
+        if name:
+            (required if attr.get('required', False) else optional).append(name)
+    
+    if not required and not optional:
+        return np.zeros(size, dtype=bool)
+    
+    found = np.zeros(size, dtype=np.int32)
+    all_required = np.ones(size, dtype=bool)
+    for name in required:
+        found += present(name)
+        all_required &= present(name)
+    for name in optional:
+        found += present(name)
+    
+    if data.get('mode', 'ALL') == 'ALL':
+        return found == len(required) + len(optional)
+    
+    try:
+        min_required = int(data.get('min_count', '1'))
+    except (TypeError, ValueError):
+        min_required = 1
+    return all_required & (found >= min_required)
+
+
+# ============================================
+# SIMULAÇÃO
+# ============================================
+
+def seconds_per_roll(config_file=None, latency_file=None):
+    """
+    Tempo de uma rolagem, para converter tentativas em segundos.
+    
+    Usa a taxa medida na última execução (resumo de latência gravado ao
+    parar); sem ela, estima pelo delay e pelo click_delay configurados.
+    
+    Args:
+        config_file: Arquivo de configuração (padrão: backend configurado).
+        latency_file: Resumo de latência (padrão INSTRUMENTATION_CONFIG).
+    
+    Returns:
+        tuple: (segundos por rolagem, origem: 'medido' ou 'configurado').
+    """
+    try:
+        summary = read_json(latency_file or INSTRUMENTATION_CONFIG['dump_file'], {})
+        rolls_per_minute = (summary.get('metrics') or {}).get('rolls_per_minute')
+        if rolls_per_minute and rolls_per_minute > 0:
+            return 60.0 / rolls_per_minute, 'medido'
+    except (OSError, ValueError, AttributeError):
+        pass
+    
+    config = create_config_manager(config_file).load_config()
+    delay = float(config.get('delay') or DEFAULT_SETTINGS['delay'])
+    click_delay = float(config.get('click_delay') or DEFAULT_SETTINGS['click_delay']) / 1000.0
+    # Shift+Click = 3 esperas de click_delay, depois o delay do tooltip
+    return delay + 3 * click_delay, 'configurado'
+
+
+def format_duration(seconds):
+    """Formata uma duração em s, min ou h."""
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f}min"
+    return f"{seconds / 3600:.1f}h"
+
+
+def simulate(model, tab_type, data, rolls=2_000_000, seed=None, roll_seconds=None):
+    """
+    Simula rolagens e mede quantas tentativas o preset leva.
+    
+    As tentativas até o sucesso são os intervalos entre rolagens que atingem
+    o preset na sequência simulada; com poucos sucessos as percentis vêm da
+    distribuição geométrica com a taxa simulada.
+    
+    Args:
+        model: RollModel.
+        tab_type: Tipo do preset.
+        data: Dados do preset.
+        rolls: Número de rolagens sintéticas.
+        seed: Semente do gerador (reprodutível).
+        roll_seconds: Segundos por rolagem (acrescenta média e percentis em
+            segundos: 'mean_seconds', 'p50_seconds', ...).
+    
+    Returns:
+        dict: Rolagens, sucessos, p por rolagem, média e percentis de tentativas.
+    """
+    if np is not None:
+        gen = np.random.default_rng(seed)
+        success_positions = []
+        offset = 0
+        while offset < rolls:
+            size = min(BATCH_SIZE, rolls - offset)
+            matches = _match_batch_np(model, tab_type, data, size, gen)
+            success_positions.append(np.flatnonzero(matches) + offset)
+            offset += size
+        positions = np.concatenate(success_positions) if success_positions else np.array([], dtype=np.int64)
+        gaps = np.diff(np.concatenate(([-1], positions))) if len(positions) else np.array([])
+    else:
+        rng = random.Random(seed)
+        positions = []
+        for i in range(rolls):
+            values, t7_attrs = model.sample_roll(rng)
+            if check_preset(tab_type, data, values, t7_attrs)[0]:
+                positions.append(i)
+        gaps = [b - a for a, b in zip([-1] + positions[:-1], positions)]
+    
+    successes = len(positions)
+    p = successes / rolls if rolls else 0.0
+    result = {
+        'rolls': rolls,
+        'successes': successes,
+        'p_match': p,
+        'expected_attempts': 1.0 / p if p > 0 else None,
+    }
+    
+    # Percentis empíricos com sucessos suficientes; senão, geométrica
+    if successes >= 100:
+        ordered = sorted(int(g) for g in gaps)
+        for q in (50, 90, 99):
+            result[f'p{q}'] = ordered[min(len(ordered) - 1, int(math.ceil(q / 100.0 * len(ordered))) - 1)]
+    else:
+        for q in (50, 90, 99):
+            result[f'p{q}'] = attempts_for_confidence(p, q / 100.0)
+    
+    if roll_seconds and result['expected_attempts']:
+        result['roll_seconds'] = roll_seconds
+        result['mean_seconds'] = result['expected_attempts'] * roll_seconds
+        for q in (50, 90, 99):
+            result[f'p{q}_seconds'] = result[f'p{q}'] * roll_seconds
+    
+    return result
+
+
+def rank_presets(model, presets, rolls=1_000_000, seed=None, roll_seconds=None):
+    """
+    Ordena presets pelo custo esperado (tentativas até o sucesso).
+    
+    Args:
+        model: RollModel.
+        presets: Lista de (tab_type, nome, dados).
+        rolls: Rolagens simuladas por preset.
+        seed: Semente do gerador.
+        roll_seconds: Segundos por rolagem (tempo nos resultados).
+    
+    Returns:
+        list: [(tab_type, nome, resultado)] do mais barato ao mais caro.
+    """
+    ranked = [
+        (tab_type, name, simulate(model, tab_type, data, rolls, seed, roll_seconds))
+        for tab_type, name, data in presets
+    ]
+    return sorted(ranked, key=lambda r: r[2]['expected_attempts'] or math.inf)
+
+
+def preset_attribute_names(tab_type, data):
+    """Retorna os nomes de atributos citados por um preset."""
+    if tab_type == 'values':
+        return [t.get('name', '') for t in data or []]
+    if tab_type == 't7':
+        return list((data or {}).get('specific_attributes', []))
+    return [a if isinstance(a, str) else a.get('name', '') for a in (data or {}).get('attributes', [])]
+
+
+def format_result(result):
+    """Formata o resultado de uma simulação em uma linha."""
+    if not result['expected_attempts']:
+        return f"nenhum sucesso em {result['rolls']} rolagens simuladas"
+    text = (
+        f"p={result['p_match'] * 100:.3f}% média={result['expected_attempts']:.0f} "
+        f"p50={result['p50']} p90={result['p90']} p99={result['p99']}"
+    )
+    if 'mean_seconds' in result:
+        text += (
+            f" | tempo: média={format_duration(result['mean_seconds'])} "
+            f"p50={format_duration(result['p50_seconds'])} p90={format_duration(result['p90_seconds'])} "
+            f"p99={format_duration(result['p99_seconds'])}"
+        )
+    return text
+
+
+def main(argv=None):
+    """Ponto de entrada de linha de comando."""
+    parser = argparse.ArgumentParser(description="Simulador de presets (Monte Carlo)")
+    parser.add_argument('--preset', help="Nome do preset a simular")
+    parser.add_argument('--type', default='search', choices=['values', 'search', 't7', 'keys'],
+                        help="Tipo do preset")
+    parser.add_argument('--rank', action='store_true', help="Ordena todos os presets do tipo de item")
+    parser.add_argument('--pool', choices=sorted(POOL_TAB_TYPES), help="Estatísticas usadas (items/keys)")
+    parser.add_argument('--rolls', type=int, help="Rolagens simuladas (padrão: 2M com NumPy, 200k sem)")
+    parser.add_argument('--seed', type=int, help="Semente do gerador")
+    parser.add_argument('--stats', default=ROLL_STATS_FILE, help="Arquivo de estatísticas")
+    parser.add_argument('--presets', help="Arquivo de presets (padrão: backend configurado)")
+    parser.add_argument('--config', help="Arquivo de configuração (delays; padrão: backend configurado)")
+    parser.add_argument('--seconds-per-roll', type=float,
+                        help="Segundos por rolagem (padrão: taxa da última execução ou delays configurados)")
+    args = parser.parse_args(argv)
+    
+    rolls = args.rolls or (2_000_000 if np is not None else 200_000)
+    pool = args.pool or ('keys' if args.type == 'keys' else 'items')
+    stats = RollStatsStore(args.stats).get(pool)
+    if not stats.rolls:
+        print(f"❌ Nenhuma rolagem observada para '{pool}' em {args.stats}")
+        return 1
+    
+    manager = create_preset_manager(args.presets)
+    if args.rank:
+        presets = [
+            (tab_type, name, manager.get_preset(tab_type, name))
+            for tab_type in POOL_TAB_TYPES[pool]
+            for name in manager.get_preset_names(tab_type)
+        ]
+    elif args.preset:
+        data = manager.get_preset(args.type, args.preset)
+        if data is None:
+            print(f"❌ Preset '{args.preset}' ({args.type}) não encontrado")
+            return 1
+        presets = [(args.type, args.preset, data)]
+    else:
+        parser.error("informe --preset ou --rank")
+    
+    names = [n for tab_type, _, data in presets for n in preset_attribute_names(tab_type, data)]
+    model = RollModel(stats, names)
+    
+    if args.seconds_per_roll:
+        roll_seconds, source = args.seconds_per_roll, 'informado'
+    else:
+        roll_seconds, source = seconds_per_roll(args.config)
+    
+    engine = 'NumPy' if np is not None else 'Python (instale numpy para lotes vetorizados)'
+    print(f"🎲 {stats.rolls} rolagens observadas ({pool}), {rolls} simuladas por preset - {engine}")
+    print(f"⏱️ {roll_seconds:.2f}s por rolagem ({source})")
+    for tab_type, name, result in rank_presets(model, presets, rolls, args.seed, roll_seconds):
+        print(f"  {name} ({tab_type}): {format_result(result)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,7 @@ Tela de loading com animações.
 import tkinter as tk
 import time
 import random
+import threading
 
 import sys
 import os
@@ -175,32 +176,55 @@ class SplashScreen:
         self.animate_particles()
         self.splash.update()
     
-    def run_animation(self):
-        """Executa a animação completa de loading."""
-        status_messages = [
-            (0.0, "Inicializando..."),
-            (0.25, "Carregando módulos..."),
-            (0.50, "Configurando interface..."),
-            (0.75, "Preparando automação..."),
-            (0.95, "Pronto!")
-        ]
-        
-        fps = SPLASH_CONFIG['animation_fps']
-        duration = SPLASH_CONFIG['duration_seconds']
-        total_steps = fps * duration
-        
-        for i in range(int(total_steps) + 1):
-            progress = i / total_steps
-            
-            current_status = "Iniciando..."
-            for threshold, msg in status_messages:
-                if progress >= threshold:
-                    current_status = msg
-            
-            self.update_progress(progress, current_status)
-            time.sleep(1.0 / fps)
+    def run_tasks(self, tasks):
+        """
+        Executa as tarefas de inicialização em uma thread de fundo, com a
+        barra de progresso avançando conforme cada uma termina.
         
-        time.sleep(0.2)
+        Args:
+            tasks: Lista de (status, peso, função) executadas em ordem.
+        
+        Returns:
+            dict: Duração (s) de cada tarefa, pelo texto de status.
+        
+        Raises:
+            Exception: A primeira exceção levantada por uma tarefa.
+        """
+        total = float(sum(weight for _, weight, _ in tasks)) or 1.0
+        state = {'done': 0.0, 'current': 0.0, 'status': "Iniciando...", 'error': None}
+        timings = {}
+        
+        def worker():
+            for status, weight, task in tasks:
+                state['status'] = status
+                state['current'] = weight
+                started = time.perf_counter()
+                try:
+                    task()
+                except Exception as e:
+                    state['error'] = e
+                    return
+                timings[status] = time.perf_counter() - started
+                state['done'] += weight
+                state['current'] = 0.0
+        
+        thread = threading.Thread(target=worker, name='startup', daemon=True)
+        thread.start()
+        
+        # Dentro da tarefa atual a barra se aproxima do fim dela sem chegar lá
+        shown = 0.0
+        step = 1.0 / SPLASH_CONFIG['animation_fps']
+        while thread.is_alive():
+            done = state['done'] / total
+            target = done + 0.9 * state['current'] / total
+            shown = max(done, shown + (target - shown) * 0.1)
+            self.update_progress(shown, state['status'])
+            thread.join(step)
+        
+        if state['error'] is not None:
+            raise state['error']
+        self.update_progress(1.0, "Pronto!")
+        return timings
     
     def destroy(self):
         """Fecha a splash com fade out."""
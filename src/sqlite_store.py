@@ -0,0 +1,628 @@
+"""
+Módulo do backend SQLite.
+Alternativa opcional aos arquivos JSON para bibliotecas grandes: presets,
+configurações e o histórico de rolagens ficam em um banco só
+(game_automation.db) em modo WAL. Presets são buscados pelo índice
+(tipo, nome) e salvar um preset grava só a linha dele; as rolagens são
+inseridas em lotes por uma thread de fundo. Na primeira abertura os
+presets e as configurações dos arquivos JSON são copiados para o banco
+(os arquivos ficam como estão, servindo de backup).
+
+Ligue com STORAGE_CONFIG['backend'] = 'sqlite'; os gerenciadores são
+criados por create_preset_manager/create_config_manager (presets.py).
+"""
+import copy
+import json
+import time
+import atexit
+import sqlite3
+import threading
+import contextlib
+from collections import deque
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import DATABASE_FILE, PRESETS_FILE, CONFIG_FILE, STORAGE_CONFIG
+from src.storage import read_json
+
+
+# Versão do esquema (PRAGMA user_version)
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS presets (
+    tab_type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (tab_type, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS presets_order ON presets (tab_type, position);
+CREATE TABLE IF NOT EXISTS config (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rolls (
+    id INTEGER PRIMARY KEY,
+    session TEXT NOT NULL,
+    time REAL NOT NULL,
+    attrs TEXT NOT NULL,
+    tiers TEXT,
+    matched INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS rolls_session ON rolls (session, id);
+CREATE INDEX IF NOT EXISTS rolls_time ON rolls (time);
+"""
+
+
+def _dumps(data):
+    """Serializa um valor para uma coluna JSON."""
+    return json.dumps(data, ensure_ascii=False)
+
+
+class SqliteStore:
+    """
+    Conexão compartilhada com o banco.
+    
+    Uma conexão por processo, usada por várias threads (Tk, motor, escrita
+    do histórico) com um lock; em WAL os leitores de outros processos
+    (supervisor, runner headless) não esperam pelas escritas.
+    """
+    
+    def __init__(self, path=None):
+        """
+        Abre (ou cria) o banco.
+        
+        Args:
+            path: Arquivo do banco (padrão DATABASE_FILE).
+        """
+        self.path = path or DATABASE_FILE
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+    
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Transação de escrita: with store.transaction() as conn: ...
+        
+        Desfaz tudo se o bloco levantar exceção.
+        """
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+    
+    def query(self, sql, params=()):
+        """
+        Executa uma consulta.
+        
+        Returns:
+            list: Linhas do resultado.
+        """
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+    
+    def get_meta(self, key, default=None):
+        """Lê um valor da tabela meta."""
+        rows = self.query('SELECT value FROM meta WHERE key = ?', (key,))
+        return rows[0][0] if rows else default
+    
+    def close(self):
+        """Fecha a conexão."""
+        with self.lock:
+            self.conn.close()
+
+
+# Bancos abertos neste processo (um por arquivo)
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+
+def open_store(path=None):
+    """
+    Retorna a conexão compartilhada com o banco, migrando os JSON na primeira vez.
+    
+    Args:
+        path: Arquivo do banco (padrão DATABASE_FILE).
+    
+    Returns:
+        SqliteStore: Banco aberto.
+    """
+    path = os.path.abspath(path or DATABASE_FILE)
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = SqliteStore(path)
+            migrate_json(store)
+            _STORES[path] = store
+        return store
+
+
+def migrate_json(store, presets_file=None, config_file=None):
+    """
+    Copia presets e configurações dos arquivos JSON para o banco (uma vez só).
+    
+    Entradas que já existem no banco não são sobrescritas. Os arquivos JSON
+    não são alterados.
+    
+    Args:
+        store: SqliteStore de destino.
+        presets_file: Arquivo de presets (padrão PRESETS_FILE).
+        config_file: Arquivo de configuração (padrão CONFIG_FILE).
+    
+    Returns:
+        int: Presets migrados (0 se a migração já tinha sido feita).
+    """
+    if store.get_meta('json_migrated'):
+        return 0
+    
+    def load(path, label):
+        try:
+            data = read_json(path, {})
+        except Exception as e:
+            print(f"Erro ao carregar {label} para migração: {e}")
+            return {}
+        return data if isinstance(data, dict) else {}
+    
+    presets = load(presets_file or PRESETS_FILE, 'presets')
+    config = load(config_file or CONFIG_FILE, 'configurações')
+    now = time.time()
+    rows = [
+        (tab_type, name, position, _dumps(data), now)
+        for tab_type, entries in presets.items() if isinstance(entries, dict)
+        for position, (name, data) in enumerate(entries.items())
+    ]
+    
+    with store.transaction() as conn:
+        conn.executemany(
+            'INSERT OR IGNORE INTO presets (tab_type, name, position, data, updated) VALUES (?, ?, ?, ?, ?)', rows
+        )
+        conn.executemany(
+            'INSERT OR IGNORE INTO config (key, value) VALUES (?, ?)',
+            [(key, _dumps(value)) for key, value in config.items()]
+        )
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)", (str(now),))
+    
+    if rows or config:
+        print(f"📦 Migrados para {os.path.basename(store.path)}: {len(rows)} presets, {len(config)} configurações")
+    return len(rows)
+
+
+# ============================================
+# PRESETS
+# ============================================
+
+class SqlitePresetManager:
+    """Gerenciador de presets no banco (mesma interface do PresetManager)."""
+    
+    def __init__(self, store=None):
+        """
+        Args:
+            store: SqliteStore (padrão: o banco compartilhado).
+        """
+        self.store = store or open_store()
+    
+    def load_all_presets(self):
+        """
+        Carrega todos os presets.
+        
+        Returns:
+            dict: Dicionário com todos os presets por tipo.
+        """
+        presets = {'values': {}, 'search': {}, 'keys': {}}
+        for tab_type, name, data in self.store.query(
+            'SELECT tab_type, name, data FROM presets ORDER BY tab_type, position'
+        ):
+            presets.setdefault(tab_type, {})[name] = json.loads(data)
+        return presets
+    
+    def save_all_presets(self, presets):
+        """
+        Substitui todos os presets.
+        
+        Args:
+            presets: Dicionário com todos os presets.
+        """
+        now = time.time()
+        try:
+            with self.store.transaction() as conn:
+                conn.execute('DELETE FROM presets')
+                conn.executemany(
+                    'INSERT INTO presets (tab_type, name, position, data, updated) VALUES (?, ?, ?, ?, ?)',
+                    [
+                        (tab_type, name, position, _dumps(data), now)
+                        for tab_type, entries in presets.items()
+                        for position, (name, data) in enumerate(entries.items())
+                    ]
+                )
+        except sqlite3.Error as e:
+            print(f"Erro ao salvar presets: {e}")
+    
+    def flush(self):
+        """Nada pendente: cada alteração já é gravada na sua transação."""
+    
+    def get_preset_names(self, tab_type):
+        """
+        Retorna lista de nomes de presets para um tipo de aba.
+        
+        Args:
+            tab_type: Tipo da aba ('values', 'search', 'keys').
+        
+        Returns:
+            list: Lista de nomes de presets (na ordem de criação).
+        """
+        rows = self.store.query('SELECT name FROM presets WHERE tab_type = ? ORDER BY position', (tab_type,))
+        return [name for name, in rows]
+    
+    def get_preset(self, tab_type, name):
+        """
+        Retorna um preset específico.
+        
+        Args:
+            tab_type: Tipo da aba.
+            name: Nome do preset.
+        
+        Returns:
+            dict ou list: Dados do preset ou None.
+        """
+        rows = self.store.query('SELECT data FROM presets WHERE tab_type = ? AND name = ?', (tab_type, name))
+        return json.loads(rows[0][0]) if rows else None
+    
+    def save_preset(self, tab_type, name, data):
+        """
+        Salva um preset específico (só a linha dele).
+        
+        Args:
+            tab_type: Tipo da aba.
+            name: Nome do preset.
+            data: Dados do preset.
+        """
+        try:
+            with self.store.transaction() as conn:
+                conn.execute(
+                    'INSERT INTO presets (tab_type, name, position, data, updated) '
+                    'VALUES (?, ?, (SELECT COALESCE(MAX(position) + 1, 0) FROM presets WHERE tab_type = ?), ?, ?) '
+                    'ON CONFLICT (tab_type, name) DO UPDATE SET data = excluded.data, updated = excluded.updated',
+                    (tab_type, name, tab_type, _dumps(data), time.time())
+                )
+        except sqlite3.Error as e:
+            print(f"Erro ao salvar presets: {e}")
+    
+    def delete_preset(self, tab_type, name):
+        """
+        Exclui um preset.
+        
+        Args:
+            tab_type: Tipo da aba.
+            name: Nome do preset.
+        
+        Returns:
+            bool: True se excluiu com sucesso.
+        """
+        try:
+            with self.store.transaction() as conn:
+                cursor = conn.execute('DELETE FROM presets WHERE tab_type = ? AND name = ?', (tab_type, name))
+                return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"Erro ao excluir preset: {e}")
+            return False
+    
+    def ensure_default_presets(self):
+        """
+        Garante que existe pelo menos um preset padrão em cada tipo.
+        """
+        from src.presets import DEFAULT_PRESET_TYPES, default_preset
+        
+        for tab_type in DEFAULT_PRESET_TYPES:
+            if self.get_preset(tab_type, 'Preset 1') is None:
+                self.save_preset(tab_type, 'Preset 1', default_preset(tab_type))
+        
+        return self.load_all_presets()
+
+
+# ============================================
+# CONFIGURAÇÕES
+# ============================================
+
+class SqliteConfigManager:
+    """
+    Gerenciador de configurações no banco (mesma interface do ConfigManager).
+    
+    As configurações ficam em memória; só as chaves que mudaram são gravadas,
+    por um timer em segundo plano depois de config_flush_ms sem alterações.
+    """
+    
+    def __init__(self, store=None, delay=None):
+        """
+        Args:
+            store: SqliteStore (padrão: o banco compartilhado).
+            delay: Segundos sem alterações antes de gravar (padrão STORAGE_CONFIG).
+        """
+        self.store = store or open_store()
+        self.delay = STORAGE_CONFIG['config_flush_ms'] / 1000.0 if delay is None else delay
+        self.lock = threading.RLock()
+        self._config = None
+        self._pending = {}
+        self._timer = None
+        self._atexit = False
+    
+    def _cached(self):
+        """Configurações em memória (lidas do banco na primeira vez)."""
+        if self._config is None:
+            self._config = {key: json.loads(value) for key, value in self.store.query('SELECT key, value FROM config')}
+        return self._config
+    
+    def load_config(self):
+        """
+        Carrega configurações.
+        
+        Returns:
+            dict: Cópia das configurações.
+        """
+        with self.lock:
+            return copy.deepcopy(self._cached())
+    
+    def save_config(self, config):
+        """
+        Salva configurações (grava só as chaves alteradas, em segundo plano).
+        
+        Args:
+            config: Dicionário de configurações.
+        
+        Returns:
+            bool: True se havia alguma mudança.
+        """
+        config = json.loads(_dumps(config))
+        with self.lock:
+            current = self._cached()
+            changed = False
+            for key in list(current):
+                if key not in config:
+                    del current[key]
+                    self._pending[key] = None
+                    changed = True
+            for key, value in config.items():
+                if key not in current or current[key] != value:
+                    current[key] = value
+                    self._pending[key] = value
+                    changed = True
+            if changed:
+                self._schedule()
+            return changed
+    
+    def get(self, key, default=None):
+        """
+        Retorna um valor de configuração.
+        
+        Args:
+            key: Chave da configuração.
+            default: Valor padrão se não existir.
+        
+        Returns:
+            Valor da configuração ou default.
+        """
+        with self.lock:
+            return copy.deepcopy(self._cached().get(key, default))
+    
+    def set(self, key, value):
+        """
+        Define um valor de configuração.
+        
+        Args:
+            key: Chave da configuração.
+            value: Valor a definir.
+        """
+        value = json.loads(_dumps(value))
+        with self.lock:
+            current = self._cached()
+            if key in current and current[key] == value:
+                return
+            current[key] = value
+            self._pending[key] = value
+            self._schedule()
+    
+    def _schedule(self):
+        """Agenda a gravação (segurando lock)."""
+        if not self._atexit:
+            atexit.register(self.flush)
+            self._atexit = True
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.delay, self.flush)
+        self._timer.name = 'flush:config'
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def flush(self):
+        """Grava agora as chaves alteradas."""
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            with self.store.transaction() as conn:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)',
+                    [(key, _dumps(value)) for key, value in pending.items() if value is not None]
+                )
+                conn.executemany(
+                    'DELETE FROM config WHERE key = ?',
+                    [(key,) for key, value in pending.items() if value is None]
+                )
+        except sqlite3.Error as e:
+            print(f"Erro ao salvar configurações: {e}")
+            with self.lock:
+                for key, value in pending.items():
+                    self._pending.setdefault(key, value)
+
+
+# ============================================
+# HISTÓRICO DE ROLAGENS
+# ============================================
+
+class RollHistoryStore:
+    """
+    Histórico persistente de rolagens.
+    
+    add() só enfileira (thread do motor, sem I/O); uma
+    thread de fundo insere as rolagens em lotes, uma transação por lote. Um
+    lote que falha volta para a fila e é tentado de novo no próximo flush
+    (até max_pending itens; os mais antigos são descartados).
+    """
+    
+    def __init__(self, store=None, config=None):
+        """
+        Cria o histórico (a thread só sobe no start).
+        
+        Args:
+            store: SqliteStore (padrão: o banco compartilhado).
+            config: Configuração (padrão STORAGE_CONFIG).
+        """
+        config = config or STORAGE_CONFIG
+        self.store = store or open_store()
+        self.batch = config['history_batch']
+        self.flush_interval = config['history_flush_interval']
+        self.max_pending = self.batch * 20
+        self.dropped = 0
+        self._pending = deque()
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._thread = None
+        self._atexit = False
+    
+    def start(self):
+        """Inicia a thread de escrita (se ainda não estiver rodando)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._closing.clear()
+        self._thread = threading.Thread(target=self._run, name='roll-history', daemon=True)
+        self._thread.start()
+        if not self._atexit:
+            atexit.register(self.close)
+            self._atexit = True
+    
+    def add(self, session, roll, matched=False):
+        """
+        Enfileira uma rolagem (qualquer thread; não faz I/O).
+        
+        Args:
+            session: Identificador da execução.
+            roll: Roll lido.
+            matched: Se a rolagem atingiu o alvo.
+        """
+        self._pending.append((session, time.time(), roll, matched))
+        if len(self._pending) >= self.batch:
+            self._wake.set()
+    
+    def flush(self):
+        """Pede à thread de escrita que grave o que estiver pendente."""
+        self._wake.set()
+    
+    def close(self, timeout=2.0):
+        """Grava o que falta e encerra a thread de escrita."""
+        thread = self._thread
+        if thread is None:
+            self._write_pending()
+            return
+        self._closing.set()
+        self._wake.set()
+        thread.join(timeout)
+        self._thread = None
+    
+    def _run(self):
+        """Loop da thread de escrita: grava um lote a cada flush_interval."""
+        while not self._closing.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._write_pending()
+        self._write_pending()
+    
+    def _write_pending(self):
+        """Insere todas as rolagens pendentes."""
+        pending = self._pending
+        if not pending:
+            return
+        rows = []
+        items = [pending.popleft() for _ in range(len(pending))]
+        for session, timestamp, roll, matched in items:
+            tiers = dict(roll.tier_items())
+            rows.append((session, timestamp, _dumps(roll.to_dict()), _dumps(tiers) if tiers else None, int(matched)))
+        
+        try:
+            with self.store.transaction() as conn:
+                conn.executemany(
+                    'INSERT INTO rolls (session, time, attrs, tiers, matched) VALUES (?, ?, ?, ?, ?)', rows
+                )
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar histórico de rolagens: {e}")
+            self._requeue(items)
+    
+    def _requeue(self, items):
+        """Devolve um lote que falhou ao início da fila (limitada a max_pending)."""
+        pending = self._pending
+        pending.extendleft(reversed(items))
+        excess = len(pending) - self.max_pending
+        if excess > 0:
+            for _ in range(excess):
+                pending.popleft()
+            self.dropped += excess
+            print(f"Histórico de rolagens: {excess} rolagem(ns) descartada(s) após falhas de gravação")
+    
+    def recent(self, session=None, limit=100):
+        """
+        Retorna as últimas rolagens gravadas (mais recentes primeiro).
+        
+        Args:
+            session: Só as rolagens desta execução (padrão: todas).
+            limit: Máximo de rolagens.
+        
+        Returns:
+            list: Dicts no formato de RollHistory.to_list (mais 'session').
+        """
+        if session is None:
+            rows = self.store.query(
+                'SELECT session, time, attrs, tiers, matched FROM rolls ORDER BY id DESC LIMIT ?', (limit,)
+            )
+        else:
+            rows = self.store.query(
+                'SELECT session, time, attrs, tiers, matched FROM rolls WHERE session = ? ORDER BY id DESC LIMIT ?',
+                (session, limit)
+            )
+        return [
+            {'session': s, 'time': t, 'values': json.loads(attrs), 'tiers': json.loads(tiers or '{}'), 'matched': bool(m)}
+            for s, t, attrs, tiers, m in rows
+        ]
+    
+    def sessions(self, limit=50):
+        """
+        Resume as execuções gravadas (mais recentes primeiro).
+        
+        Returns:
+            list: Dicts {'session', 'rolls', 'matched', 'started', 'finished'}.
+        """
+        rows = self.store.query(
+            'SELECT session, COUNT(*), SUM(matched), MIN(time), MAX(time) FROM rolls '
+            'GROUP BY session ORDER BY MAX(id) DESC LIMIT ?', (limit,)
+        )
+        return [
+            {'session': s, 'rolls': n, 'matched': bool(m), 'started': first, 'finished': last}
+            for s, n, m, first, last in rows
+        ]
@@ -0,0 +1,212 @@
+"""
+Módulo de persistência em disco.
+Escritas atômicas de arquivos JSON: grava em um arquivo temporário no mesmo
+diretório e substitui o destino com os.replace, então uma queda no meio da
+escrita nunca deixa o arquivo truncado. JsonDocument mantém um arquivo em
+memória e junta várias alterações seguidas em uma escrita só.
+"""
+import os
+import copy
+import json
+import atexit
+import tempfile
+import threading
+
+
+def atomic_write_json(path, data, indent=2):
+    """
+    Grava dados como JSON de forma atômica.
+    
+    Args:
+        path: Caminho do arquivo de destino.
+        data: Dados serializáveis em JSON.
+        indent: Indentação do JSON (None para compacto).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory
+    )
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_json(path, default=None):
+    """
+    Lê um arquivo JSON.
+    
+    Args:
+        path: Caminho do arquivo.
+        default: Valor retornado se o arquivo não existir.
+    
+    Returns:
+        Dados carregados ou default.
+    """
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def file_stamp(path):
+    """
+    Identifica a versão de um arquivo em disco.
+    
+    Args:
+        path: Caminho do arquivo.
+    
+    Returns:
+        tuple: (mtime em ns, tamanho) ou None se o arquivo não existir.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class JsonDocument:
+    """
+    Cópia em memória de um arquivo JSON.
+    
+    O arquivo é lido uma vez e só é relido quando o mtime ou o tamanho mudam
+    (outra instância do programa, edição manual). Alterações marcam o
+    documento como sujo e a gravação fica para um timer em segundo plano:
+    alterações seguidas dentro do atraso viram uma escrita atômica só.
+    Enquanto houver alteração pendente, ela prevalece sobre o disco.
+    
+    Para alterar: with doc.lock: doc.get()[...] = ...; doc.changed()
+    """
+    
+    def __init__(self, path, default, delay=0.0, label='arquivo', indent=2):
+        """
+        Cria o documento (nada é lido até o primeiro get).
+        
+        Args:
+            path: Arquivo JSON.
+            default: Função que cria o conteúdo quando o arquivo não existe ou é inválido.
+            delay: Segundos sem alterações antes de gravar (0 = grava na hora).
+            label: Nome usado nas mensagens de erro.
+            indent: Indentação do JSON.
+        """
+        self.path = path
+        self.default = default
+        self.delay = delay
+        self.label = label
+        self.indent = indent
+        self.lock = threading.RLock()
+        self.loads = 0
+        self.writes = 0
+        self._data = None
+        self._stamp = None
+        self._dirty = False
+        self._timer = None
+        self._write_lock = threading.Lock()
+        self._atexit = False
+    
+    def get(self):
+        """
+        Retorna o conteúdo em memória (relido se o arquivo mudou).
+        
+        O objeto retornado é o próprio cache: só altere segurando lock e
+        chame changed() em seguida.
+        
+        Returns:
+            Conteúdo do documento.
+        """
+        with self.lock:
+            if self._dirty and self._data is not None:
+                return self._data
+            stamp = file_stamp(self.path)
+            if self._data is None or stamp != self._stamp:
+                self._load(stamp)
+            return self._data
+    
+    def _load(self, stamp):
+        """Lê o arquivo (segurando lock)."""
+        data = None
+        if stamp is not None:
+            try:
+                data = read_json(self.path)
+            except Exception as e:
+                print(f"Erro ao carregar {self.label}: {e}")
+        self._data = data if data is not None else self.default()
+        self._stamp = stamp
+        self.loads += 1
+    
+    def replace(self, data):
+        """
+        Troca o conteúdo inteiro.
+        
+        Args:
+            data: Novo conteúdo (não é copiado).
+        """
+        with self.lock:
+            self._data = data
+            self.changed()
+    
+    def changed(self):
+        """Marca o documento como alterado e agenda a gravação."""
+        with self.lock:
+            self._dirty = True
+            if not self._atexit:
+                atexit.register(self.flush)
+                self._atexit = True
+            self._cancel_timer()
+            if self.delay > 0:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.name = f"flush:{os.path.basename(self.path)}"
+                self._timer.daemon = True
+                self._timer.start()
+        if self.delay <= 0:
+            self.flush()
+    
+    def _cancel_timer(self):
+        """Cancela a gravação agendada (segurando lock)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+    
+    @property
+    def dirty(self):
+        """Se há alteração ainda não gravada."""
+        return self._dirty
+    
+    def flush(self):
+        """
+        Grava as alterações pendentes (qualquer thread).
+        
+        A cópia é feita segurando lock e a escrita acontece fora dele, então
+        quem só lê ou altera o documento não espera pelo disco.
+        
+        Returns:
+            bool: True se gravou.
+        """
+        with self._write_lock:
+            with self.lock:
+                self._cancel_timer()
+                if not self._dirty:
+                    return False
+                snapshot = copy.deepcopy(self._data)
+                self._dirty = False
+            try:
+                atomic_write_json(self.path, snapshot, self.indent)
+            except Exception as e:
+                print(f"Erro ao salvar {self.label}: {e}")
+                with self.lock:
+                    self._dirty = True
+                return False
+            with self.lock:
+                self.writes += 1
+                if not self._dirty:
+                    self._stamp = file_stamp(self.path)
+        return True
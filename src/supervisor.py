@@ -0,0 +1,470 @@
+"""
+Módulo de orquestração multi-instância.
+Roda N workers de automação em processos separados, cada um ligado a uma
+janela do jogo ou a um display virtual (ex: Xvfb ':1'), compartilhando um
+único serviço de OCR e uma visão única de métricas.
+
+Uso:
+    python -m src.supervisor instancias.json [--ocr-workers N] [--interval S]
+
+Formato do arquivo de instâncias:
+    {
+      "instances": [
+        {"name": "cliente-1", "display": ":1", "jobs": [...]},
+        {"name": "cliente-2", "window": "Path of Exile", "jobs": [...]}
+      ]
+    }
+
+Cada job segue o formato de 'roll_jobs' (region, position, tab_type, preset).
+Em instâncias com 'window', as coordenadas são relativas ao canto da janela.
+Instâncias no mesmo display compartilham mouse/teclado, então suas ações de
+input são serializadas por um lock entre processos.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import queue
+import threading
+import time
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import DEFAULT_SETTINGS
+
+
+# Tempo de espera entre reinícios de um worker que caiu (cresce a cada queda)
+RESTART_BACKOFF = (1.0, 2.0, 5.0, 10.0, 30.0)
+
+
+# ============================================
+# SERVIÇO DE OCR COMPARTILHADO
+# ============================================
+
+def _ocr_service_main(request_queue, response_queues):
+    """
+    Processo do serviço de OCR: atende pedidos de todos os workers.
+    
+    Args:
+        request_queue: Fila compartilhada de pedidos (worker, id, método, imagem).
+        response_queues: Dict {worker: fila de respostas}.
+    """
+    from src.ocr_engine import OCREngine
+    
+    ocr = OCREngine()
+    methods = {
+        'values': ocr.extract_text_with_processing,
+        't7': ocr.extract_t7_attributes,
+    }
+    
+    while True:
+        request = request_queue.get()
+        if request is None:
+            break
+        
+        worker, request_id, method, image = request
+        try:
+            result = ('ok', methods[method](image))
+        except Exception as e:
+            result = ('error', str(e))
+        
+        response_queues[worker].put((request_id, result))
+
+
+class RemoteOCR:
+    """Cliente do serviço de OCR compartilhado (mesma interface do OCREngine)."""
+    
+    def __init__(self, worker, request_queue, response_queue, offset=(0, 0), timeout=30.0):
+        """
+        Cria o cliente.
+        
+        Args:
+            worker: Nome do worker (chave da fila de respostas).
+            request_queue: Fila de pedidos do serviço.
+            response_queue: Fila de respostas deste worker.
+            offset: Deslocamento (x, y) da janela ligada ao worker.
+            timeout: Tempo máximo (s) de espera por uma resposta.
+        """
+        self.worker = worker
+        self.request_queue = request_queue
+        self.response_queue = response_queue
+        self.offset = offset
+        self.timeout = timeout
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._receiver = None
+    
+    def capture_region(self, region):
+        """Captura a região localmente (a tela é do display deste worker)."""
+        from PIL import ImageGrab
+        
+        left, top, right, bottom = region
+        dx, dy = self.offset
+        return ImageGrab.grab(bbox=(left + dx, top + dy, right + dx, bottom + dy))
+    
+    def extract_text_with_processing(self, image):
+        """Extrai texto e valores via serviço de OCR."""
+        return self._call('values', image)
+    
+    def extract_t7_attributes(self, image):
+        """Extrai atributos T7 via serviço de OCR."""
+        return self._call('t7', image)
+    
+    def _call(self, method, image):
+        """Envia um pedido e espera a resposta correspondente."""
+        # O pid no id descarta respostas destinadas a um processo anterior
+        request_id = (os.getpid(), next(self._ids))
+        done = threading.Event()
+        
+        with self._lock:
+            self._pending[request_id] = [done, None]
+            if self._receiver is None:
+                self._receiver = threading.Thread(target=self._receive, daemon=True)
+                self._receiver.start()
+        
+        self.request_queue.put((self.worker, request_id, method, image))
+        
+        if not done.wait(self.timeout):
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise TimeoutError("Serviço de OCR não respondeu")
+        
+        status, payload = self._pending.pop(request_id)[1]
+        if status == 'error':
+            raise RuntimeError(payload)
+        return payload
+    
+    def _receive(self):
+        """Distribui as respostas do serviço para os pedidos pendentes."""
+        while True:
+            response_id, result = self.response_queue.get()
+            with self._lock:
+                slot = self._pending.get(response_id)
+            if slot is None:
+                continue  # Resposta antiga (timeout ou worker reiniciado)
+            slot[1] = result
+            slot[0].set()
+
+
+# ============================================
+# WORKER
+# ============================================
+
+def _window_offset(title):
+    """
+    Retorna o canto superior esquerdo da área cliente de uma janela.
+    
+    Args:
+        title: Título exato da janela.
+    
+    Returns:
+        tuple: (x, y) em coordenadas de tela.
+    """
+    import win32gui
+    
+    hwnd = win32gui.FindWindow(None, title)
+    if not hwnd:
+        raise RuntimeError(f"Janela não encontrada: {title}")
+    return win32gui.ClientToScreen(hwnd, (0, 0))
+
+
+def _worker_main(instance, request_queue, response_queue, metrics_queue, stop_event, input_lock):
+    """
+    Processo de um worker de automação.
+    
+    Args:
+        instance: Configuração da instância.
+        request_queue: Fila de pedidos do serviço de OCR.
+        response_queue: Fila de respostas de OCR deste worker.
+        metrics_queue: Fila compartilhada de métricas.
+        stop_event: Evento global de parada.
+        input_lock: Lock de input compartilhado com o mesmo display.
+    """
+    name = instance['name']
+    
+    # O display precisa ser definido antes de importar pyautogui
+    if instance.get('display'):
+        os.environ['DISPLAY'] = instance['display']
+    
+    from src.jobs import RollJob, JobScheduler
+    from src.presets import create_preset_manager
+    
+    offset = _window_offset(instance['window']) if instance.get('window') else (0, 0)
+    ocr = RemoteOCR(name, request_queue, response_queue, offset)
+    
+    preset_manager = create_preset_manager(instance.get('presets_file'))
+    max_attempts = int(instance.get('max_attempts', DEFAULT_SETTINGS['max_attempts']))
+    jobs = []
+    for data in instance.get('jobs', []):
+        job = RollJob.from_dict(data, preset_manager, max_attempts)
+        job.position = (job.position[0] + offset[0], job.position[1] + offset[1])
+        jobs.append(job)
+    
+    def log(message):
+        metrics_queue.put(('log', name, message))
+    
+    scheduler = JobScheduler(
+        jobs, ocr,
+        delay=float(instance.get('delay', DEFAULT_SETTINGS['delay'])),
+        click_delay=float(instance.get('click_delay', DEFAULT_SETTINGS['click_delay'])) / 1000.0,
+        log=log,
+        input_lock=input_lock
+    )
+    
+    def report():
+        metrics_queue.put(('metrics', name, {
+            'rolls': scheduler.total_rolls,
+            'rolls_per_minute': scheduler.rolls_per_minute(),
+            'done': sum(1 for job in jobs if not job.is_active()),
+            'jobs': len(jobs),
+        }))
+    
+    def reporter():
+        while not stop_event.wait(1.0):
+            report()
+    
+    threading.Thread(target=reporter, daemon=True).start()
+    
+    log(f"▶️ Worker iniciado ({len(jobs)} itens)")
+    scheduler.run(lambda: not stop_event.is_set())
+    report()
+    log("⬛ Worker finalizado")
+
+
+# ============================================
+# SUPERVISOR
+# ============================================
+
+class Supervisor:
+    """Supervisor de workers de automação em processos separados."""
+    
+    def __init__(self, instances, ocr_workers=None, interval=5.0, max_restarts=5, output=print):
+        """
+        Cria o supervisor.
+        
+        Args:
+            instances: Lista de configurações de instância.
+            ocr_workers: Processos do serviço de OCR (padrão: núcleos da CPU).
+            interval: Intervalo (s) entre impressões da visão de métricas.
+            max_restarts: Reinícios permitidos por instância que cai.
+            output: Função usada para imprimir logs e métricas.
+        """
+        names = [instance['name'] for instance in instances]
+        if len(set(names)) != len(names):
+            raise ValueError("Nomes de instância devem ser únicos")
+        
+        self.instances = {instance['name']: instance for instance in instances}
+        self.ocr_workers = ocr_workers or multiprocessing.cpu_count()
+        self.interval = interval
+        self.max_restarts = max_restarts
+        self.output = output
+        
+        self._ctx = multiprocessing.get_context('spawn')
+        self._stop_event = self._ctx.Event()
+        self._request_queue = self._ctx.Queue()
+        self._metrics_queue = self._ctx.Queue()
+        self._response_queues = {name: self._ctx.Queue() for name in self.instances}
+        self._input_locks = {}
+        self._ocr_processes = []
+        self._ocr_restarts = 0
+        self._workers = {}
+        
+        # Visão de métricas agregada
+        self.metrics = {
+            name: {'state': 'pendente', 'restarts': 0, 'rolls': 0, 'rolls_per_minute': 0.0,
+                   'done': 0, 'jobs': len(instance.get('jobs', []))}
+            for name, instance in self.instances.items()
+        }
+    
+    def run(self):
+        """Inicia tudo e supervisiona até os workers terminarem ou Ctrl+C."""
+        self._start_ocr_service()
+        for name in self.instances:
+            self._start_worker(name)
+        
+        next_report = time.monotonic() + self.interval
+        try:
+            while self._workers:
+                self._drain_metrics(timeout=0.2)
+                self._check_ocr_service()
+                self._check_workers()
+                
+                if time.monotonic() >= next_report:
+                    self.print_metrics()
+                    next_report = time.monotonic() + self.interval
+        except KeyboardInterrupt:
+            self.output("⬛ Interrompido, parando workers...")
+        except RuntimeError as e:
+            self.output(f"❌ {e}")
+        finally:
+            self.shutdown()
+        
+        self.print_metrics()
+    
+    def shutdown(self):
+        """Para workers e o serviço de OCR."""
+        self._stop_event.set()
+        
+        for worker in list(self._workers.values()):
+            worker['process'].join(timeout=5)
+            if worker['process'].is_alive():
+                worker['process'].terminate()
+        self._workers.clear()
+        
+        for _ in self._ocr_processes:
+            self._request_queue.put(None)
+        for process in self._ocr_processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._ocr_processes = []
+        
+        self._drain_metrics(timeout=0)
+    
+    def print_metrics(self):
+        """Imprime a visão agregada de métricas."""
+        total_rolls = sum(m['rolls'] for m in self.metrics.values())
+        total_rate = sum(m['rolls_per_minute'] for m in self.metrics.values() if m['state'] == 'rodando')
+        
+        self.output(f"📊 {len(self.metrics)} instâncias | {total_rolls} rolagens | {total_rate:.0f}/min")
+        for name, m in self.metrics.items():
+            self.output(
+                f"  • {name}: {m['state']} | {m['rolls']} rolagens ({m['rolls_per_minute']:.0f}/min) | "
+                f"itens {m['done']}/{m['jobs']} | reinícios {m['restarts']}"
+            )
+    
+    def _start_ocr_service(self):
+        """Inicia os processos do serviço de OCR."""
+        for i in range(self.ocr_workers):
+            self._spawn_ocr_process(i)
+    
+    def _spawn_ocr_process(self, index):
+        """Cria um processo do serviço de OCR."""
+        process = self._ctx.Process(
+            target=_ocr_service_main,
+            args=(self._request_queue, self._response_queues),
+            name=f"ocr-{index}",
+            daemon=True
+        )
+        process.start()
+        if index < len(self._ocr_processes):
+            self._ocr_processes[index] = process
+        else:
+            self._ocr_processes.append(process)
+    
+    def _check_ocr_service(self):
+        """Recria processos de OCR que caíram."""
+        for index, process in enumerate(self._ocr_processes):
+            if process.is_alive() or self._stop_event.is_set():
+                continue
+            
+            if self._ocr_restarts >= self.max_restarts * len(self._ocr_processes):
+                raise RuntimeError(f"Serviço de OCR caiu {self._ocr_restarts + 1}x (código {process.exitcode})")
+            
+            self._ocr_restarts += 1
+            self.output(f"⚠️ Serviço de OCR {process.name} caiu (código {process.exitcode}), reiniciando")
+            self._spawn_ocr_process(index)
+    
+    def _start_worker(self, name):
+        """Cria o processo de um worker."""
+        instance = self.instances[name]
+        
+        # Instâncias no mesmo display (ou janelas no desktop local) dividem o input
+        display_key = instance.get('display') or 'local'
+        if display_key not in self._input_locks:
+            self._input_locks[display_key] = self._ctx.Lock()
+        
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(instance, self._request_queue, self._response_queues[name],
+                  self._metrics_queue, self._stop_event, self._input_locks[display_key]),
+            name=f"worker-{name}",
+            daemon=True
+        )
+        process.start()
+        
+        self._workers[name] = {'process': process, 'restart_at': None}
+        self.metrics[name]['state'] = 'rodando'
+    
+    def _check_workers(self):
+        """Detecta workers que terminaram ou caíram e os reinicia com backoff."""
+        now = time.monotonic()
+        
+        for name, worker in list(self._workers.items()):
+            process = worker['process']
+            metrics = self.metrics[name]
+            
+            if worker['restart_at'] is not None:
+                if now >= worker['restart_at']:
+                    self.output(f"🔄 Reiniciando {name}...")
+                    self._start_worker(name)
+                continue
+            
+            if process.is_alive():
+                continue
+            
+            if process.exitcode == 0:
+                metrics['state'] = 'concluído'
+                del self._workers[name]
+                continue
+            
+            # Worker caiu: os outros continuam rodando
+            if metrics['restarts'] >= self.max_restarts:
+                metrics['state'] = f'falhou (código {process.exitcode})'
+                self.output(f"❌ {name} caiu {metrics['restarts'] + 1}x, desistindo")
+                del self._workers[name]
+                continue
+            
+            backoff = RESTART_BACKOFF[min(metrics['restarts'], len(RESTART_BACKOFF) - 1)]
+            metrics['restarts'] += 1
+            metrics['state'] = 'reiniciando'
+            worker['restart_at'] = now + backoff
+            self.output(f"⚠️ {name} caiu (código {process.exitcode}), reiniciando em {backoff:.0f}s")
+    
+    def _drain_metrics(self, timeout):
+        """Consome eventos da fila de métricas."""
+        block = timeout > 0
+        while True:
+            try:
+                event = self._metrics_queue.get(block=block, timeout=timeout if block else None)
+            except queue.Empty:
+                return
+            block = False
+            
+            kind, name, payload = event
+            if kind == 'log':
+                self.output(f"[{name}] {payload}")
+            elif kind == 'metrics':
+                self.metrics[name].update(payload)
+
+
+def main(argv=None):
+    """Ponto de entrada de linha de comando."""
+    parser = argparse.ArgumentParser(description="Supervisor multi-instância do Reroll do Cadeiras")
+    parser.add_argument('instances_file', help="Arquivo JSON com as instâncias")
+    parser.add_argument('--ocr-workers', type=int, default=None, help="Processos do serviço de OCR")
+    parser.add_argument('--interval', type=float, default=5.0, help="Intervalo (s) das métricas")
+    parser.add_argument('--max-restarts', type=int, default=5, help="Reinícios por instância")
+    args = parser.parse_args(argv)
+    
+    with open(args.instances_file, 'r', encoding='utf-8') as f:
+        instances = json.load(f).get('instances', [])
+    
+    if not instances:
+        print("❌ Nenhuma instância configurada")
+        return 1
+    
+    Supervisor(
+        instances,
+        ocr_workers=args.ocr_workers,
+        interval=args.interval,
+        max_restarts=args.max_restarts
+    ).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
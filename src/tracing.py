@@ -0,0 +1,178 @@
+"""
+Módulo de tracing.
+Grava as etapas de cada rolagem como eventos do formato Chrome trace
+(abre em https://ui.perfetto.dev ou chrome://tracing), com uma trilha por
+thread: loop do motor, workers de OCR, drenagem do log no Tk e skill spam.
+Mostra rolagens lentas individualmente, sobreposição e tempo ocioso entre
+as etapas. Desligado por padrão: ligue com a variável de ambiente
+REROLL_TRACE=arquivo.json ou com --trace no runner headless.
+"""
+import time
+import atexit
+import threading
+import contextlib
+from collections import deque
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import TRACING_CONFIG
+from src.storage import atomic_write_json
+
+
+# Span que não grava nada (tracing desligado)
+NULL_SPAN = contextlib.nullcontext()
+
+
+class _TraceSpan:
+    """Context manager que grava um evento completo ('X') ao sair."""
+    
+    __slots__ = ('_tracer', '_name', '_cat', '_args', '_start')
+    
+    def __init__(self, tracer, name, cat, args):
+        self._tracer = tracer
+        self._name = name
+        self._cat = cat
+        self._args = args
+    
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self._tracer.complete(self._name, self._start, time.perf_counter_ns() - self._start, self._cat, self._args)
+        return False
+
+
+class Tracer:
+    """
+    Coletor de eventos Chrome trace em memória (gravado em save()).
+    
+    Os eventos ficam num anel de tamanho fixo: numa execução longa os mais
+    antigos são descartados. Cada save() grava a execução em um arquivo
+    próprio (trace.json, trace.2.json, ...) e esvazia o anel.
+    """
+    
+    def __init__(self, path=None, max_events=None):
+        """
+        Cria o tracer.
+        
+        Args:
+            path: Arquivo de saída; sem ele o tracer fica desligado.
+            max_events: Limite de eventos guardados (padrão TRACING_CONFIG).
+        """
+        self.path = None
+        self.enabled = False
+        self.max_events = max_events or TRACING_CONFIG['max_events']
+        self.dropped = 0
+        self.saves = 0
+        self._events = deque(maxlen=self.max_events)
+        self._threads = {}
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._atexit = False
+        if path:
+            self.enable(path)
+    
+    def enable(self, path):
+        """
+        Liga o tracing.
+        
+        Args:
+            path: Arquivo JSON de saída.
+        """
+        self.path = path
+        self.enabled = True
+        if not self._atexit:
+            atexit.register(self.save)
+            self._atexit = True
+    
+    def span(self, name, cat='', **args):
+        """
+        Mede um trecho: with tracer.span('ocr:contrast', cat='ocr'): ...
+        
+        Args:
+            name: Nome do evento.
+            cat: Categoria (filtro no visualizador).
+            **args: Dados exibidos ao selecionar o evento.
+        
+        Returns:
+            Context manager (NULL_SPAN se desligado).
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return _TraceSpan(self, name, cat, args)
+    
+    def complete(self, name, start_ns, duration_ns, cat='', args=None, phase='X'):
+        """
+        Grava um evento completo medido por fora.
+        
+        Args:
+            name: Nome do evento.
+            start_ns: Início (time.perf_counter_ns()).
+            duration_ns: Duração em ns.
+            cat: Categoria.
+            args: Dados do evento.
+            phase: 'X' (completo) ou 'i' (instantâneo).
+        """
+        if len(self._events) == self.max_events:
+            self.dropped += 1
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        event = {'name': name, 'ph': phase, 'pid': self._pid, 'tid': tid, 'ts': (start_ns - self._origin) / 1000.0}
+        if phase == 'X':
+            event['dur'] = duration_ns / 1000.0
+        else:
+            event['s'] = 't'
+        if cat:
+            event['cat'] = cat
+        if args:
+            event['args'] = args
+        self._events.append(event)
+    
+    def instant(self, name, cat='', **args):
+        """Grava um evento instantâneo (ex: preset atingido)."""
+        if not self.enabled:
+            return
+        self.complete(name, time.perf_counter_ns(), 0, cat, args, phase='i')
+    
+    def save(self, path=None):
+        """
+        Grava o trace (formato JSON Object do Chrome trace) e esvazia o anel.
+        
+        Args:
+            path: Arquivo de saída (padrão: o informado no enable, numerado a
+                partir da segunda execução).
+        """
+        path = path or self._run_path()
+        if not path or not self._events:
+            return
+        events = [self._events.popleft() for _ in range(len(self._events))]
+        dropped, self.dropped = self.dropped, 0
+        self.saves += 1
+        metadata = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in list(self._threads.items())
+        ]
+        data = {
+            'traceEvents': metadata + events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'dropped_events': dropped},
+        }
+        try:
+            atomic_write_json(path, data, indent=None)
+        except OSError as e:
+            print(f"Erro ao salvar trace: {e}")
+
+    def _run_path(self):
+        """Arquivo da próxima execução: o do enable, depois trace.N.json."""
+        if not self.path or not self.saves:
+            return self.path
+        base, ext = os.path.splitext(self.path)
+        return f"{base}.{self.saves + 1}{ext}"
+
+
+# Tracer do processo (ligado pela variável de ambiente ou pelo runner)
+TRACER = Tracer(os.environ.get(TRACING_CONFIG['env_var']) or None)
@@ -2,6 +2,8 @@
 Componentes de UI reutilizáveis.
 Widgets customizados e helpers para construção da interface.
 """
+import time
+from collections import deque
 import tkinter as tk
 import customtkinter as ctk
 from tkinter import messagebox
@@ -10,7 +12,7 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from src.config import COLORS, UI_CONFIG
+from src.config import COLORS, UI_CONFIG, LOG_WINDOW_CONFIG, INSTRUMENTATION_CONFIG
 
 
 class AttributeRow:
@@ -248,19 +250,45 @@ class StatusBar:
         self.label.configure(text=f"{icon} {text}", text_color=color)
 
 
+# Filtros da janela de log: (tag, rótulo)
+LOG_FILTERS = (
+    ('success', "✅ Sucesso"),
+    ('warning', "⚠ Avisos"),
+    ('error', "❌ Erros"),
+    ('info', "ℹ Info"),
+)
+
+
 class LogWindow:
-    """Janela de log detalhado."""
+    """
+    Janela de log detalhado.
     
-    def __init__(self, parent):
+    As mensagens ficam em um buffer circular de capacidade fixa; o Text só
+    mostra as últimas linhas (view_lines) e o excesso é removido em blocos.
+    Os filtros de tag são aplicados sobre o buffer, não sobre o widget.
+    """
+    
+    def __init__(self, parent, config=None):
         """
         Cria uma janela de log.
         
         Args:
             parent: Widget pai.
+            config: Limites do log (padrão LOG_WINDOW_CONFIG).
         """
+        config = config or LOG_WINDOW_CONFIG
         self.parent = parent
         self.window = None
         self.text_widget = None
+        # Lido por outras threads (sem chamar o Tk); atualizado na thread do Tk
+        self.visible = False
+        
+        self.records = deque(maxlen=config['capacity'])
+        self.view_lines = config['view_lines']
+        self.trim_chunk = config['trim_chunk']
+        self.hidden_tags = set()
+        self._filter_vars = {}
+        self._rendered_lines = 0
     
     def open(self):
         """Abre a janela de log."""
@@ -273,6 +301,8 @@ class LogWindow:
         self.window.title("📊 Log Detalhado")
         self.window.geometry("750x500")
         self.window.attributes('-topmost', True)
+        self.window.bind('<Destroy>', self._on_destroy)
+        self.visible = True
         
         # Frame principal
         frame = ctk.CTkFrame(self.window, fg_color="#1a1a1a")
@@ -307,6 +337,18 @@ class LogWindow:
             command=self.clear
         ).pack(side="right", padx=5, pady=10)
         
+        # Filtros por tag
+        filters = ctk.CTkFrame(frame, fg_color="#1a1a1a")
+        filters.pack(fill="x", padx=10, pady=(0, 5))
+        for tag, label in LOG_FILTERS:
+            var = tk.BooleanVar(value=tag not in self.hidden_tags)
+            self._filter_vars[tag] = var
+            ctk.CTkCheckBox(
+                filters, text=label, variable=var,
+                font=("Segoe UI", 11), text_color="white",
+                command=self._apply_filters
+            ).pack(side="left", padx=5)
+        
         # Área de texto
         text_frame = ctk.CTkFrame(frame, fg_color="#1a1a1a")
         text_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
@@ -333,9 +375,15 @@ class LogWindow:
         self.text_widget.tag_config('info', foreground='#60a5fa', font=('Consolas', 12))
         self.text_widget.tag_config('header', foreground='#c084fc', font=('Consolas', 13, 'bold'))
         
+        self._render()
         self.log("Log detalhado iniciado.", 'info')
         self.log("Os valores capturados aparecerão aqui em tempo real.", 'info')
     
+    def _on_destroy(self, event):
+        """Marca a janela como fechada."""
+        if event.widget is self.window:
+            self.visible = False
+    
     def _toggle_topmost(self):
         """Alterna se a janela fica sempre no topo."""
         if self.window:
@@ -350,21 +398,140 @@ class LogWindow:
             message: Mensagem para adicionar.
             tag: Tag de formatação.
         """
+        self.write([(time.time(), message, tag)])
+    
+    def write(self, records):
+        """
+        Adiciona um lote de mensagens ao buffer e à tela (thread do Tk).
+        
+        Args:
+            records: Sequência de (timestamp, mensagem, tag) ou LogRecord.
+        """
+        batch = [tuple(record[-3:]) for record in records]
+        self.records.extend(batch)
+        if self.visible and self.text_widget:
+            self._insert(batch[-self.view_lines:], follow=None)
+    
+    def _insert(self, records, follow):
+        """
+        Insere registros no fim do Text com um único insert e corta o excesso.
+        
+        Args:
+            records: Lista de (timestamp, mensagem, tag).
+            follow: Se rola até o fim (None = só se já estava no fim).
+        """
+        chunks = []
+        lines = 0
+        hidden = self.hidden_tags
+        for timestamp, message, tag in records:
+            if tag in hidden:
+                continue
+            chunks.append(f"[{time.strftime('%H:%M:%S', time.localtime(timestamp))}] {message}\n")
+            chunks.append(tag)
+            lines += message.count('\n') + 1
+        if not chunks:
+            return
+        
         try:
-            if self.window and tk.Toplevel.winfo_exists(self.window) and self.text_widget:
-                import time
-                timestamp = time.strftime("%H:%M:%S")
-                self.text_widget.insert(tk.END, f"[{timestamp}] {message}\n", tag)
+            if follow is None:
+                follow = self.text_widget.yview()[1] >= 0.999
+            self.text_widget.insert(tk.END, *chunks)
+            self._rendered_lines += lines
+            
+            # Corta em blocos: só apaga quando passou view_lines + trim_chunk
+            excess = self._rendered_lines - self.view_lines
+            if excess >= self.trim_chunk:
+                self.text_widget.delete('1.0', f'{excess + 1}.0')
+                self._rendered_lines -= excess
+            
+            if follow:
                 self.text_widget.see(tk.END)
-                self.window.update_idletasks()
-        except:
+        except tk.TclError:
             pass
     
+    def _render(self):
+        """Redesenha a tela a partir do buffer (abertura e troca de filtro)."""
+        if not self.text_widget:
+            return
+        self.text_widget.delete('1.0', tk.END)
+        self._rendered_lines = 0
+        
+        # Do fim para o começo, só até preencher a tela
+        visible = []
+        lines = 0
+        for record in reversed(self.records):
+            if record[2] in self.hidden_tags:
+                continue
+            visible.append(record)
+            lines += record[1].count('\n') + 1
+            if lines >= self.view_lines:
+                break
+        visible.reverse()
+        self._insert(visible, follow=True)
+    
+    def _apply_filters(self):
+        """Aplica os filtros de tag marcados."""
+        self.hidden_tags = {tag for tag, var in self._filter_vars.items() if not var.get()}
+        self._render()
+    
     def clear(self):
         """Limpa o log."""
+        self.records.clear()
+        self._rendered_lines = 0
         if self.text_widget:
             self.text_widget.delete(1.0, tk.END)
     
     def is_open(self):
         """Verifica se a janela está aberta."""
         return self.window and tk.Toplevel.winfo_exists(self.window)
+
+
+class LatencyPanel:
+    """Painel com a latência por etapa (p50/p95/max) e rolagens/min ao vivo."""
+    
+    def __init__(self, parent, engine):
+        """
+        Cria o painel.
+        
+        Args:
+            parent: Widget pai.
+            engine: AutomationEngine (lê instruments e get_metrics).
+        """
+        self.parent = parent
+        self.engine = engine
+        self.window = None
+        self.label = None
+        self.refresh_ms = INSTRUMENTATION_CONFIG['panel_refresh_ms']
+    
+    def open(self):
+        """Abre o painel (ou traz para frente)."""
+        if self.window and tk.Toplevel.winfo_exists(self.window):
+            self.window.lift()
+            return
+        
+        self.window = ctk.CTkToplevel(self.parent)
+        self.window.title("⏱ Latência por Etapa")
+        self.window.geometry("520x340")
+        self.window.attributes('-topmost', True)
+        
+        self.label = tk.Label(
+            self.window, justify="left", anchor="nw",
+            font=('Consolas', 12),
+            bg="#1e1e1e", fg="#e0e0e0",
+            padx=10, pady=10
+        )
+        self.label.pack(fill="both", expand=True)
+        self._refresh()
+    
+    def _refresh(self):
+        """Atualiza o texto e reagenda enquanto a janela existir."""
+        if not (self.window and tk.Toplevel.winfo_exists(self.window)):
+            return
+        metrics = self.engine.get_metrics()
+        instruments = self.engine.instruments
+        if instruments.histograms:
+            text = instruments.format_table(metrics.get('rolls_per_minute', 0.0))
+        else:
+            text = "Nenhuma medição ainda (inicie a automação)."
+        self.label.configure(text=text)
+        self.window.after(self.refresh_ms, self._refresh)
@@ -0,0 +1,151 @@
+"""
+Fila de log da interface.
+As threads de trabalho (motor, agendador multi-item) só enfileiram registros;
+um tick do Tk (root.after) drena a fila a uma taxa fixa e entrega os
+registros em lote para cada destino. Nenhuma thread fora do Tk toca em
+widgets e o worker nunca espera pela interface.
+"""
+import time
+from collections import deque, namedtuple
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.config import LOG_PIPELINE_CONFIG
+from src.tracing import TRACER
+
+
+# Registro de log: destino ('main', 'detail'), horário, mensagem e tag
+LogRecord = namedtuple('LogRecord', ['target', 'timestamp', 'message', 'tag'])
+
+
+class LogPipeline:
+    """
+    Fila limitada de registros de log, drenada pela thread do Tk.
+    
+    deque.append/popleft são atômicos no CPython, então post() não usa lock.
+    Quando a fila enche, os registros mais antigos são descartados (e a
+    quantidade aparece no log); mensagens repetidas em sequência viram uma
+    linha com contador e só o status mais recente é aplicado.
+    """
+    
+    def __init__(self, root, sinks, status_sink=None, config=None):
+        """
+        Cria a fila.
+        
+        Args:
+            root: Janela Tk (dona do tick).
+            sinks: Dict {destino: função(lista de LogRecord)} chamada na thread do Tk.
+            status_sink: Função(texto, tipo) que aplica o status.
+            config: Configuração (padrão LOG_PIPELINE_CONFIG).
+        """
+        config = config or LOG_PIPELINE_CONFIG
+        self.root = root
+        self.sinks = sinks
+        self.status_sink = status_sink
+        self.interval_ms = max(1, int(1000 / config['fps']))
+        self.max_batch = config['max_batch']
+        self.max_backlog = config['max_backlog']
+        self._records = deque(maxlen=self.max_backlog)
+        self._status = None
+        self._dropped = 0
+        self._after_id = None
+    
+    def post(self, target, message, tag='info'):
+        """
+        Enfileira uma mensagem (qualquer thread).
+        
+        Args:
+            target: Destino registrado em sinks.
+            message: Texto da mensagem.
+            tag: Tag de formatação.
+        """
+        if len(self._records) >= self.max_backlog:
+            self._dropped += 1
+        self._records.append(LogRecord(target, time.time(), message, tag))
+    
+    def post_status(self, text, status_type='info'):
+        """Agenda a atualização do status (só a mais recente é aplicada)."""
+        self._status = (text, status_type)
+    
+    def start(self):
+        """Inicia o tick de drenagem."""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+    
+    def stop(self):
+        """Para o tick e entrega o que ainda estiver na fila."""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self.flush(limit=None)
+    
+    def _tick(self):
+        """Tick do Tk: drena um lote e reagenda."""
+        try:
+            with TRACER.span('log_drain', 'ui', pending=len(self._records)):
+                self.flush()
+        finally:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+    
+    def flush(self, limit=-1):
+        """
+        Entrega os registros pendentes (thread do Tk).
+        
+        Args:
+            limit: Máximo de registros (-1 = max_batch, None = todos).
+        """
+        status, self._status = self._status, None
+        if status is not None and self.status_sink:
+            self.status_sink(*status)
+        
+        if limit == -1:
+            limit = self.max_batch
+        batches = {}
+        records = self._records
+        taken = 0
+        while records and (limit is None or taken < limit):
+            record = records.popleft()
+            batches.setdefault(record.target, []).append(record)
+            taken += 1
+        
+        dropped, self._dropped = self._dropped, 0
+        if dropped:
+            batches.setdefault('detail', []).insert(0, LogRecord(
+                'detail', time.time(), f"⚠️ {dropped} mensagem(ns) de log descartada(s) (fila cheia)", 'warning'
+            ))
+        
+        for target, batch in batches.items():
+            sink = self.sinks.get(target)
+            if sink:
+                sink(coalesce(batch))
+    
+    def __len__(self):
+        return len(self._records)
+
+
+def coalesce(records):
+    """
+    Junta mensagens iguais em sequência em uma linha com contador.
+    
+    Args:
+        records: Lista de LogRecord do mesmo destino.
+    
+    Returns:
+        list: Registros com as repetições agrupadas.
+    """
+    result = []
+    repeats = 0
+    for record in records:
+        last = result[-1] if result else None
+        if last is not None and last.message == record.message and last.tag == record.tag:
+            repeats += 1
+            continue
+        if repeats:
+            result[-1] = last._replace(message=f"{last.message} (x{repeats + 1})")
+            repeats = 0
+        result.append(record)
+    if repeats:
+        result[-1] = result[-1]._replace(message=f"{result[-1].message} (x{repeats + 1})")
+    return result
@@ -1,6 +1,7 @@
 """
 Abas da interface principal.
 """
+import copy
 import tkinter as tk
 import customtkinter as ctk
 from tkinter import messagebox
@@ -16,6 +17,9 @@ from src.ui.components import AttributeRow, PresetSelector, PositionCapture
 class BaseTab:
     """Classe base para abas."""
     
+    # Dados de uma aba vazia (formato de get_data/load_data)
+    DEFAULT_DATA = []
+    
     def __init__(self, parent, app):
         """
         Inicializa a aba.
@@ -32,6 +36,10 @@ class BaseTab:
         """Retorna dados de todas as entradas."""
         return [entry.to_dict() for entry in self.entries if entry.get_name()]
     
+    def get_data(self):
+        """Retorna os dados da aba no formato de preset."""
+        return self.get_entries_data()
+    
     def clear_entries(self):
         """Remove todas as entradas."""
         for entry in self.entries[:]:
@@ -131,6 +139,8 @@ class ValuesTab(BaseTab):
 class SearchTab(BaseTab):
     """Aba de busca por presença de atributos."""
     
+    DEFAULT_DATA = {'attributes': [], 'mode': 'ALL', 'min_count': '3'}
+    
     def __init__(self, parent, app):
         super().__init__(parent, app)
         self.preset_selector = None
@@ -243,6 +253,14 @@ class SearchTab(BaseTab):
         self.min_count_entry.delete(0, 'end')
         self.min_count_entry.insert(0, data.get('min_count', '3'))
     
+    def get_data(self):
+        """Retorna os dados da aba no formato de preset."""
+        return {
+            'attributes': self.get_entries_data(),
+            'mode': self.get_mode(),
+            'min_count': self.get_min_count()
+        }
+    
     def get_mode(self):
         """Retorna o modo selecionado."""
         return self.min_mode_var.get()
@@ -255,6 +273,8 @@ class SearchTab(BaseTab):
 class KeysTab(BaseTab):
     """Aba de automação de chaves."""
     
+    DEFAULT_DATA = {'attributes': [], 'mode': 'ALL', 'min_count': '2'}
+    
     def __init__(self, parent, app):
         super().__init__(parent, app)
         self.preset_selector = None
@@ -399,6 +419,14 @@ class KeysTab(BaseTab):
         self.min_count_entry.delete(0, 'end')
         self.min_count_entry.insert(0, data.get('min_count', '2'))
     
+    def get_data(self):
+        """Retorna os dados da aba no formato de preset."""
+        return {
+            'attributes': self.get_entries_data(),
+            'mode': self.get_mode(),
+            'min_count': self.get_min_count()
+        }
+    
     def get_mode(self):
         """Retorna o modo selecionado."""
         return self.min_mode_var.get()
@@ -417,6 +445,8 @@ class KeysTab(BaseTab):
 class T7Tab(BaseTab):
     """Aba de busca por atributos T7."""
     
+    DEFAULT_DATA = {'mode': 'ANY', 'specific_attributes': []}
+    
     def __init__(self, parent, app):
         super().__init__(parent, app)
         self.preset_selector = None
@@ -608,6 +638,10 @@ class T7Tab(BaseTab):
             'specific_attributes': self.get_specific_attributes()
         }
     
+    def set_test_result(self, text, color):
+        """Mostra o resultado do teste de captura T7."""
+        self.test_result_label.configure(text=text, text_color=color)
+    
     def update_instructions(self, hotkeys):
         """Atualiza o texto de instruções com os atalhos."""
         self.instructions_label.configure(
@@ -732,6 +766,8 @@ class SkillRow:
 class SkillSpamTab:
     """Aba de spam de skills."""
     
+    DEFAULT_DATA = {'skills': [], 'hotkey': 'f8', 'program': 'Selecione um programa'}
+    
     def __init__(self, parent, app):
         self.parent = parent
         self.app = app
@@ -1010,3 +1046,114 @@ class SkillSpamTab:
             'hotkey': self.get_hotkey(),
             'program': self.get_selected_program()
         }
+    
+    def get_data(self):
+        """Retorna os dados da aba."""
+        return self.get_entries_data()
+
+
+class PresetChoice:
+    """
+    Seleção de preset de uma aba.
+    
+    Guarda a lista e o preset escolhido enquanto a aba não existe e repassa
+    para o PresetSelector depois que ela é construída (mesma interface).
+    """
+    
+    def __init__(self):
+        self.values = None
+        self.selected = "Preset 1"
+        self.selector = None
+    
+    def attach(self, selector):
+        """Liga ao seletor da aba recém-construída."""
+        self.selector = selector
+        if self.values:
+            selector.update_values(self.values)
+        selector.set_selected(self.selected)
+    
+    def get_selected(self):
+        """Retorna o preset selecionado."""
+        if self.selector is not None:
+            return self.selector.get_selected()
+        return self.selected
+    
+    def set_selected(self, name):
+        """Define o preset selecionado."""
+        self.selected = name
+        if self.selector is not None:
+            self.selector.set_selected(name)
+    
+    def update_values(self, values):
+        """Atualiza a lista de presets."""
+        self.values = values
+        if self.selector is not None:
+            self.selector.update_values(values)
+
+
+class TabProxy:
+    """
+    Aba construída só na primeira vez em que é exibida.
+    
+    Até lá os dados ficam em um dict simples (o formato de get_data/load_data
+    da aba) e o app lê e grava esse modelo; a montagem dos widgets e, na aba
+    de skill spam, a listagem de janelas só acontecem ao abrir a aba.
+    """
+    
+    def __init__(self, tab_class, parent, app, on_build=None):
+        """
+        Cria o proxy (sem widgets).
+        
+        Args:
+            tab_class: Classe da aba (ValuesTab, SearchTab, ...).
+            parent: Frame da aba no CTkTabview.
+            app: Referência para a aplicação principal.
+            on_build: Callback on_build(aba) chamado depois de construir.
+        """
+        self.tab_class = tab_class
+        self.parent = parent
+        self.app = app
+        self.on_build = on_build
+        self.tab = None
+        self.presets = PresetChoice()
+        self._data = copy.deepcopy(tab_class.DEFAULT_DATA)
+    
+    @property
+    def built(self):
+        """Se os widgets da aba já existem."""
+        return self.tab is not None
+    
+    def materialize(self):
+        """
+        Constrói a aba (uma vez) com os dados atuais do modelo.
+        
+        Returns:
+            A aba construída.
+        """
+        if self.tab is None:
+            tab = self.tab_class(self.parent, self.app)
+            tab.load_data(copy.deepcopy(self._data))
+            if getattr(tab, 'preset_selector', None) is not None:
+                self.presets.attach(tab.preset_selector)
+            self.tab = tab
+            if self.on_build:
+                self.on_build(tab)
+        return self.tab
+    
+    def get_data(self):
+        """Retorna os dados (dos widgets, se a aba já foi construída)."""
+        if self.tab is not None:
+            self._data = self.tab.get_data()
+        return copy.deepcopy(self._data)
+    
+    def load_data(self, data):
+        """Substitui os dados (e os widgets, se a aba já foi construída)."""
+        defaults = self.tab_class.DEFAULT_DATA
+        if isinstance(defaults, dict):
+            if not isinstance(data, dict):
+                return
+            # Chaves ausentes ficam com o padrão da aba (como no load_data dos widgets)
+            data = {**defaults, **data}
+        self._data = copy.deepcopy(data)
+        if self.tab is not None:
+            self.tab.load_data(data)
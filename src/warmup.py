@@ -0,0 +1,145 @@
+"""
+Módulo de aquecimento do OCR.
+A primeira passada do tesseract depois de abrir o programa é bem mais lenta
+(processo frio, traineddata fora do cache de disco). Ao iniciar, uma thread
+de fundo roda o OCR sobre uma amostra pequena desenhada na hora, confere o
+resultado do parser e guarda a latência de referência. Se o tesseract não
+existir, o aviso aparece na abertura e não na primeira rolagem.
+"""
+import time
+import shutil
+import threading
+from PIL import Image, ImageDraw
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import OCR_WARMUP_CONFIG
+from src.ocr_engine import OCREngine, tesseract
+
+
+# Resultados do aquecimento
+WARMUP_PENDING = 'pending'
+WARMUP_OK = 'ok'
+WARMUP_MISMATCH = 'mismatch'
+WARMUP_MISSING = 'missing'
+WARMUP_ERROR = 'error'
+
+
+def render_sample(lines, scale=3):
+    """
+    Desenha as linhas de amostra no estilo do tooltip (texto claro em fundo escuro).
+    
+    Args:
+        lines: Linhas de texto.
+        scale: Fator de ampliação (a fonte padrão do PIL é pequena).
+    
+    Returns:
+        PIL.Image: Imagem da amostra.
+    """
+    line_height = 14
+    measure = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+    width = 8 + int(max(measure.textlength(line) for line in lines))
+    height = 8 + line_height * len(lines)
+    image = Image.new('RGB', (width, height), (20, 20, 30))
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((4, 4 + i * line_height), line, fill=(235, 235, 235))
+    return image.resize((width * scale, height * scale), Image.BICUBIC)
+
+
+def tesseract_available():
+    """Se o executável configurado do tesseract existe."""
+    cmd = tesseract().pytesseract.tesseract_cmd
+    return os.path.exists(cmd) or shutil.which(cmd) is not None
+
+
+class OCRWarmup:
+    """Aquecimento e autoteste do OCR em uma thread de fundo."""
+    
+    def __init__(self, ocr=None, config=None):
+        """
+        Cria o aquecimento (a thread só sobe no start).
+        
+        Args:
+            ocr: OCREngine usado (padrão: um próprio, sem métricas).
+            config: Configuração (padrão OCR_WARMUP_CONFIG).
+        """
+        config = config or OCR_WARMUP_CONFIG
+        self.ocr = ocr or OCREngine()
+        self.lines = config['sample_lines']
+        self.scale = config['scale']
+        self.status = WARMUP_PENDING
+        self.message = ''
+        self.cold_ms = None
+        self.warm_ms = None
+        self.values = None
+        self.done = threading.Event()
+    
+    def start(self, on_done=None):
+        """
+        Roda o aquecimento em segundo plano.
+        
+        Args:
+            on_done: Callback on_done(warmup) chamado na thread do aquecimento.
+        """
+        def worker():
+            self.run()
+            if on_done:
+                on_done(self)
+        
+        threading.Thread(target=worker, name='ocr-warmup', daemon=True).start()
+    
+    def run(self):
+        """
+        Executa o aquecimento (bloqueante).
+        
+        Returns:
+            str: Status final (WARMUP_*).
+        """
+        try:
+            self._run()
+        except OSError as e:
+            # pytesseract levanta TesseractNotFoundError (OSError) sem o executável
+            self.status = WARMUP_MISSING
+            self.message = f"Tesseract não encontrado: {e}"
+        except Exception as e:
+            self.status = WARMUP_ERROR
+            self.message = f"Falha no teste do OCR: {e}"
+        finally:
+            self.done.set()
+        return self.status
+    
+    def _run(self):
+        """Passada fria, passada quente e a configuração usada nas novas tentativas."""
+        if not tesseract_available():
+            self.status = WARMUP_MISSING
+            self.message = f"Tesseract não encontrado em {tesseract().pytesseract.tesseract_cmd}"
+            return
+        
+        sample = render_sample(self.lines, self.scale)
+        expected = dict(self.ocr.extract_attributes_from_text('\n'.join(self.lines)))
+        
+        started = time.perf_counter()
+        self.ocr.extract_text(sample)
+        self.cold_ms = (time.perf_counter() - started) * 1000.0
+        
+        started = time.perf_counter()
+        text = self.ocr.extract_text(sample)
+        self.warm_ms = (time.perf_counter() - started) * 1000.0
+        self.ocr.extract_text(sample.convert('L'), '--psm 6')
+        
+        self.values = dict(self.ocr.extract_attributes_from_text(text))
+        if all(self.values.get(name) == value for name, value in expected.items()):
+            self.status = WARMUP_OK
+            self.message = f"OCR pronto (primeira passada {self.cold_ms:.0f} ms, depois {self.warm_ms:.0f} ms)"
+        else:
+            self.status = WARMUP_MISMATCH
+            read = ', '.join(f"{name}={value}" for name, value in self.values.items()) or 'nada'
+            self.message = f"OCR respondeu, mas a amostra não foi lida corretamente (leu: {read})"
+    
+    @property
+    def ready(self):
+        """Se o aquecimento terminou."""
+        return self.done.is_set()
@@ -0,0 +1,92 @@
+"""
+Testes do endpoint de métricas (GET /metrics em uma porta livre).
+"""
+import unittest
+import urllib.error
+import urllib.request
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.instrumentation import Instruments
+from src.metrics_server import MetricsServer
+
+
+class _FakeOcr:
+    def pass_counts(self):
+        return {'normal': 3, 'contrast': 1}
+
+
+class _FakeEngine:
+    """Só o que engine_metrics lê do AutomationEngine."""
+    
+    def __init__(self):
+        self.is_running = False
+        self.ocr = _FakeOcr()
+        self.instruments = Instruments(enabled=True)
+        self.rolls = 0
+    
+    def counters(self):
+        return {'rolls': self.rolls, 'captures': self.rolls, 'runs': 2, 'successes': 1}
+    
+    def get_metrics(self):
+        return {'rolls_per_minute': 12.5}
+
+
+def _samples(text):
+    """Converte o texto de exposição em {nome_com_labels: valor}."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, _, value = line.rpartition(' ')
+            samples[name] = value
+    return samples
+
+
+class MetricsServerTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.engine = _FakeEngine()
+        self.server = MetricsServer(self.engine, port=0)
+        self.url = self.server.start()
+    
+    def tearDown(self):
+        self.server.stop()
+    
+    def fetch(self, url=None):
+        with urllib.request.urlopen(url or self.url, timeout=5) as response:
+            self.assertEqual(response.status, 200)
+            self.assertTrue(response.headers['Content-Type'].startswith('text/plain'))
+            return _samples(response.read().decode('utf-8'))
+    
+    def test_large_counters_are_exact(self):
+        self.engine.rolls = 1234567
+        samples = self.fetch()
+        self.assertEqual(samples['reroll_rolls_total'], '1234567')
+        self.assertEqual(samples['reroll_ocr_passes_total{variant="normal"}'], '3')
+        self.assertEqual(samples['reroll_running'], '0')
+    
+    def test_latency_is_cumulative_across_runs(self):
+        instruments = self.engine.instruments
+        instruments.record('capture', 0.25)
+        first = self.fetch()
+        
+        # Início de uma nova execução: o acumulado não pode diminuir
+        instruments.reset()
+        instruments.record('capture', 0.5)
+        second = self.fetch()
+        
+        self.assertEqual(first['reroll_stage_latency_seconds_count{stage="capture"}'], '1')
+        self.assertEqual(second['reroll_stage_latency_seconds_count{stage="capture"}'], '2')
+        self.assertAlmostEqual(float(second['reroll_stage_latency_seconds_sum{stage="capture"}']), 0.75)
+        self.assertEqual(instruments.snapshot()['capture']['count'], 1)
+    
+    def test_unknown_path(self):
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            self.fetch(self.url.replace('/metrics', '/other'))
+        self.assertEqual(context.exception.code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()